@@ -1,19 +1,56 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from ..schemas.dispatch import (
     CreateScheduleRequest,
     ScheduleResponse,
     UpdateScheduleRequest,
-    ScheduleStatus
+    ScheduleStatus,
+    RedispatchRequest,
+    RedispatchResponse,
+    TieredScheduleResponse,
+    UpdateScheduleResponse
 )
+from ...core.models.optimization import OptimizationResult, ScheduleValidationReport
+from ...core.models.schedule_validation import validate_dispatch_schedule
+from ...core.services.admission import (
+    AdmissionRejected,
+    DispatchAdmissionQueue,
+    get_admission_queue
+)
+from ...core.services.instrumentation import stage
 from ...core.services.optimizer import DispatchOptimizer
-from ...infrastructure.messaging.kafka_producer import KafkaProducer
+from ...core.services.result_cache import (
+    OptimizationResultCache,
+    canonical_request_hash,
+    get_result_cache
+)
+from ...infrastructure.database.schedule_repository import (
+    ScheduleRepository,
+    get_schedule_repository
+)
+from ...infrastructure.messaging.kafka_producer import (
+    KafkaProducer,
+    close_kafka_producer,
+    get_kafka_producer
+)
 from ..core.simulation.simulator import SimulationConfig, VPPSimulator
+from .instrumented_route import InstrumentedRoute
 
-router = APIRouter(prefix="/dispatch", tags=["dispatch"])
+router = APIRouter(prefix="/dispatch", tags=["dispatch"], route_class=InstrumentedRoute)
 simulator = None
 
+def admission_error(error: AdmissionRejected) -> HTTPException:
+    """Map an admission rejection to 504 for missed deadlines, 503 otherwise"""
+    if error.reason == "deadline_expired":
+        return HTTPException(status_code=504, detail=str(error))
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+@router.on_event("shutdown")
+async def close_producer():
+    await close_kafka_producer()
+
 @router.post("/initialize_simulation")
 async def initialize_simulation(config: SimulationConfig):
     global simulator
@@ -41,71 +78,372 @@ async def create_dispatch(dispatch_request: DispatchRequest):
 async def create_schedule(
     request: CreateScheduleRequest,
     optimizer: DispatchOptimizer = Depends(),
-    kafka: KafkaProducer = Depends()
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository),
+    result_cache: OptimizationResultCache = Depends(get_result_cache),
+    admission: DispatchAdmissionQueue = Depends(get_admission_queue)
 ):
     """Create a new dispatch schedule"""
+    async def optimize():
+        # Create schedule once admitted, solving off the event loop
+        schedule = await admission.submit(
+            request.request_class,
+            lambda: asyncio.run(optimizer.create_dispatch_schedule(
+                resources=request.resources,
+                market_signals=request.market_signals,
+                start_time=request.start_time,
+                end_time=request.end_time
+            )),
+            deadline=request.deadline
+        )
+        
+        # Validate schedule
+        with stage("validation"):
+            valid = schedule.validate_schedule()
+        if not valid:
+            raise HTTPException(
+                status_code=400,
+                detail="Generated schedule violates constraints"
+            )
+        return schedule
+    
     try:
-        # Create schedule
-        schedule = await optimizer.create_dispatch_schedule(
+        # Identical requests share one solve and its result while cached
+        cache_key = canonical_request_hash(
             resources=request.resources,
             market_signals=request.market_signals,
             start_time=request.start_time,
-            end_time=request.end_time
+            end_time=request.end_time,
+            extra=request.optimization_params
         )
+        schedule, outcome = await result_cache.get_or_compute(cache_key, optimize)
         
-        # Validate schedule
+        if outcome == "miss":
+            with stage("persist"):
+                repository.save(schedule, status="created", resources=request.resources)
+            
+            # Publish schedule to Kafka
+            with stage("kafka_publish"):
+                await kafka.publish_schedule(schedule)
+        
+        return ScheduleResponse(
+            schedule_id=schedule.schedule_id,
+            status="created",
+            schedule=schedule,
+            metrics=schedule.calculate_metrics()
+        )
+        
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create schedule: {str(e)}"
+        )
+
+@router.post("/schedule/anytime", response_model=TieredScheduleResponse)
+async def create_anytime_schedule(
+    request: CreateScheduleRequest,
+    latency_budget_ms: Optional[float] = None,
+    optimizer: DispatchOptimizer = Depends(),
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository),
+    admission: DispatchAdmissionQueue = Depends(get_admission_queue)
+):
+    """Create a schedule within a latency budget.
+    
+    Returns the optimized schedule if it is ready in time, otherwise a
+    heuristic schedule; the optimized schedule is then stored and published
+    under the same schedule_id when it finishes. The optimization goes
+    through the admission queue, and only schedules that validate are
+    stored.
+    """
+    async def submit(solve):
+        return await admission.submit(request.request_class, solve, deadline=request.deadline)
+    
+    async def publish_refined(schedule):
         if not schedule.validate_schedule():
+            return
+        repository.save(schedule, status="refined", resources=request.resources)
+        await kafka.publish_schedule(schedule)
+    
+    try:
+        schedule, tier = await optimizer.create_tiered_schedule(
+            resources=request.resources,
+            market_signals=request.market_signals,
+            start_time=request.start_time,
+            end_time=request.end_time,
+            latency_budget=latency_budget_ms / 1000 if latency_budget_ms is not None else None,
+            on_refined=publish_refined,
+            submit=submit
+        )
+        
+        # Validate schedule
+        with stage("validation"):
+            valid = schedule.validate_schedule()
+        if not valid:
             raise HTTPException(
                 status_code=400,
                 detail="Generated schedule violates constraints"
             )
+        
+        with stage("persist"):
+            repository.save(schedule, status="created", resources=request.resources)
+        
+        with stage("kafka_publish"):
+            await kafka.publish_schedule(schedule)
+        
+        return TieredScheduleResponse(
+            schedule_id=schedule.schedule_id,
+            status="created",
+            schedule=schedule,
+            metrics=schedule.calculate_metrics(),
+            tier=tier,
+            refinement_pending=tier == "heuristic"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create schedule: {str(e)}"
+        )
+
+@router.post("/schedule/{schedule_id}/redispatch", response_model=RedispatchResponse)
+async def redispatch_schedule(
+    schedule_id: str,
+    request: RedispatchRequest,
+    optimizer: DispatchOptimizer = Depends(),
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository),
+    admission: DispatchAdmissionQueue = Depends(get_admission_queue)
+):
+    """Re-optimize the remaining horizon of a schedule as a new schedule in the same stream"""
+    if request.previous_schedule.schedule_id != schedule_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Previous schedule does not match schedule_id"
+        )
+    
+    try:
+        schedule, report = await admission.submit(
+            request.request_class,
+            lambda: asyncio.run(optimizer.redispatch_schedule(
+                previous_schedule=request.previous_schedule,
+                resources=request.resources,
+                market_signals=request.market_signals,
+                shift_intervals=request.shift_intervals,
+                locked_intervals=request.locked_intervals
+            )),
+            deadline=request.deadline
+        )
+        
+        # Validate schedule
+        with stage("validation"):
+            valid = schedule.validate_schedule()
+        if not valid:
+            raise HTTPException(
+                status_code=400,
+                detail="Re-dispatched schedule violates constraints"
+            )
+            
+        with stage("persist"):
+            repository.save(schedule, status="created", resources=request.resources)
             
         # Publish schedule to Kafka
-        await kafka.publish_schedule(schedule)
+        with stage("kafka_publish"):
+            await kafka.publish_schedule(schedule)
         
-        return ScheduleResponse(
+        return RedispatchResponse(
             schedule_id=schedule.schedule_id,
             status="created",
             schedule=schedule,
-            metrics=schedule.calculate_metrics()
+            metrics=schedule.calculate_metrics(),
+            report=report
         )
         
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise admission_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to create schedule: {str(e)}"
+            detail=f"Failed to re-dispatch schedule: {str(e)}"
         )
 
 @router.get("/schedule/{schedule_id}", response_model=ScheduleResponse)
-async def get_schedule(schedule_id: str):
+async def get_schedule(
+    schedule_id: str,
+    format: str = "json",  # json, columnar or binary
+    repository: ScheduleRepository = Depends(get_schedule_repository)
+):
     """Get existing schedule by ID"""
-    # TODO: Implement schedule retrieval from database
-    raise HTTPException(status_code=501, detail="Not implemented")
+    schedule = repository.get(schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    if format == "columnar":
+        return Response(
+            content=schedule.columnar().to_json_bytes(),
+            media_type="application/json"
+        )
+    if format == "binary":
+        return Response(
+            content=schedule.columnar().to_binary(),
+            media_type="application/octet-stream"
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    
+    return ScheduleResponse(
+        schedule_id=schedule.schedule_id,
+        status=repository.get_status(schedule_id).status,
+        schedule=schedule,
+        metrics=schedule.calculate_metrics()
+    )
+
+@router.get("/schedule/{schedule_id}/resources/{resource_id}", response_model=List[OptimizationResult])
+async def get_resource_schedule(
+    schedule_id: str,
+    resource_id: str,
+    repository: ScheduleRepository = Depends(get_schedule_repository)
+):
+    """Get a single resource's slice of a schedule"""
+    results = repository.get_resource_schedule(schedule_id, resource_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Schedule or resource not found")
+    return results
+
+@router.get("/schedule/{schedule_id}/validation", response_model=ScheduleValidationReport)
+async def validate_stored_schedule(
+    schedule_id: str,
+    max_violations: int = 1000,
+    repository: ScheduleRepository = Depends(get_schedule_repository)
+):
+    """Check a stored schedule against the resource states it was created with"""
+    schedule = repository.get(schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    try:
+        return validate_dispatch_schedule(
+            schedule,
+            resources=repository.get_resources(schedule_id),
+            max_violations=max_violations
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to validate schedule: {str(e)}"
+        )
 
-@router.put("/schedule/{schedule_id}", response_model=ScheduleResponse)
+@router.put("/schedule/{schedule_id}", response_model=UpdateScheduleResponse)
 async def update_schedule(
     schedule_id: str,
     request: UpdateScheduleRequest,
     optimizer: DispatchOptimizer = Depends(),
-    kafka: KafkaProducer = Depends()
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository),
+    result_cache: OptimizationResultCache = Depends(get_result_cache)
 ):
-    """Update existing schedule"""
-    # TODO: Implement schedule update
-    raise HTTPException(status_code=501, detail="Not implemented")
+    """Update existing schedule, re-solving only the affected resources and intervals"""
+    stored = repository.get(schedule_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    stored_resources = repository.get_resources(schedule_id)
+    if stored_resources is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Schedule was stored without resource states and cannot be updated"
+        )
+    
+    try:
+        schedule, report = await optimizer.update_dispatch_schedule(
+            stored_schedule=stored,
+            stored_resources=stored_resources,
+            resources=request.resources,
+            removed_resource_ids=request.removed_resource_ids,
+            market_signals=request.market_signals,
+            start_time=request.start_time,
+            end_time=request.end_time
+        )
+        
+        if not schedule.validate_schedule():
+            raise HTTPException(
+                status_code=400,
+                detail="Updated schedule violates constraints"
+            )
+        
+        resources = {resource.resource_id: resource for resource in stored_resources}
+        resources.update({resource.resource_id: resource for resource in request.resources or []})
+        for resource_id in report.resources_removed:
+            resources.pop(resource_id, None)
+        
+        repository.save(schedule, status="updated", resources=list(resources.values()))
+        # A repeated create request must not return the schedule as it was before the update
+        result_cache.invalidate_result(schedule_id)
+        await kafka.publish_schedule(schedule)
+        
+        return UpdateScheduleResponse(
+            schedule_id=schedule_id,
+            status="updated",
+            schedule=schedule,
+            metrics=schedule.calculate_metrics(),
+            report=report
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to update schedule: {str(e)}"
+        )
 
 @router.delete("/schedule/{schedule_id}")
 async def delete_schedule(
     schedule_id: str,
-    kafka: KafkaProducer = Depends()
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository),
+    result_cache: OptimizationResultCache = Depends(get_result_cache)
 ):
     """Delete existing schedule"""
-    # TODO: Implement schedule deletion
-    raise HTTPException(status_code=501, detail="Not implemented")
+    schedule = repository.get(schedule_id)
+    if schedule is None or not repository.delete(schedule_id):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    result_cache.invalidate_result(schedule_id)
+    kafka.forget_schedule_stream(schedule.stream_id)
+    
+    try:
+        # Let execution consumers drop the schedule
+        await kafka.publish_command(
+            topic="schedule_execution",
+            key=schedule_id,
+            value={
+                "command": "delete",
+                "schedule_id": schedule_id,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        
+        return {"status": "deleted", "schedule_id": schedule_id}
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to publish schedule deletion: {str(e)}"
+        )
 
 @router.post("/schedule/{schedule_id}/execute")
 async def execute_schedule(
     schedule_id: str,
-    kafka: KafkaProducer = Depends()
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository)
 ):
     """Start schedule execution"""
     try:
@@ -119,6 +457,7 @@ async def execute_schedule(
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
+        repository.update_status(schedule_id, "executing")
         
         return {"status": "execution_started", "schedule_id": schedule_id}
         
@@ -131,7 +470,8 @@ async def execute_schedule(
 @router.post("/schedule/{schedule_id}/stop")
 async def stop_schedule(
     schedule_id: str,
-    kafka: KafkaProducer = Depends()
+    kafka: KafkaProducer = Depends(get_kafka_producer),
+    repository: ScheduleRepository = Depends(get_schedule_repository)
 ):
     """Stop schedule execution"""
     try:
@@ -145,6 +485,7 @@ async def stop_schedule(
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
+        repository.update_status(schedule_id, "stopped")
         
         return {"status": "execution_stopped", "schedule_id": schedule_id}
         
@@ -155,7 +496,30 @@ async def stop_schedule(
         )
 
 @router.get("/schedule/{schedule_id}/status", response_model=ScheduleStatus)
-async def get_schedule_status(schedule_id: str):
+async def get_schedule_status(
+    schedule_id: str,
+    repository: ScheduleRepository = Depends(get_schedule_repository)
+):
     """Get current status of schedule execution"""
-    # TODO: Implement status retrieval
-    raise HTTPException(status_code=501, detail="Not implemented") 
\ No newline at end of file
+    record = repository.get_status(schedule_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    # Compare in the schedule's own convention, naive or tz-aware UTC
+    now = datetime.now(timezone.utc) if record.start_time.tzinfo else datetime.utcnow()
+    duration = (record.end_time - record.start_time).total_seconds()
+    elapsed = (now - record.start_time).total_seconds()
+    progress = min(max(elapsed / duration, 0.0), 1.0) * 100 if duration > 0 else 0.0
+    if record.status == "completed":
+        progress = 100.0
+    elif record.status != "executing":
+        progress = 0.0
+    
+    return ScheduleStatus(
+        schedule_id=schedule_id,
+        status=record.status,
+        current_interval=now if record.start_time <= now < record.end_time else None,
+        progress_percent=progress,
+        last_update=record.last_update,
+        error_message=record.error_message
+    )
@@ -0,0 +1,87 @@
+import functools
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from ...core.services.instrumentation import (
+    SamplingProfiler,
+    observe_stage,
+    track_request
+)
+
+# "disk" writes the profile, "inline" also returns the hottest functions in a header
+PROFILE_HEADER = "X-Dispatch-Profile"
+
+# perf_counter marks of the request being handled
+_marks: ContextVar[Optional[Dict[str, float]]] = ContextVar("dispatch_route_marks", default=None)
+
+def profiling_enabled() -> bool:
+    return os.getenv("DISPATCH_PROFILING_ENABLED", "false").lower() == "true"
+
+class InstrumentedRoute(APIRoute):
+    """Route that records request parsing and response serialization as stages.
+
+    When ``DISPATCH_PROFILING_ENABLED`` is true, requests sent with the
+    profile header are also sampled for their whole duration: the collapsed profile is written to ``DISPATCH_PROFILE_DIR``
+    and its path returned in ``X-Dispatch-Profile-Path``, and the request's
+    stage timings are returned in ``X-Dispatch-Stage-Timings``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            marks = _marks.get()
+            if marks is not None:
+                marks["endpoint_started"] = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if marks is not None:
+                    marks["endpoint_finished"] = time.perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def instrumented_handler(request: Request) -> Response:
+            mode = request.headers.get(PROFILE_HEADER, "").lower()
+            profiler = None
+            if mode and profiling_enabled():
+                profiler = SamplingProfiler(
+                    interval=float(os.getenv("DISPATCH_PROFILE_INTERVAL_MS", "5")) / 1000
+                )
+
+            marks = {"received": time.perf_counter()}
+            token = _marks.set(marks)
+            try:
+                with track_request(profiler) as timings:
+                    response = await handler(request)
+                    finished = time.perf_counter()
+                    if "endpoint_started" in marks:
+                        observe_stage("request_parsing", marks["endpoint_started"] - marks["received"])
+                    if "endpoint_finished" in marks:
+                        observe_stage("response_serialization", finished - marks["endpoint_finished"])
+            finally:
+                _marks.reset(token)
+
+            if profiler is not None:
+                timings["total"] = finished - marks["received"]
+                response.headers["X-Dispatch-Stage-Timings"] = ",".join(
+                    f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items()
+                )
+                name = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
+                response.headers["X-Dispatch-Profile-Path"] = profiler.write(
+                    os.getenv("DISPATCH_PROFILE_DIR", "/tmp/dispatch_profiles"), name
+                )
+                response.headers["X-Dispatch-Profile-Samples"] = str(profiler.sample_count)
+                if mode == "inline":
+                    response.headers["X-Dispatch-Profile-Top"] = ";".join(
+                        f"{function}={count}" for function, count in profiler.top_functions()
+                    )
+            return response
+
+        return instrumented_handler
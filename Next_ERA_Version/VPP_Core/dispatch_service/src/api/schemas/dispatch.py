@@ -4,8 +4,11 @@ from datetime import datetime
 from ...core.models.optimization import (
     ResourceState,
     MarketSignal,
-    DispatchSchedule
+    DispatchSchedule,
+    RedispatchReport,
+    ScheduleUpdateReport
 )
+from ...core.services.admission import RequestClass
 
 class CreateScheduleRequest(BaseModel):
     """Request to create a new dispatch schedule"""
@@ -14,15 +17,28 @@ class CreateScheduleRequest(BaseModel):
     start_time: datetime
     end_time: datetime
     optimization_params: Optional[Dict[str, any]] = None
+    request_class: RequestClass = RequestClass.DAY_AHEAD
+    deadline: Optional[datetime] = None  # defaults per request class
 
 class UpdateScheduleRequest(BaseModel):
     """Request to update an existing schedule"""
-    resources: Optional[List[ResourceState]] = None
+    resources: Optional[List[ResourceState]] = None  # added or changed resources
+    removed_resource_ids: Optional[List[str]] = None
     market_signals: Optional[List[MarketSignal]] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     optimization_params: Optional[Dict[str, any]] = None
 
+class RedispatchRequest(BaseModel):
+    """Request to re-dispatch a schedule over a receding horizon"""
+    previous_schedule: DispatchSchedule
+    resources: List[ResourceState]
+    market_signals: List[MarketSignal]
+    shift_intervals: int = 1  # intervals to move the horizon forward
+    locked_intervals: int = 1  # intervals already in execution, kept unchanged
+    request_class: RequestClass = RequestClass.INTRADAY
+    deadline: Optional[datetime] = None  # defaults per request class
+
 class ScheduleMetrics(BaseModel):
     """Performance metrics for a schedule"""
     total_energy_mwh: float
@@ -48,6 +64,19 @@ class ScheduleResponse(BaseModel):
     schedule: DispatchSchedule
     metrics: ScheduleMetrics
 
+class RedispatchResponse(ScheduleResponse):
+    """Response for a receding-horizon re-dispatch"""
+    report: RedispatchReport
+
+class UpdateScheduleResponse(ScheduleResponse):
+    """Response for an incremental schedule update"""
+    report: ScheduleUpdateReport
+
+class TieredScheduleResponse(ScheduleResponse):
+    """Response for anytime dispatch"""
+    tier: str  # heuristic, optimized
+    refinement_pending: bool = False  # an optimized schedule may still be published
+
 class ExecutionCommand(BaseModel):
     """Command to control schedule execution"""
     command: str  # execute, stop, pause, resume
@@ -0,0 +1,375 @@
+import copy
+import gc
+import json
+import struct
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from pydantic.json import pydantic_encoder
+from .optimization import (
+    DispatchSchedule,
+    GridService,
+    OptimizationResult
+)
+
+# Numeric OptimizationResult fields stored as (resources x intervals) arrays.
+# Optional fields use NaN for None.
+NUMERIC_FIELDS = (
+    "target_power",
+    "expected_cost",
+    "expected_revenue",
+    "expected_soc",
+    "carbon_impact",
+    "confidence_level"
+)
+OPTIONAL_FIELDS = ("expected_soc", "carbon_impact")
+
+EPOCH = datetime(1970, 1, 1)
+BINARY_MAGIC = b"VPPS"
+BINARY_VERSION = 1
+
+_RESULT_FIELDS = frozenset(OptimizationResult.__fields__)
+
+def make_result(values: Dict) -> OptimizationResult:
+    """Create an OptimizationResult from already-validated values.
+
+    ``values`` must hold every field in declaration order. This skips pydantic
+    validation entirely and is several times cheaper than ``construct``.
+    """
+    result = object.__new__(OptimizationResult)
+    object.__setattr__(result, "__dict__", values)
+    object.__setattr__(result, "__fields_set__", set(_RESULT_FIELDS))
+    return result
+
+@contextmanager
+def paused_gc():
+    """Suspend the cyclic garbage collector while creating many acyclic objects.
+
+    Bulk result creation otherwise triggers repeated full collections that
+    cost more than building the objects themselves.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def encode_array(array: np.ndarray) -> List:
+    """Convert an array to nested lists with NaN as None"""
+    if np.isnan(array).any():
+        return np.where(np.isnan(array), None, array).tolist()
+    return array.tolist()
+
+def decode_array(values: List) -> np.ndarray:
+    """Inverse of ``encode_array``"""
+    return np.array(values, dtype=np.float64)
+
+class ResourceResultsView(Sequence):
+    """Read-only sequence of one resource's results, built on access"""
+
+    def __init__(self, schedule: "ColumnarSchedule", row: int):
+        self._schedule = schedule
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._schedule.n_intervals
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._schedule.result(self._row, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._schedule.result(self._row, index)
+
+class ColumnarResources(Mapping):
+    """Mapping of resource_id to lazy result views"""
+
+    def __init__(self, schedule: "ColumnarSchedule"):
+        self._schedule = schedule
+
+    def __getitem__(self, resource_id: str) -> ResourceResultsView:
+        return ResourceResultsView(self._schedule, self._schedule.resource_index[resource_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schedule.resource_ids)
+
+    def __len__(self) -> int:
+        return len(self._schedule.resource_ids)
+
+class ColumnarSchedule:
+    """Array-backed dispatch schedule.
+
+    Results are held as (resources x intervals) NumPy arrays over a shared
+    interval time axis. ``OptimizationResult`` objects are only created when a
+    caller reads them through ``resources`` or ``result``. Schedules built by
+    the optimizer are packed after the fact; ``DispatchSchedule.columnar``
+    packs each schedule once and shares it between its consumers.
+    """
+
+    def __init__(
+        self,
+        resource_ids: List[str],
+        interval_starts: List[datetime],
+        interval_ends: List[datetime],
+        columns: Dict[str, np.ndarray],
+        grid_services: Optional[Dict[GridService, np.ndarray]] = None,
+        constraints_violated: Optional[Dict[Tuple[int, int], List[str]]] = None,
+        risk_levels: Optional[Dict[Tuple[int, int], str]] = None,
+        header: Optional[Dict] = None
+    ):
+        self.resource_ids = list(resource_ids)
+        self.resource_index = {resource_id: i for i, resource_id in enumerate(self.resource_ids)}
+        self.interval_starts = list(interval_starts)
+        self.interval_ends = list(interval_ends)
+        shape = (len(self.resource_ids), len(self.interval_starts))
+
+        self.columns = {}
+        for field in NUMERIC_FIELDS:
+            default = 1.0 if field == "confidence_level" else (np.nan if field in OPTIONAL_FIELDS else 0.0)
+            column = columns.get(field)
+            self.columns[field] = (
+                np.full(shape, default) if column is None
+                else np.asarray(column, dtype=np.float64).reshape(shape)
+            )
+
+        # Grid service arrays use NaN where a resource does not provide the service
+        self.grid_services = {
+            GridService(service): np.asarray(values, dtype=np.float64).reshape(shape)
+            for service, values in (grid_services or {}).items()
+        }
+        self.constraints_violated = constraints_violated or {}
+        self.risk_levels = risk_levels or {}
+        self.header = header or {}
+
+    @property
+    def n_intervals(self) -> int:
+        return len(self.interval_starts)
+
+    @property
+    def resources(self) -> ColumnarResources:
+        """Lazy ``Dict[str, List[OptimizationResult]]`` view"""
+        return ColumnarResources(self)
+
+    def result(self, row: int, interval: int) -> OptimizationResult:
+        """Build the OptimizationResult for one resource and interval"""
+        values = {field: self.columns[field][row, interval] for field in NUMERIC_FIELDS}
+        for field in OPTIONAL_FIELDS:
+            if np.isnan(values[field]):
+                values[field] = None
+            else:
+                values[field] = float(values[field])
+
+        return make_result({
+            "resource_id": self.resource_ids[row],
+            "target_power": float(values["target_power"]),
+            "start_time": self.interval_starts[interval],
+            "end_time": self.interval_ends[interval],
+            "expected_cost": float(values["expected_cost"]),
+            "expected_revenue": float(values["expected_revenue"]),
+            "grid_service_contribution": {
+                service: float(array[row, interval])
+                for service, array in self.grid_services.items()
+                if not np.isnan(array[row, interval])
+            },
+            "constraints_violated": list(self.constraints_violated.get((row, interval), [])),
+            "confidence_level": float(values["confidence_level"]),
+            "expected_soc": values["expected_soc"],
+            "carbon_impact": values["carbon_impact"],
+            "risk_level": self.risk_levels.get((row, interval), "low")
+        })
+
+    @classmethod
+    def from_results(
+        cls,
+        resource_results: Dict[str, List[OptimizationResult]],
+        header: Optional[Dict] = None
+    ) -> "ColumnarSchedule":
+        """Pack per-resource result lists onto a shared interval axis"""
+        axis = sorted({
+            (result.start_time, result.end_time)
+            for results in resource_results.values()
+            for result in results
+        })
+        position = {start: i for i, (start, _) in enumerate(axis)}
+        resource_ids = list(resource_results)
+        shape = (len(resource_ids), len(axis))
+
+        columns = {
+            field: np.full(shape, 1.0 if field == "confidence_level" else (np.nan if field in OPTIONAL_FIELDS else 0.0))
+            for field in NUMERIC_FIELDS
+        }
+        grid_services: Dict[GridService, np.ndarray] = {}
+        constraints_violated, risk_levels = {}, {}
+
+        for row, resource_id in enumerate(resource_ids):
+            for result in resource_results[resource_id]:
+                col = position[result.start_time]
+                for field in NUMERIC_FIELDS:
+                    value = getattr(result, field)
+                    if value is not None:
+                        columns[field][row, col] = value
+                for service, amount in result.grid_service_contribution.items():
+                    if service not in grid_services:
+                        grid_services[service] = np.full(shape, np.nan)
+                    grid_services[service][row, col] = amount
+                if result.constraints_violated:
+                    constraints_violated[(row, col)] = list(result.constraints_violated)
+                if result.risk_level != "low":
+                    risk_levels[(row, col)] = result.risk_level
+
+        return cls(
+            resource_ids=resource_ids,
+            interval_starts=[start for start, _ in axis],
+            interval_ends=[end for _, end in axis],
+            columns=columns,
+            grid_services=grid_services,
+            constraints_violated=constraints_violated,
+            risk_levels=risk_levels,
+            header=header
+        )
+
+    @classmethod
+    def from_schedule(cls, schedule: DispatchSchedule) -> "ColumnarSchedule":
+        """Convert a DispatchSchedule to columnar form"""
+        return cls.from_results(
+            schedule.resources,
+            header=json.loads(schedule.json(exclude={"resources"}))
+        )
+
+    def with_header(self, header: Dict) -> "ColumnarSchedule":
+        """Shallow copy sharing the arrays, with a different header"""
+        schedule = copy.copy(self)
+        schedule.header = header
+        return schedule
+
+    def to_schedule(self) -> DispatchSchedule:
+        """Materialize a full DispatchSchedule"""
+        data = dict(self.header)
+        with paused_gc():
+            data["resources"] = {
+                resource_id: list(results) for resource_id, results in self.resources.items()
+            }
+        return DispatchSchedule.parse_obj(data)
+
+    def totals(self) -> Dict[str, float]:
+        """Schedule totals computed directly from the arrays"""
+        carbon = self.columns["carbon_impact"]
+        return {
+            "total_cost": float(self.columns["expected_cost"].sum()),
+            "total_revenue": float(self.columns["expected_revenue"].sum()),
+            "carbon_savings": float(-np.nansum(carbon)),
+            "grid_services_provided": {
+                service: float(np.nansum(array)) for service, array in self.grid_services.items()
+            }
+        }
+
+    def _epoch_axis(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Interval axis as UTC epoch microseconds"""
+        def to_epoch(times: List[datetime]) -> np.ndarray:
+            return np.array([
+                (time.astimezone(timezone.utc).replace(tzinfo=None) if time.tzinfo else time) - EPOCH
+                for time in times
+            ], dtype="timedelta64[us]").astype(np.int64)
+
+        return to_epoch(self.interval_starts), to_epoch(self.interval_ends)
+
+    def sparse_entries(self) -> Dict[str, List]:
+        return {
+            "constraints_violated": [
+                [row, col, violations] for (row, col), violations in self.constraints_violated.items()
+            ],
+            "risk_levels": [[row, col, level] for (row, col), level in self.risk_levels.items()]
+        }
+
+    def to_payload(self) -> Dict:
+        """JSON-compatible columnar payload, NaN encoded as null"""
+        return {
+            "header": self.header,
+            "resource_ids": self.resource_ids,
+            "interval_starts": [start.isoformat() for start in self.interval_starts],
+            "interval_ends": [end.isoformat() for end in self.interval_ends],
+            "columns": {field: encode_array(array) for field, array in self.columns.items()},
+            "grid_services": {service.value: encode_array(array) for service, array in self.grid_services.items()},
+            **self.sparse_entries()
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "ColumnarSchedule":
+        """Decode a payload produced by ``to_payload``"""
+        return cls(
+            resource_ids=payload["resource_ids"],
+            interval_starts=[datetime.fromisoformat(start) for start in payload["interval_starts"]],
+            interval_ends=[datetime.fromisoformat(end) for end in payload["interval_ends"]],
+            columns={field: decode_array(values) for field, values in payload["columns"].items()},
+            grid_services={service: decode_array(values) for service, values in payload["grid_services"].items()},
+            constraints_violated={(row, col): violations for row, col, violations in payload["constraints_violated"]},
+            risk_levels={(row, col): level for row, col, level in payload["risk_levels"]},
+            header=payload["header"]
+        )
+
+    def to_json_bytes(self) -> bytes:
+        """Compact columnar JSON encoding for API responses"""
+        return json.dumps(self.to_payload(), separators=(",", ":"), default=pydantic_encoder).encode("utf-8")
+
+    def to_binary(self) -> bytes:
+        """Binary encoding: magic, version, JSON metadata, then raw little-endian arrays"""
+        starts, ends = self._epoch_axis()
+        arrays = [starts, ends]
+        arrays += [self.columns[field] for field in NUMERIC_FIELDS]
+        services = list(self.grid_services)
+        arrays += [self.grid_services[service] for service in services]
+
+        metadata = json.dumps({
+            "header": self.header,
+            "resource_ids": self.resource_ids,
+            "grid_services": [service.value for service in services],
+            **self.sparse_entries()
+        }, separators=(",", ":"), default=pydantic_encoder).encode("utf-8")
+
+        body = b"".join(np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<")).tobytes() for array in arrays)
+        return BINARY_MAGIC + struct.pack("<HII", BINARY_VERSION, len(self.resource_ids), len(starts)) + \
+            struct.pack("<I", len(metadata)) + metadata + body
+
+    @classmethod
+    def from_binary(cls, data: bytes) -> "ColumnarSchedule":
+        """Decode a schedule produced by ``to_binary``"""
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("Not a columnar schedule payload")
+        version, n_resources, n_intervals = struct.unpack_from("<HII", data, 4)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported columnar schedule version {version}")
+        (metadata_length,) = struct.unpack_from("<I", data, 14)
+        offset = 18 + metadata_length
+        metadata = json.loads(data[18:offset])
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        starts = [EPOCH + timedelta(microseconds=int(value)) for value in take("<i8", n_intervals)]
+        ends = [EPOCH + timedelta(microseconds=int(value)) for value in take("<i8", n_intervals)]
+        shape = (n_resources, n_intervals)
+        columns = {field: take("<f8", n_resources * n_intervals).reshape(shape) for field in NUMERIC_FIELDS}
+        grid_services = {
+            GridService(service): take("<f8", n_resources * n_intervals).reshape(shape)
+            for service in metadata["grid_services"]
+        }
+
+        return cls(
+            resource_ids=metadata["resource_ids"],
+            interval_starts=starts,
+            interval_ends=ends,
+            columns=columns,
+            grid_services=grid_services,
+            constraints_violated={(row, col): violations for row, col, violations in metadata["constraints_violated"]},
+            risk_levels={(row, col): level for row, col, level in metadata["risk_levels"]},
+            header=metadata["header"]
+        )
@@ -1,6 +1,7 @@
+import json
 from datetime import datetime
-from typing import List, Dict, Optional, Union
-from pydantic import BaseModel, Field, validator
+from typing import Any, List, Dict, Optional, Union
+from pydantic import BaseModel, Field, PrivateAttr, validator
 from enum import Enum
 
 class ResourceType(str, Enum):
@@ -42,6 +43,20 @@ class ResourceConstraint(BaseModel):
             raise ValueError('Efficiency must be between 0 and 1')
         return v
 
+class EVSession(BaseModel):
+    """Charging session at an EV charging site"""
+    session_id: str
+    arrival_time: datetime
+    departure_time: datetime
+    energy_required: float = Field(..., ge=0, description="Energy still to deliver in MWh")
+    max_power: float = Field(..., gt=0, description="Maximum charging power in MW")
+
+    @validator('departure_time')
+    def departure_after_arrival(cls, v, values):
+        if 'arrival_time' in values and v <= values['arrival_time']:
+            raise ValueError('Departure must be after arrival')
+        return v
+
 class ResourceState(BaseModel):
     """Current state of a resource"""
     resource_id: str
@@ -59,6 +74,7 @@ class ResourceState(BaseModel):
     location: Dict[str, float]  # latitude, longitude
     weather_dependent: bool = False
     weather_forecast: Optional[Dict[str, Any]] = None
+    ev_sessions: List[EVSession] = Field(default_factory=list)  # for EV charging sites
 
 class MarketSignal(BaseModel):
     """Market price and demand signals"""
@@ -110,26 +126,42 @@ class DispatchSchedule(BaseModel):
     optimization_objective: OptimizationObjective
     risk_metrics: Dict[str, float] = Field(default_factory=dict)
     carbon_savings: float = 0.0
+    stream_id: Optional[str] = None  # shared by a schedule and its re-dispatches
+
+    @validator('stream_id', always=True)
+    def stream_id_defaults_to_schedule_id(cls, v, values):
+        return v or values.get('schedule_id')
+
+    # (result list fingerprint, ColumnarSchedule) built by ``columnar``
+    _columnar: Optional[tuple] = PrivateAttr(None)
+
+    def columnar(self) -> "ColumnarSchedule":
+        """Columnar form of the schedule, packed once and reused.
+
+        The arrays are repacked when a resource's result list is replaced;
+        callers that edit results in place must call ``clear_columnar``.
+        The header is taken from the schedule on every call.
+        """
+        from .columnar_schedule import ColumnarSchedule
+        
+        fingerprint = tuple(
+            (resource_id, id(results), len(results))
+            for resource_id, results in self.resources.items()
+        )
+        if self._columnar is None or self._columnar[0] != fingerprint:
+            self._columnar = (fingerprint, ColumnarSchedule.from_results(self.resources))
+        return self._columnar[1].with_header(json.loads(self.json(exclude={"resources"})))
 
-    def validate_schedule(self) -> bool:
-        """Validate the complete schedule"""
+    def clear_columnar(self):
+        """Drop the packed columnar form after results were edited in place"""
+        self._columnar = None
+
+    def validate_schedule(self, resources: Optional[List[ResourceState]] = None) -> bool:
+        """Validate the complete schedule, against resource constraints when given"""
+        from .schedule_validation import validate_dispatch_schedule
+        
         try:
-            # Check time continuity
-            for resource_id, schedule in self.resources.items():
-                for i in range(len(schedule) - 1):
-                    if schedule[i].end_time != schedule[i + 1].start_time:
-                        return False
-                    
-                # Check constraint violations
-                if any(len(result.constraints_violated) > 0 for result in schedule):
-                    return False
-                    
-            # Validate total grid services don't exceed capacity
-            for service, amount in self.grid_services_provided.items():
-                if amount < 0:
-                    return False
-                    
-            return True
+            return validate_dispatch_schedule(self, resources, max_violations=0).valid
         except Exception:
             return False
 
@@ -153,6 +185,68 @@ class DispatchSchedule(BaseModel):
             "carbon_savings": self.carbon_savings,
             "grid_services_revenue": sum(self.grid_services_provided.values()),
             "risk_adjusted_profit": self.total_revenue - self.total_cost - sum(
-                self.risk_metrics.values()
+                value for name, value in self.risk_metrics.items()
+                if name.endswith("_risk")
             )
-        } 
\ No newline at end of file
+        } 
+
+class ConstraintViolation(BaseModel):
+    """A single constraint violation found by schedule validation"""
+    resource_id: Optional[str] = None  # None for schedule-wide violations
+    interval_start: Optional[datetime] = None
+    constraint: str
+    value: Optional[float] = None
+    limit: Optional[float] = None
+
+class ScheduleValidationReport(BaseModel):
+    """Result of validating a whole schedule"""
+    valid: bool
+    resources_checked: int
+    intervals_checked: int
+    violation_count: int
+    counts: Dict[str, int] = Field(default_factory=dict)  # violations per constraint
+    violations: List[ConstraintViolation] = Field(default_factory=list)
+    truncated: bool = False  # violations lists only the first max_violations
+    warnings: Dict[str, int] = Field(default_factory=dict)  # advisory result flags per constraint, e.g. unmet EV energy
+
+class RedispatchReport(BaseModel):
+    """Summary of a receding-horizon re-dispatch against the previous schedule"""
+    schedule_id: str
+    previous_schedule_id: str
+    stream_id: str
+    shifted_intervals: int
+    fixed_intervals: int
+    reoptimized_intervals: int
+    solve_time_seconds: float
+    compared_intervals: int = 0
+    changed_intervals: int = 0
+    energy_change_mwh: float = 0.0
+    max_power_change: float = 0.0
+
+class ScheduleUpdateReport(BaseModel):
+    """Summary of the work done by an incremental schedule update"""
+    resources_total: int
+    resources_added: List[str] = Field(default_factory=list)
+    resources_removed: List[str] = Field(default_factory=list)
+    resources_changed: List[str] = Field(default_factory=list)
+    resources_resolved: int = 0
+    intervals_affected: int = 0
+    result_slots_total: int = 0  # resources x intervals in the updated schedule
+    result_slots_resolved: int = 0
+    work_skipped_fraction: float = 0.0
+    solve_time_seconds: float = 0.0
+
+class StochasticDispatchReport(BaseModel):
+    """Summary of a scenario-reduced two-stage dispatch"""
+    schedule_id: str
+    method: str  # fast_forward, kmedoids
+    scenarios_total: int
+    scenarios_reduced: int
+    scenario_probabilities: List[float] = Field(default_factory=list)
+    non_anticipative_intervals: int  # first-stage intervals shared by every scenario
+    reduction_distance: float  # probability-weighted distance of all scenarios to their representatives
+    relative_distance: float  # reduction_distance relative to a single-scenario reduction
+    reduced_objective: float  # objective of the reduced two-stage problem
+    evaluated_objective: float  # the plan's objective over the full scenario set
+    objective_gap: float  # (reduced - evaluated) / |evaluated|
+    solve_time_seconds: float
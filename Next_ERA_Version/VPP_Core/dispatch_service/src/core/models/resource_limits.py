@@ -0,0 +1,70 @@
+from typing import List, Tuple
+import numpy as np
+from .optimization import ResourceState, ResourceType
+
+# Curtailment duration that bounds demand-response energy when max_soc is not set
+DEFAULT_DR_DURATION_HOURS = 2.0
+
+def power_bounds(resources: List[ResourceState], rated: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Lowest and highest set point of every resource, as the optimizers use them.
+
+    Positive power goes to the grid (discharge, generation, load curtailment)
+    and negative power comes from it (charging, EV charging, DR payback).
+    Storage is symmetric in ``max_power``. Demand response pays back at up to
+    ``-min_power`` when that is negative, otherwise ``max_power``. EV sites
+    draw up to ``max_power``, capped by the grid connection. Other types use
+    ``min_power`` and ``max_power`` as given. Unavailable resources are held
+    at zero, except for DR payback of energy that is already owed, unless
+    ``rated`` asks for the limits regardless of availability.
+    """
+    lower = np.empty(len(resources))
+    upper = np.empty(len(resources))
+    for i, resource in enumerate(resources):
+        constraints = resource.constraints
+        available = rated or (resource.is_available and not resource.maintenance_mode)
+        if resource.resource_type == ResourceType.BATTERY:
+            lower[i], upper[i] = -constraints.max_power, constraints.max_power
+        elif resource.resource_type == ResourceType.DEMAND_RESPONSE:
+            payback = -constraints.min_power if constraints.min_power < 0 else max(constraints.max_power, 0.0)
+            lower[i], upper[i] = -payback, max(constraints.max_power, 0.0)
+            if not available:
+                upper[i] = 0.0
+            continue
+        elif resource.resource_type == ResourceType.EV_CHARGER:
+            lower[i] = -min(constraints.max_power, constraints.grid_connection_limit or np.inf)
+            upper[i] = 0.0
+        else:
+            lower[i], upper[i] = constraints.min_power, constraints.max_power
+        if not available:
+            lower[i] = upper[i] = 0.0
+    return lower, upper
+
+def soc_bounds(
+    resources: List[ResourceState],
+    dr_duration_hours: float = DEFAULT_DR_DURATION_HOURS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Bounds on every resource's ``expected_soc``, NaN where unbounded.
+
+    Storage defaults to 0-100 as in the storage LP. For demand response
+    ``expected_soc`` is the energy owed, at most ``max_soc`` curtailed energy
+    (defaulting to ``dr_duration_hours`` at full curtailment) times the
+    rebound of 1 / efficiency.
+    """
+    _, upper = power_bounds(resources)
+    min_soc = np.full(len(resources), np.nan)
+    max_soc = np.full(len(resources), np.nan)
+    for i, resource in enumerate(resources):
+        constraints = resource.constraints
+        if resource.resource_type == ResourceType.BATTERY:
+            min_soc[i] = constraints.min_soc or 0
+            max_soc[i] = constraints.max_soc or 100
+        elif resource.resource_type == ResourceType.DEMAND_RESPONSE:
+            energy = constraints.max_soc if constraints.max_soc is not None else upper[i] * dr_duration_hours
+            min_soc[i] = 0.0
+            max_soc[i] = max(energy, 0.0) / constraints.efficiency
+        else:
+            if constraints.min_soc is not None:
+                min_soc[i] = constraints.min_soc
+            if constraints.max_soc is not None:
+                max_soc[i] = constraints.max_soc
+    return min_soc, max_soc
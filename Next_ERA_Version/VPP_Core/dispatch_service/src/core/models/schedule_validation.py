@@ -0,0 +1,325 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .columnar_schedule import ColumnarSchedule
+from .optimization import (
+    ConstraintViolation,
+    DispatchSchedule,
+    GridService,
+    ResourceState,
+    ScheduleValidationReport
+)
+from .resource_limits import power_bounds, soc_bounds
+
+# Result flags reported as warnings rather than violations: they describe
+# demand the schedule could not serve, not a set point that cannot be executed
+ADVISORY_FLAGS = frozenset({"ev_energy_not_met"})
+
+def _epoch_seconds(times: List[datetime]) -> np.ndarray:
+    """Datetimes as epoch seconds, naive values taken as UTC"""
+    return np.array([
+        (time if time.tzinfo else time.replace(tzinfo=timezone.utc)).timestamp()
+        for time in times
+    ], dtype=float)
+
+@dataclass
+class ResourceTrajectories:
+    """Per-resource power and SOC trajectories on a shared interval axis"""
+    resource_ids: List[str]
+    interval_starts: List[datetime]
+    starts: np.ndarray  # (intervals,) epoch seconds
+    ends: np.ndarray    # (intervals,) epoch seconds
+    power: np.ndarray   # (resources x intervals), NaN where a resource has no result
+    soc: np.ndarray     # (resources x intervals), NaN where not reported
+    flagged: Dict[Tuple[int, int], List[str]] = field(default_factory=dict)
+    duplicate_rows: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=int))
+    grid_services_provided: Dict[GridService, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_columnar(cls, schedule: ColumnarSchedule) -> "ResourceTrajectories":
+        starts, ends = (axis / 1e6 for axis in schedule._epoch_axis())
+        return cls(
+            resource_ids=schedule.resource_ids,
+            interval_starts=schedule.interval_starts,
+            starts=starts,
+            ends=ends,
+            power=schedule.columns["target_power"],
+            soc=schedule.columns["expected_soc"],
+            flagged=schedule.constraints_violated,
+            grid_services_provided=schedule.totals()["grid_services_provided"]
+        )
+
+    @classmethod
+    def from_schedule(cls, schedule: DispatchSchedule) -> "ResourceTrajectories":
+        """Extract only the fields validation needs, one flat pass over the results"""
+        resource_ids = list(schedule.resources)
+        results = [result for resource_id in resource_ids for result in schedule.resources[resource_id]]
+        rows = np.repeat(
+            np.arange(len(resource_ids)),
+            [len(schedule.resources[resource_id]) for resource_id in resource_ids]
+        )
+
+        axis = sorted({(result.start_time, result.end_time) for result in results})
+        position = {start: i for i, (start, _) in enumerate(axis)}
+        cols = np.array([position[result.start_time] for result in results], dtype=int)
+
+        shape = (len(resource_ids), len(axis))
+        power = np.full(shape, np.nan)
+        soc = np.full(shape, np.nan)
+        power[rows, cols] = [result.target_power for result in results]
+        soc[rows, cols] = [
+            result.expected_soc if result.expected_soc is not None else np.nan
+            for result in results
+        ]
+
+        # A resource with two results for the same interval breaks continuity
+        cells = rows * max(len(axis), 1) + cols
+        unique_cells, counts = np.unique(cells, return_counts=True)
+        duplicate_rows = np.unique(unique_cells[counts > 1] // max(len(axis), 1))
+
+        return cls(
+            resource_ids=resource_ids,
+            interval_starts=[start for start, _ in axis],
+            starts=_epoch_seconds([start for start, _ in axis]),
+            ends=_epoch_seconds([end for _, end in axis]),
+            power=power,
+            soc=soc,
+            flagged={
+                (int(row), int(col)): list(result.constraints_violated)
+                for row, col, result in zip(rows, cols, results)
+                if result.constraints_violated
+            },
+            duplicate_rows=duplicate_rows,
+            grid_services_provided=schedule.grid_services_provided
+        )
+
+@dataclass
+class _ConstraintArrays:
+    """Resource constraints aligned with trajectory rows, NaN where unknown"""
+    min_power: np.ndarray
+    max_power: np.ndarray
+    idle_min_power: np.ndarray
+    idle_max_power: np.ndarray
+    ramp_up: np.ndarray
+    ramp_down: np.ndarray
+    min_soc: np.ndarray
+    max_soc: np.ndarray
+    grid_limit: np.ndarray
+    unavailable: np.ndarray
+    maintenance: List[Tuple[int, float, float]]  # (row, start, end) in epoch seconds
+
+    @classmethod
+    def build(cls, resource_ids: List[str], resources: List[ResourceState]) -> "_ConstraintArrays":
+        by_id = {resource.resource_id: resource for resource in resources}
+        states = [by_id.get(resource_id) for resource_id in resource_ids]
+
+        # One pass over the resources, None limits become NaN
+        fields = np.array([
+            (
+                state.constraints.ramp_up_rate,
+                state.constraints.ramp_down_rate,
+                state.constraints.grid_connection_limit,
+                not state.is_available or state.maintenance_mode
+            ) if state is not None else (None,) * 3 + (False,)
+            for state in states
+        ], dtype=float).reshape(len(states), 4)
+        ramp_up, ramp_down, grid_limit = fields[:, :3].T
+        unavailable = fields[:, 3] > 0
+
+        # Power and SOC bounds in the optimizers' sign convention
+        known = [row for row, state in enumerate(states) if state is not None]
+        known_states = [states[row] for row in known]
+        bounds = np.full((6, len(states)), np.nan)
+        if known:
+            bounds[:, known] = [
+                *power_bounds(known_states, rated=True),
+                *power_bounds(known_states),
+                *soc_bounds(known_states)
+            ]
+        min_power, max_power, idle_min_power, idle_max_power, min_soc, max_soc = bounds
+
+        maintenance = []
+        for row, state in enumerate(states):
+            for window in (state.constraints.maintenance_window or []) if state else []:
+                start = window.get("start", window.get("start_time"))
+                end = window.get("end", window.get("end_time"))
+                if start is not None and end is not None:
+                    maintenance.append((row, *_epoch_seconds([start, end])))
+
+        return cls(
+            min_power=min_power,
+            max_power=max_power,
+            idle_min_power=idle_min_power,
+            idle_max_power=idle_max_power,
+            ramp_up=ramp_up,
+            ramp_down=ramp_down,
+            min_soc=min_soc,
+            max_soc=max_soc,
+            grid_limit=grid_limit,
+            unavailable=unavailable,
+            maintenance=maintenance
+        )
+
+def validate_trajectories(
+    trajectories: ResourceTrajectories,
+    resources: Optional[List[ResourceState]] = None,
+    tolerance: float = 1e-6,
+    max_violations: int = 1000
+) -> ScheduleValidationReport:
+    """Check every constraint for every resource and interval with array operations.
+
+    Without ``resources`` only time continuity, results already flagged with
+    violations and negative grid service totals are checked. Ramp rates are
+    per minute, scaled by the interval length. ``ADVISORY_FLAGS`` are counted
+    in ``warnings`` and do not make the schedule invalid.
+    """
+    power = trajectories.power
+    n_resources, n_intervals = power.shape
+    checks: List[Tuple[str, np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]] = []
+
+    # Continuity: consecutive results of a resource must meet end to start
+    present = ~np.isnan(power)
+    discontinuity = np.zeros(power.shape, dtype=bool)
+    if n_intervals > 1:
+        # Last interval each resource had a result in, before every interval
+        previous = np.maximum.accumulate(np.where(present, np.arange(n_intervals), -1), axis=1)[:, :-1]
+        discontinuity[:, 1:] = present[:, 1:] & (previous >= 0) & (
+            trajectories.ends[np.maximum(previous, 0)] != trajectories.starts[None, 1:]
+        )
+    if len(trajectories.duplicate_rows):
+        first_col = np.argmax(~np.isnan(power[trajectories.duplicate_rows]), axis=1)
+        discontinuity[trajectories.duplicate_rows, first_col] = True
+    checks.append(("time_discontinuity", discontinuity, None, None))
+
+    if resources:
+        limits = _ConstraintArrays.build(trajectories.resource_ids, resources)
+        with np.errstate(invalid="ignore"):
+            checks.append(("max_power_exceeded", power > limits.max_power[:, None] + tolerance, power, limits.max_power[:, None]))
+            checks.append(("min_power_exceeded", power < limits.min_power[:, None] - tolerance, power, limits.min_power[:, None]))
+
+            magnitude = np.abs(power)
+            checks.append((
+                "grid_connection_limit_exceeded",
+                magnitude > limits.grid_limit[:, None] + tolerance,
+                magnitude, limits.grid_limit[:, None]
+            ))
+            # Unavailable resources may still pay back demand response already owed
+            checks.append((
+                "resource_unavailable",
+                limits.unavailable[:, None] & (
+                    (power > limits.idle_max_power[:, None] + tolerance) |
+                    (power < limits.idle_min_power[:, None] - tolerance)
+                ),
+                power, np.zeros((n_resources, 1))
+            ))
+
+            soc = trajectories.soc
+            checks.append(("soc_below_min", soc < limits.min_soc[:, None] - tolerance, soc, limits.min_soc[:, None]))
+            checks.append(("soc_above_max", soc > limits.max_soc[:, None] + tolerance, soc, limits.max_soc[:, None]))
+
+            if n_intervals > 1:
+                minutes = (trajectories.ends - trajectories.starts)[1:] / 60
+                change = np.zeros(power.shape)
+                change[:, 1:] = np.diff(power, axis=1)
+                up_limit = np.zeros(power.shape)
+                up_limit[:, 1:] = limits.ramp_up[:, None] * minutes[None, :]
+                down_limit = np.zeros(power.shape)
+                down_limit[:, 1:] = limits.ramp_down[:, None] * minutes[None, :]
+                ramp_up = np.zeros(power.shape, dtype=bool)
+                ramp_up[:, 1:] = change[:, 1:] > up_limit[:, 1:] + tolerance
+                ramp_down = np.zeros(power.shape, dtype=bool)
+                ramp_down[:, 1:] = -change[:, 1:] > down_limit[:, 1:] + tolerance
+                checks.append(("ramp_up_exceeded", ramp_up, change, up_limit))
+                checks.append(("ramp_down_exceeded", ramp_down, -change, down_limit))
+
+        if limits.maintenance:
+            window_rows, window_starts, window_ends = map(np.array, zip(*limits.maintenance))
+            overlap = (
+                (trajectories.starts[None, :] < window_ends[:, None]) &
+                (trajectories.ends[None, :] > window_starts[:, None])
+            )
+            in_window = np.zeros(power.shape, dtype=bool)
+            window_index, overlap_cols = np.nonzero(overlap)
+            in_window[window_rows[window_index].astype(int), overlap_cols] = True
+            checks.append((
+                "maintenance_window",
+                in_window & (np.abs(np.nan_to_num(power)) > tolerance),
+                power, np.zeros((n_resources, 1))
+            ))
+
+    counts: Dict[str, int] = {}
+    warnings: Dict[str, int] = {}
+    violations: List[ConstraintViolation] = []
+
+    def record(constraint: str, resource_id=None, interval_start=None, value=None, limit=None):
+        counts[constraint] = counts.get(constraint, 0) + 1
+        if len(violations) < max_violations:
+            violations.append(ConstraintViolation(
+                resource_id=resource_id,
+                interval_start=interval_start,
+                constraint=constraint,
+                value=value,
+                limit=limit
+            ))
+
+    for constraint, mask, values, limit in checks:
+        if not mask.any():
+            continue
+        violation_rows, violation_cols = np.nonzero(mask)
+        counts[constraint] = counts.get(constraint, 0) + len(violation_rows)
+        room = max(max_violations - len(violations), 0)
+        for row, col in zip(violation_rows[:room].tolist(), violation_cols[:room].tolist()):
+            violations.append(ConstraintViolation(
+                resource_id=trajectories.resource_ids[row],
+                interval_start=trajectories.interval_starts[col],
+                constraint=constraint,
+                value=float(values[row, col]) if values is not None else None,
+                limit=float(np.broadcast_to(limit, power.shape)[row, col]) if limit is not None else None
+            ))
+
+    for (row, col), flags in trajectories.flagged.items():
+        for flag in flags:
+            if flag in ADVISORY_FLAGS:
+                warnings[flag] = warnings.get(flag, 0) + 1
+            else:
+                record(flag, trajectories.resource_ids[row], trajectories.interval_starts[col])
+
+    for service, amount in trajectories.grid_services_provided.items():
+        if amount < 0:
+            record(f"negative_{GridService(service).value}_total", value=amount, limit=0.0)
+
+    counts = {constraint: count for constraint, count in counts.items() if count}
+    violation_count = sum(counts.values())
+    return ScheduleValidationReport(
+        valid=violation_count == 0,
+        resources_checked=n_resources,
+        intervals_checked=n_intervals,
+        violation_count=violation_count,
+        counts=counts,
+        violations=violations,
+        truncated=violation_count > len(violations),
+        warnings=warnings
+    )
+
+def validate_dispatch_schedule(
+    schedule: DispatchSchedule,
+    resources: Optional[List[ResourceState]] = None,
+    tolerance: float = 1e-6,
+    max_violations: int = 1000
+) -> ScheduleValidationReport:
+    """Validate a DispatchSchedule"""
+    return validate_trajectories(
+        ResourceTrajectories.from_schedule(schedule), resources, tolerance, max_violations
+    )
+
+def validate_columnar_schedule(
+    schedule: ColumnarSchedule,
+    resources: Optional[List[ResourceState]] = None,
+    tolerance: float = 1e-6,
+    max_violations: int = 1000
+) -> ScheduleValidationReport:
+    """Validate a ColumnarSchedule without materializing its results"""
+    return validate_trajectories(
+        ResourceTrajectories.from_columnar(schedule), resources, tolerance, max_violations
+    )
@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from .instrumentation import profiled_thread
+
+class RequestClass(str, Enum):
+    REAL_TIME = "real_time"
+    INTRADAY = "intraday"
+    DAY_AHEAD = "day_ahead"
+
+# Lower runs first
+CLASS_PRIORITY = {
+    RequestClass.REAL_TIME: 0,
+    RequestClass.INTRADAY: 1,
+    RequestClass.DAY_AHEAD: 2
+}
+
+# Seconds a request may wait and run when it carries no deadline of its own
+DEFAULT_DEADLINES = {
+    RequestClass.REAL_TIME: 5.0,
+    RequestClass.INTRADAY: 60.0,
+    RequestClass.DAY_AHEAD: 900.0
+}
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+QUEUE_WAIT = Histogram(
+    'dispatch_queue_wait_seconds',
+    'Time optimization requests wait for a solver slot',
+    ['request_class'],
+    buckets=LATENCY_BUCKETS
+)
+SOLVE_LATENCY = Histogram(
+    'dispatch_solve_seconds',
+    'Time optimization requests spend solving once admitted',
+    ['request_class'],
+    buckets=LATENCY_BUCKETS
+)
+QUEUE_DEPTH = Gauge('dispatch_queue_depth', 'Optimization requests waiting for a solver slot', ['request_class'])
+RUNNING = Gauge('dispatch_running_solves', 'Optimization requests currently solving', ['request_class'])
+REJECTED = Counter(
+    'dispatch_requests_rejected_total',
+    'Optimization requests rejected or shed by admission control',
+    ['request_class', 'reason']  # queue_full, shed, deadline_expired
+)
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused, shed from the queue or misses its deadline"""
+
+    def __init__(self, request_class: RequestClass, reason: str):
+        self.request_class = request_class
+        self.reason = reason
+        super().__init__(f"{request_class.value} request rejected: {reason}")
+
+@dataclass(order=True)
+class _Job:
+    sort_key: Tuple[int, float, int]  # priority, deadline, arrival order
+    request_class: RequestClass = field(compare=False)
+    solve: Callable[[], Any] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    deadline: float = field(compare=False)  # monotonic seconds
+    context: contextvars.Context = field(compare=False)  # request context the solve runs in
+    expiry: Optional[asyncio.TimerHandle] = field(default=None, compare=False)
+
+def _seconds_until(deadline: datetime) -> float:
+    """Seconds from now until a deadline, naive values taken as UTC"""
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline.timestamp() - time.time()
+
+class DispatchAdmissionQueue:
+    """Admission control and deadline-aware scheduling in front of the optimizer.
+
+    Requests wait in a priority queue ordered by class, then earliest
+    deadline. Solves run on a bounded thread pool so the event loop keeps
+    admitting requests while solvers run. ``reserved_workers`` solver slots
+    are kept for real-time requests, so they overtake queued work and never
+    wait behind running day-ahead solves. When the queue is full, the least
+    urgent queued request is shed if the new one outranks it, otherwise the
+    new request is rejected. Queued requests whose deadline passes are
+    dropped before they reach a solver.
+    """
+
+    def __init__(self, max_depth: int = 64, workers: int = 2, reserved_workers: int = 1):
+        if workers < 1:
+            raise ValueError("At least one solver worker is required")
+        self.max_depth = max_depth
+        self.workers = workers
+        self.reserved_workers = min(reserved_workers, workers - 1)
+        self._queue: List[_Job] = []
+        self._running: Dict[RequestClass, int] = {request_class: 0 for request_class in RequestClass}
+        self._sequence = itertools.count()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dispatch-solve")
+
+    async def submit(
+        self,
+        request_class: RequestClass,
+        solve: Callable[[], Any],
+        deadline: Optional[datetime] = None
+    ) -> Any:
+        """Queue a blocking solve and return its result once a solver slot has run it"""
+        loop = asyncio.get_running_loop()
+        timeout = _seconds_until(deadline) if deadline else DEFAULT_DEADLINES[request_class]
+        if timeout <= 0:
+            self._reject(request_class, "deadline_expired")
+
+        now = time.monotonic()
+        job = _Job(
+            sort_key=(CLASS_PRIORITY[request_class], now + timeout, next(self._sequence)),
+            request_class=request_class,
+            solve=solve,
+            future=loop.create_future(),
+            enqueued_at=now,
+            deadline=now + timeout,
+            context=contextvars.copy_context()
+        )
+
+        if len(self._queue) >= self.max_depth:
+            victim = max(self._queue)
+            if victim.sort_key < job.sort_key:
+                self._reject(request_class, "queue_full")
+            self._remove(victim)
+            self._fail(victim, "shed")
+
+        heapq.heappush(self._queue, job)
+        QUEUE_DEPTH.labels(request_class=request_class.value).inc()
+        job.expiry = loop.call_later(timeout, self._expire, job)
+        self._dispatch()
+
+        try:
+            return await asyncio.shield(job.future)
+        finally:
+            # A caller that gave up no longer needs its queued solve
+            if job in self._queue:
+                self._remove(job)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queued and running requests per class"""
+        return {
+            request_class.value: {
+                "queued": sum(1 for job in self._queue if job.request_class == request_class),
+                "running": self._running[request_class]
+            }
+            for request_class in RequestClass
+        }
+
+    def _has_slot(self, request_class: RequestClass) -> bool:
+        running = sum(self._running.values())
+        if request_class == RequestClass.REAL_TIME:
+            return running < self.workers
+        return running < self.workers - self.reserved_workers
+
+    def _dispatch(self):
+        """Start queued jobs in priority order while solver slots are free"""
+        while self._queue and self._has_slot(self._queue[0].request_class):
+            job = heapq.heappop(self._queue)
+            QUEUE_DEPTH.labels(request_class=job.request_class.value).dec()
+            job.expiry.cancel()
+            QUEUE_WAIT.labels(request_class=job.request_class.value).observe(time.monotonic() - job.enqueued_at)
+
+            self._running[job.request_class] += 1
+            RUNNING.labels(request_class=job.request_class.value).inc()
+            started = time.monotonic()
+            task = asyncio.get_running_loop().run_in_executor(self._executor, job.context.run, self._run, job)
+            task.add_done_callback(lambda task, job=job, started=started: self._finish(job, task, started))
+
+    @staticmethod
+    def _run(job: _Job) -> Any:
+        with profiled_thread():
+            return job.solve()
+
+    def _finish(self, job: _Job, task: asyncio.Future, started: float):
+        self._running[job.request_class] -= 1
+        RUNNING.labels(request_class=job.request_class.value).dec()
+        SOLVE_LATENCY.labels(request_class=job.request_class.value).observe(time.monotonic() - started)
+        if not job.future.done():
+            if task.exception() is not None:
+                job.future.set_exception(task.exception())
+            else:
+                job.future.set_result(task.result())
+        self._dispatch()
+
+    def _expire(self, job: _Job):
+        if job in self._queue:
+            self._remove(job)
+            self._fail(job, "deadline_expired")
+
+    def _remove(self, job: _Job):
+        self._queue.remove(job)
+        heapq.heapify(self._queue)
+        QUEUE_DEPTH.labels(request_class=job.request_class.value).dec()
+        if job.expiry is not None:
+            job.expiry.cancel()
+
+    def _fail(self, job: _Job, reason: str):
+        REJECTED.labels(request_class=job.request_class.value, reason=reason).inc()
+        if not job.future.done():
+            job.future.set_exception(AdmissionRejected(job.request_class, reason))
+
+    def _reject(self, request_class: RequestClass, reason: str):
+        REJECTED.labels(request_class=request_class.value, reason=reason).inc()
+        raise AdmissionRejected(request_class, reason)
+
+_admission_queue: Optional[DispatchAdmissionQueue] = None
+
+def get_admission_queue() -> DispatchAdmissionQueue:
+    """Get the process-wide optimization admission queue"""
+    global _admission_queue
+    if _admission_queue is None:
+        _admission_queue = DispatchAdmissionQueue(
+            max_depth=int(os.getenv("DISPATCH_QUEUE_DEPTH", "64")),
+            workers=int(os.getenv("DISPATCH_SOLVER_WORKERS", "2")),
+            reserved_workers=int(os.getenv("DISPATCH_REALTIME_RESERVED_WORKERS", "1"))
+        )
+    return _admission_queue
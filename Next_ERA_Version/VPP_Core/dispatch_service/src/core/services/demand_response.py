@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from pulp import LpMaximize, LpProblem, LpVariable, lpSum, value
+from ..models.optimization import OptimizationObjective, ResourceState
+from ..models.resource_limits import DEFAULT_DR_DURATION_HOURS, power_bounds, soc_bounds
+
+@dataclass
+class VirtualBatteryFleet:
+    """Demand-response loads modelled as virtual batteries, one entry per load.
+
+    Curtailing a load (positive power) builds up owed energy that has to be
+    consumed later (negative power). Every MWh curtailed is owed ``rebound``
+    times over, so the payback exceeds the deferral for loads with losses
+    such as thermal drift.
+    """
+    resource_ids: List[str]
+    curtail_power: np.ndarray    # maximum load reduction (MW)
+    payback_power: np.ndarray    # maximum load increase while paying back (MW)
+    owed_capacity: np.ndarray    # maximum owed energy (MWh)
+    rebound: np.ndarray          # owed energy per MWh curtailed
+    initial_owed: np.ndarray     # owed energy at the start of the horizon (MWh)
+    activation_cost: np.ndarray  # cost per MWh curtailed
+
+    @classmethod
+    def from_resources(
+        cls,
+        resources: List[ResourceState],
+        default_duration_hours: float = DEFAULT_DR_DURATION_HOURS
+    ) -> "VirtualBatteryFleet":
+        """Build envelopes from resource constraints.
+
+        Power and owed energy limits come from ``power_bounds`` and
+        ``soc_bounds``, so schedules validate against the same limits.
+        ``efficiency`` sets the rebound as 1 / efficiency and
+        ``state_of_charge`` is the energy still owed.
+        """
+        efficiency = np.array([resource.constraints.efficiency for resource in resources], dtype=float)
+        owed = np.array([resource.state_of_charge or 0.0 for resource in resources], dtype=float)
+        cost = np.array([resource.constraints.cycle_cost or 0.0 for resource in resources], dtype=float)
+        lower, upper = power_bounds(resources)
+        _, owed_capacity = soc_bounds(resources, default_duration_hours)
+
+        return cls(
+            resource_ids=[resource.resource_id for resource in resources],
+            curtail_power=upper,
+            payback_power=-lower,
+            owed_capacity=owed_capacity,
+            rebound=1.0 / efficiency,
+            # Owed energy is paid back even by unavailable loads
+            initial_owed=np.clip(owed, 0.0, None),
+            activation_cost=cost
+        )
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+    def features(self) -> np.ndarray:
+        """Standardized per-load features that drive the aggregate's behaviour"""
+        curtail = np.maximum(self.curtail_power, 1e-9)
+        features = np.column_stack([
+            np.log1p(self.owed_capacity / curtail),  # duration
+            self.payback_power / curtail,
+            self.rebound,
+            np.where(self.owed_capacity > 0, self.initial_owed / np.maximum(self.owed_capacity, 1e-9), 0.0),
+            self.activation_cost
+        ])
+        std = features.std(axis=0)
+        return (features - features.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+    def aggregate(self, labels: np.ndarray, n_clusters: int) -> "VirtualBatteryFleet":
+        """Sum the envelopes of every cluster into one virtual battery per cluster"""
+        def total(values: np.ndarray) -> np.ndarray:
+            return np.bincount(labels, weights=values, minlength=n_clusters)
+
+        weight = total(self.curtail_power)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rebound = np.where(weight > 0, total(self.rebound * self.curtail_power) / weight, 1.0)
+            activation_cost = np.where(weight > 0, total(self.activation_cost * self.curtail_power) / weight, 0.0)
+
+        return VirtualBatteryFleet(
+            resource_ids=[f"cluster_{k}" for k in range(n_clusters)],
+            curtail_power=weight,
+            payback_power=total(self.payback_power),
+            owed_capacity=total(self.owed_capacity),
+            rebound=rebound,
+            initial_owed=total(self.initial_owed),
+            activation_cost=activation_cost
+        )
+
+@dataclass
+class DemandResponsePlan:
+    """Per-load schedule with its cluster assignment"""
+    power: np.ndarray          # (loads x intervals), positive is curtailment
+    owed_energy: np.ndarray    # (loads x intervals), owed energy at interval start
+    labels: np.ndarray         # cluster of every load
+    cluster_power: np.ndarray  # (clusters x intervals) optimized aggregate power
+    shortfall_mwh: float       # aggregate energy the disaggregation could not place
+
+def kmeans(
+    features: np.ndarray,
+    n_clusters: int,
+    iterations: int = 10,
+    seed: Optional[int] = 0
+) -> np.ndarray:
+    """Plain k-means on feature rows, returns the cluster label of each row"""
+    n_clusters = min(n_clusters, len(features))
+    rng = np.random.default_rng(seed)
+    centers = features[rng.choice(len(features), size=n_clusters, replace=False)]
+    labels = np.zeros(len(features), dtype=int)
+
+    for iteration in range(iterations):
+        # |x - c|^2 without materializing (rows x clusters x features)
+        distances = (
+            (features ** 2).sum(axis=1)[:, None] -
+            2 * features @ centers.T +
+            (centers ** 2).sum(axis=1)[None, :]
+        )
+        new_labels = distances.argmin(axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, features)
+        nonempty = counts > 0
+        centers[nonempty] = sums[nonempty] / counts[nonempty, None]
+
+    return labels
+
+class DemandResponseOptimizer:
+    """Optimizes a demand-response portfolio through clustered virtual batteries.
+
+    Loads are clustered on their envelope shape, each cluster is optimized as
+    one virtual battery in a single LP (clusters x intervals), and the
+    aggregate schedules are split back onto the loads in proportion to their
+    remaining headroom.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int = 16,
+        kmeans_iterations: int = 10,
+        default_duration_hours: float = 2.0,
+        solve: Optional[Callable[[LpProblem], int]] = None
+    ):
+        self.n_clusters = n_clusters
+        self.solve = solve or (lambda prob: prob.solve())
+        self.kmeans_iterations = kmeans_iterations
+        self.default_duration_hours = default_duration_hours
+
+    def optimize(
+        self,
+        resources: List[ResourceState],
+        prices: np.ndarray,
+        hours: np.ndarray,
+        optimization_objective: OptimizationObjective
+    ) -> DemandResponsePlan:
+        """Schedule every load against interval prices"""
+        fleet = VirtualBatteryFleet.from_resources(resources, self.default_duration_hours)
+        labels = kmeans(fleet.features(), self.n_clusters, self.kmeans_iterations)
+        n_clusters = int(labels.max()) + 1
+        clusters = fleet.aggregate(labels, n_clusters)
+
+        cluster_power = self._optimize_clusters(clusters, np.nan_to_num(prices), hours, optimization_objective)
+        power, owed = self._disaggregate(fleet, labels, cluster_power, hours)
+        delivered = np.zeros_like(cluster_power)
+        for t in range(len(hours)):
+            delivered[:, t] = np.bincount(labels, weights=power[:, t], minlength=n_clusters)
+        shortfall = float((np.abs(cluster_power - delivered) @ hours).sum())
+
+        return DemandResponsePlan(
+            power=power,
+            owed_energy=owed,
+            labels=labels,
+            cluster_power=cluster_power,
+            shortfall_mwh=shortfall
+        )
+
+    def _optimize_clusters(
+        self,
+        clusters: VirtualBatteryFleet,
+        prices: np.ndarray,
+        hours: np.ndarray,
+        optimization_objective: OptimizationObjective
+    ) -> np.ndarray:
+        """Virtual battery LP over every cluster and interval"""
+        n_clusters, n_intervals = len(clusters), len(hours)
+        prob = LpProblem("Demand_Response_Optimization", LpMaximize)
+
+        curtail = {}
+        payback = {}
+        owed = {}
+        for k in range(n_clusters):
+            for t in range(n_intervals):
+                curtail[(k, t)] = LpVariable(f"curtail_{k}_{t}", lowBound=0, upBound=clusters.curtail_power[k])
+                payback[(k, t)] = LpVariable(f"payback_{k}_{t}", lowBound=0, upBound=clusters.payback_power[k])
+            for t in range(n_intervals + 1):
+                owed[(k, t)] = LpVariable(f"owed_{k}_{t}", lowBound=0, upBound=max(clusters.owed_capacity[k], clusters.initial_owed[k]))
+
+        prob += lpSum(
+            optimization_objective.revenue_weight * prices[t] * hours[t] * (curtail[(k, t)] - payback[(k, t)]) -
+            clusters.activation_cost[k] * hours[t] * curtail[(k, t)]
+            for k in range(n_clusters)
+            for t in range(n_intervals)
+        )
+
+        for k in range(n_clusters):
+            prob += owed[(k, 0)] == clusters.initial_owed[k]
+            for t in range(n_intervals):
+                prob += (
+                    owed[(k, t + 1)] ==
+                    owed[(k, t)] +
+                    clusters.rebound[k] * hours[t] * curtail[(k, t)] -
+                    hours[t] * payback[(k, t)]
+                )
+            # Rebound has to be repaid within the horizon where the payback envelope allows it
+            prob += owed[(k, n_intervals)] <= max(
+                clusters.initial_owed[k] - clusters.payback_power[k] * hours.sum(), 0.0
+            )
+
+        self.solve(prob)
+
+        return np.array([
+            [(value(curtail[(k, t)]) or 0.0) - (value(payback[(k, t)]) or 0.0) for t in range(n_intervals)]
+            for k in range(n_clusters)
+        ]).reshape(n_clusters, n_intervals)
+
+    def _disaggregate(
+        self,
+        fleet: VirtualBatteryFleet,
+        labels: np.ndarray,
+        cluster_power: np.ndarray,
+        hours: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Split cluster schedules onto loads in proportion to per-load headroom"""
+        n_clusters, n_intervals = cluster_power.shape
+        power = np.zeros((len(fleet), n_intervals))
+        owed_energy = np.zeros((len(fleet), n_intervals))
+        owed = fleet.initial_owed.copy()
+
+        for t in range(n_intervals):
+            owed_energy[:, t] = owed
+            target = cluster_power[:, t]
+
+            # Curtailment limited by power and by room left for owed energy
+            headroom = np.maximum(fleet.owed_capacity - owed, 0.0) / (fleet.rebound * hours[t])
+            curtail_limit = np.minimum(fleet.curtail_power, headroom)
+            # Payback limited by power and by what is still owed
+            payback_limit = np.minimum(fleet.payback_power, owed / hours[t])
+
+            curtail = self._allocate(np.maximum(target, 0.0), curtail_limit, labels, n_clusters)
+            payback = self._allocate(np.maximum(-target, 0.0), payback_limit, labels, n_clusters)
+
+            power[:, t] = curtail - payback
+            owed = np.maximum(owed + fleet.rebound * hours[t] * curtail - hours[t] * payback, 0.0)
+
+        return power, owed_energy
+
+    @staticmethod
+    def _allocate(
+        target: np.ndarray,
+        limit: np.ndarray,
+        labels: np.ndarray,
+        n_clusters: int
+    ) -> np.ndarray:
+        """Spread each cluster's target over its loads pro rata to their limits.
+
+        Every load takes the same fraction of its own limit, so no load is
+        pushed past it; a cluster target beyond the summed limits is capped.
+        """
+        available = np.bincount(labels, weights=limit, minlength=n_clusters)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.where(available > 0, np.minimum(target / available, 1.0), 0.0)
+        return limit * fraction[labels]
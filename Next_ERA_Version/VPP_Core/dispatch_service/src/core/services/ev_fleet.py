@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from pulp import LpMinimize, LpProblem, LpVariable, lpSum, value
+from ..models.optimization import ResourceState
+from ..models.resource_limits import power_bounds
+
+@dataclass
+class EVSessionArrays:
+    """Charging sessions of every site as flat arrays"""
+    session_ids: List[str]
+    site: np.ndarray          # site index of every session
+    max_power: np.ndarray     # (sessions,) MW
+    required: np.ndarray      # (sessions,) MWh still to deliver
+    departure: np.ndarray     # (sessions,) epoch seconds
+    max_energy: np.ndarray    # (sessions x intervals) MWh deliverable per interval while plugged in
+
+    @classmethod
+    def from_sites(
+        cls,
+        sites: List[ResourceState],
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> "EVSessionArrays":
+        sessions = [(n, session) for n, site in enumerate(sites) for session in site.ev_sessions]
+        starts = np.array([start_time.timestamp() for start_time, _ in intervals])
+        ends = np.array([end_time.timestamp() for _, end_time in intervals])
+        arrival = np.array([session.arrival_time.timestamp() for _, session in sessions])
+        departure = np.array([session.departure_time.timestamp() for _, session in sessions])
+        max_power = np.array([session.max_power for _, session in sessions])
+
+        # Plugged-in time of every session in every interval, in hours
+        if sessions:
+            plugged = np.clip(
+                np.minimum(ends[None, :], departure[:, None]) - np.maximum(starts[None, :], arrival[:, None]),
+                0.0, None
+            ) / 3600
+        else:
+            plugged = np.zeros((0, len(intervals)))
+
+        return cls(
+            session_ids=[session.session_id for _, session in sessions],
+            site=np.array([n for n, _ in sessions], dtype=int),
+            max_power=max_power,
+            required=np.array([session.energy_required for _, session in sessions]),
+            departure=departure,
+            max_energy=max_power[:, None] * plugged
+        )
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+@dataclass
+class EVFleetPlan:
+    """Site charging schedules and their allocation to sessions"""
+    site_energy: np.ndarray     # (sites x intervals) MWh charged
+    session_energy: np.ndarray  # (sessions x intervals) MWh charged
+    unmet_energy: np.ndarray    # (sessions,) MWh not delivered before departure
+    sessions: EVSessionArrays
+
+class EVFleetScheduler:
+    """Schedules EV charging sites from aggregated session envelopes.
+
+    All sessions at a site are summarized by cumulative energy envelopes: the
+    upper one charges every session as early as possible, the lower one as
+    late as possible. A site-level LP picks the cheapest cumulative charging
+    path between them, and a least-laxity-first pass hands each interval's
+    site energy to the sessions.
+    """
+
+    def __init__(self, solve: Optional[Callable[[LpProblem], int]] = None):
+        self.solve = solve or (lambda prob: prob.solve())
+
+    def schedule(
+        self,
+        sites: List[ResourceState],
+        intervals: List[Tuple[datetime, datetime]],
+        prices: np.ndarray
+    ) -> EVFleetPlan:
+        """Schedule charging for every site against interval prices"""
+        sessions = EVSessionArrays.from_sites(sites, intervals)
+        hours = np.array([(end_time - start_time).total_seconds() / 3600 for start_time, end_time in intervals])
+        site_limit = -power_bounds(sites)[0]
+        site_energy = self._optimize_sites(sessions, site_limit, hours, np.nan_to_num(prices))
+        session_energy = self._allocate(sessions, site_energy, site_limit, intervals)
+
+        return EVFleetPlan(
+            site_energy=self._site_totals(sessions, session_energy, len(sites)),
+            session_energy=session_energy,
+            unmet_energy=np.maximum(sessions.required - session_energy.sum(axis=1), 0.0),
+            sessions=sessions
+        )
+
+    def envelopes(
+        self,
+        sessions: EVSessionArrays,
+        n_sites: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cumulative lower and upper energy envelopes and per-interval capacity per site"""
+        deliverable = np.minimum(sessions.required, sessions.max_energy.sum(axis=1))
+        cumulative = np.cumsum(sessions.max_energy, axis=1)
+        upper = np.minimum(deliverable[:, None], cumulative)
+        lower = np.maximum(deliverable[:, None] - (cumulative[:, -1:] - cumulative), 0.0) if len(sessions) else upper
+
+        return (
+            self._site_totals(sessions, lower, n_sites),
+            self._site_totals(sessions, upper, n_sites),
+            self._site_totals(sessions, sessions.max_energy, n_sites)
+        )
+
+    def _optimize_sites(
+        self,
+        sessions: EVSessionArrays,
+        site_limit: np.ndarray,
+        hours: np.ndarray,
+        prices: np.ndarray
+    ) -> np.ndarray:
+        """Cheapest site charging path within the envelopes"""
+        n_sites, n_intervals = len(site_limit), len(hours)
+        lower, upper, capacity = self.envelopes(sessions, n_sites)
+        capacity = np.minimum(capacity, site_limit[:, None] * hours[None, :])
+
+        prob = LpProblem("EV_Fleet_Optimization", LpMinimize)
+        charge = {}
+        cumulative = {}
+        for n in range(n_sites):
+            for t in range(n_intervals):
+                charge[(n, t)] = LpVariable(f"charge_{n}_{t}", lowBound=0, upBound=capacity[n, t])
+                # Envelopes may be unreachable under the site limit, so only bound what is reachable
+                reachable = capacity[n, :t + 1].sum()
+                cumulative[(n, t)] = LpVariable(
+                    f"cumulative_{n}_{t}",
+                    lowBound=min(lower[n, t], reachable),
+                    upBound=upper[n, t]
+                )
+                prob += cumulative[(n, t)] == (cumulative[(n, t - 1)] if t > 0 else 0) + charge[(n, t)]
+
+        # Cost, with a small preference for charging early when prices tie
+        prob += lpSum(
+            (prices[t] + 1e-6 * t) * charge[(n, t)]
+            for n in range(n_sites)
+            for t in range(n_intervals)
+        )
+        self.solve(prob)
+
+        return np.array([
+            [value(charge[(n, t)]) or 0.0 for t in range(n_intervals)]
+            for n in range(n_sites)
+        ]).reshape(n_sites, n_intervals)
+
+    def _allocate(
+        self,
+        sessions: EVSessionArrays,
+        site_energy: np.ndarray,
+        site_limit: np.ndarray,
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> np.ndarray:
+        """Least-laxity-first allocation of site energy to sessions, all sites at once.
+
+        The envelopes are a relaxation of the individual sessions, so site
+        energy that no plugged-in session can take is carried forward to the
+        next interval, up to the site limit.
+        """
+        session_energy = np.zeros_like(sessions.max_energy)
+        if not len(sessions):
+            return session_energy
+
+        remaining = sessions.required.copy()
+        carry = np.zeros(len(site_limit))
+        for t, (start_time, end_time) in enumerate(intervals):
+            hours = (end_time - start_time).total_seconds() / 3600
+            target = np.minimum(site_energy[:, t] + carry, site_limit * hours)
+            limit = np.minimum(sessions.max_energy[:, t], remaining)
+            # Slack hours if the session charged at full power from now on
+            laxity = (sessions.departure - start_time.timestamp()) / 3600 - remaining / sessions.max_power
+
+            order = np.lexsort((laxity, sessions.site))
+            site = sessions.site[order]
+            sorted_limit = limit[order]
+            before = np.cumsum(sorted_limit) - sorted_limit
+            # Energy taken by more urgent sessions at the same site
+            first = np.searchsorted(site, site, side="left")
+            taken = before - before[first]
+
+            allocated = np.clip(target[site] - taken, 0.0, sorted_limit)
+            session_energy[order, t] = allocated
+            remaining -= session_energy[:, t]
+            carry = site_energy[:, t] + carry - np.bincount(sessions.site, weights=session_energy[:, t], minlength=len(carry))
+
+        return session_energy
+
+    @staticmethod
+    def _site_totals(sessions: EVSessionArrays, values: np.ndarray, n_sites: int) -> np.ndarray:
+        """Sum (sessions x intervals) values per site"""
+        totals = np.zeros((n_sites, values.shape[1]))
+        np.add.at(totals, sessions.site, values)
+        return totals
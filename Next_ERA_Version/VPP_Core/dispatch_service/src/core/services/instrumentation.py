@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter as SampleCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from prometheus_client import Histogram
+
+STAGE_DURATION = Histogram(
+    'dispatch_stage_duration_seconds',
+    'Time spent in each stage of the dispatch hot path',
+    ['stage'],  # request_parsing, grouping, model_build, solve, result_extraction, ...
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+# Stage timings and profiler of the request being handled, when one is being tracked
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("dispatch_request_timings", default=None)
+_request_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("dispatch_request_profiler", default=None)
+
+def observe_stage(name: str, seconds: float):
+    """Record a stage duration, also against the current request when tracked"""
+    STAGE_DURATION.labels(stage=name).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block of the dispatch hot path"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+@contextmanager
+def track_request(profiler: Optional["SamplingProfiler"] = None) -> Iterator[Dict[str, float]]:
+    """Collect stage timings, and optionally samples, for the current request"""
+    timings: Dict[str, float] = {}
+    timings_token = _request_timings.set(timings)
+    profiler_token = _request_profiler.set(profiler)
+    if profiler is not None:
+        profiler.start()
+    try:
+        yield timings
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        _request_profiler.reset(profiler_token)
+        _request_timings.reset(timings_token)
+
+@contextmanager
+def profiled_thread() -> Iterator[None]:
+    """Include the current thread in the request's profile while the block runs.
+
+    Solves run on worker threads; callers that hand work to a thread run it
+    in a copy of the request context and wrap it with this.
+    """
+    profiler = _request_profiler.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
+
+class SamplingProfiler:
+    """Samples the stacks of selected threads from a background thread.
+
+    Stacks are kept in collapsed form (``outer;...;inner count``), which
+    flamegraph tools read directly. Only threads working on the profiled
+    request are sampled, so concurrent requests stay out of the profile.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: SampleCounter = SampleCounter()
+        self.sample_count = 0
+        self.duration = 0.0
+        self._threads: Set[int] = {threading.get_ident()}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def add_thread(self, thread_id: int):
+        with self._lock:
+            self._threads.add(thread_id)
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="dispatch-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[self._collapse(frame)] += 1
+            self.sample_count += 1
+
+    def _collapse(self, frame) -> str:
+        stack: List[str] = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def collapsed(self) -> str:
+        """Profile in collapsed stack format"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top_functions(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Functions with the most samples at the top of the stack"""
+        leaves: SampleCounter = SampleCounter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def write(self, directory: str, name: str) -> str:
+        """Write the collapsed profile to ``directory`` and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.collapsed")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        return path
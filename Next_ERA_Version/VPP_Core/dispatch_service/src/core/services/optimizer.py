@@ -1,9 +1,15 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 import numpy as np
 from pulp import *
 from scipy.optimize import minimize
 import pandas as pd
+import time
+from prometheus_client import Counter
+from ..models.columnar_schedule import ColumnarSchedule, make_result, paused_gc
+from ..models.resource_limits import power_bounds, soc_bounds
 from ..models.optimization import (
     ResourceState,
     MarketSignal,
@@ -11,7 +17,30 @@ from ..models.optimization import (
     DispatchSchedule,
     GridService,
     OptimizationObjective,
-    ResourceType
+    RedispatchReport,
+    ResourceType,
+    ScheduleUpdateReport,
+    StochasticDispatchReport
+)
+from .demand_response import DemandResponseOptimizer
+from .ev_fleet import EVFleetScheduler
+from .instrumentation import stage
+from .risk_engine import ScenarioRiskEngine
+from .scenario_reduction import reduce_scenarios, sample_price_scenarios
+from .solvers import SolverOptions, get_solver_backend
+
+# Resource types whose intervals are coupled (state of charge, deferred energy),
+# so a change anywhere in the horizon requires re-solving the whole horizon
+COUPLED_RESOURCE_TYPES = {
+    ResourceType.BATTERY,
+    ResourceType.DEMAND_RESPONSE,
+    ResourceType.EV_CHARGER
+}
+
+REFINEMENTS = Counter(
+    'dispatch_refinements_total',
+    'Background optimizations of heuristic anytime schedules',
+    ['outcome']  # refined, timeout, failed
 )
 
 class DispatchOptimizer:
@@ -25,6 +54,23 @@ class DispatchOptimizer:
         self.carbon_price = config.get('carbon_price', 0.0)
         self.grid_service_requirements = config.get('grid_service_requirements', {})
         self.simulator = simulator
+        self.solver_backend = get_solver_backend(config.get('solver', 'cbc'))
+        self.solver_options = SolverOptions.from_config(config.get('solver_options', {}))
+        self.risk_engine = ScenarioRiskEngine(
+            n_scenarios=config.get('risk_scenarios', 1000),
+            alpha=self.risk_tolerance,
+            chunk_size=config.get('risk_scenario_chunk_size', 4096),
+            seed=config.get('risk_seed', 0)
+        )
+        self.demand_response = DemandResponseOptimizer(
+            n_clusters=config.get('dr_clusters', 16),
+            kmeans_iterations=config.get('dr_kmeans_iterations', 10),
+            default_duration_hours=config.get('dr_default_duration_hours', 2.0),
+            solve=self._solve
+        )
+        self.ev_fleet = EVFleetScheduler(solve=self._solve)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._refinement_tasks: set = set()
         
     async def create_dispatch_schedule(
         self,
@@ -32,9 +78,14 @@ class DispatchOptimizer:
         market_signals: List[MarketSignal],
         start_time: datetime,
         end_time: datetime,
-        optimization_objective: Optional[OptimizationObjective] = None
+        optimization_objective: Optional[OptimizationObjective] = None,
+        heuristic: bool = False
     ) -> DispatchSchedule:
-        """Create optimal dispatch schedule for given resources and market conditions"""
+        """Create optimal dispatch schedule for given resources and market conditions.
+        
+        With ``heuristic`` set, the LPs are replaced by the vectorized
+        price-threshold heuristic, which answers in milliseconds.
+        """
         
         # Use default optimization objective if none provided
         if optimization_objective is None:
@@ -55,15 +106,17 @@ class DispatchOptimizer:
         )
         
         try:
-            # Group resources by type for coordinated optimization
-            resource_groups = self._group_resources(resources)
-            
-            # Calculate intervals
-            intervals = self._calculate_intervals(start_time, end_time)
+            with stage("grouping"):
+                # Group resources by type for coordinated optimization
+                resource_groups = self._group_resources(resources)
+                
+                # Calculate intervals
+                intervals = self._calculate_intervals(start_time, end_time)
             
             # Perform multi-interval optimization for each resource group
+            optimize_group = self._heuristic_resource_group if heuristic else self._optimize_resource_group
             for resource_type, group_resources in resource_groups.items():
-                group_schedule = self._optimize_resource_group(
+                group_schedule = optimize_group(
                     resource_type=resource_type,
                     resources=group_resources,
                     market_signals=market_signals,
@@ -73,19 +126,16 @@ class DispatchOptimizer:
                 
                 # Add group results to schedule
                 for resource_id, resource_schedule in group_schedule.items():
-                    schedule.resources[resource_id] = resource_schedule
-                    schedule.total_cost += sum(result.expected_cost for result in resource_schedule)
-                    schedule.total_revenue += sum(result.expected_revenue for result in resource_schedule)
-                    
-                    # Aggregate grid services
-                    for result in resource_schedule:
-                        for service, amount in result.grid_service_contribution.items():
-                            schedule.grid_services_provided[service] = (
-                                schedule.grid_services_provided.get(service, 0) + amount
-                            )
+                    self._add_resource_schedule(schedule, resource_id, resource_schedule)
+            
+            # Check the candidate schedule against the simulator
+            if self.simulator:
+                with stage("simulation"):
+                    self.validate_with_simulation(schedule)
             
             # Calculate risk metrics
-            schedule.risk_metrics = self._calculate_risk_metrics(schedule)
+            with stage("risk_metrics"):
+                schedule.risk_metrics = self._calculate_risk_metrics(schedule)
             
             # Calculate carbon impact
             schedule.carbon_savings = self._calculate_carbon_savings(schedule)
@@ -95,6 +145,679 @@ class DispatchOptimizer:
         except Exception as e:
             raise ValueError(f"Optimization failed: {str(e)}")
     
+    async def create_tiered_schedule(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        start_time: datetime,
+        end_time: datetime,
+        optimization_objective: Optional[OptimizationObjective] = None,
+        latency_budget: Optional[float] = None,
+        on_refined: Optional[Callable[[DispatchSchedule], Awaitable[None]]] = None,
+        submit: Optional[Callable[[Callable[[], Any]], Awaitable[Any]]] = None
+    ) -> Tuple[DispatchSchedule, str]:
+        """Anytime dispatch: answer within the latency budget, refine in the background.
+        
+        The heuristic schedule is built first and the full optimization is
+        started in a worker thread, or handed to ``submit`` (e.g. an admission
+        queue) as a blocking solve when given. If the optimization finishes within
+        ``latency_budget`` seconds its schedule is returned; otherwise the
+        heuristic schedule is returned and ``on_refined`` is called with the
+        optimized schedule if it finishes within the refinement budget. The
+        refined schedule keeps the heuristic schedule's id so that it
+        supersedes it.
+        
+        Returns the schedule and the tier that produced it: "optimized" or
+        "heuristic".
+        """
+        if latency_budget is None:
+            latency_budget = self.config.get('latency_budget_ms', 200) / 1000
+        
+        started = time.perf_counter()
+        heuristic_schedule = await self.create_dispatch_schedule(
+            resources, market_signals, start_time, end_time, optimization_objective, heuristic=True
+        )
+        
+        def solve() -> DispatchSchedule:
+            return asyncio.run(self.create_dispatch_schedule(
+                resources, market_signals, start_time, end_time, optimization_objective
+            ))
+        
+        if submit is not None:
+            refinement = asyncio.ensure_future(submit(solve))
+        else:
+            refinement = asyncio.get_running_loop().run_in_executor(self._refinement_executor(), solve)
+        
+        remaining = max(latency_budget - (time.perf_counter() - started), 0.0)
+        done, _ = await asyncio.wait({refinement}, timeout=remaining)
+        if done and refinement.exception() is None:
+            schedule = refinement.result()
+            schedule.schedule_id = heuristic_schedule.schedule_id
+            schedule.stream_id = heuristic_schedule.stream_id
+            return schedule, "optimized"
+        
+        if not done:
+            task = asyncio.create_task(self._finish_refinement(
+                refinement, heuristic_schedule, on_refined
+            ))
+            self._refinement_tasks.add(task)
+            task.add_done_callback(self._refinement_tasks.discard)
+        return heuristic_schedule, "heuristic"
+    
+    async def _finish_refinement(
+        self,
+        refinement: asyncio.Future,
+        heuristic_schedule: DispatchSchedule,
+        on_refined: Optional[Callable[[DispatchSchedule], Awaitable[None]]]
+    ):
+        """Hand a background optimization to ``on_refined`` if it finishes in time"""
+        budget = self.config.get('refinement_budget_seconds', 60)
+        try:
+            schedule = await asyncio.wait_for(asyncio.shield(refinement), timeout=budget)
+        except asyncio.TimeoutError:
+            REFINEMENTS.labels(outcome="timeout").inc()
+            return
+        except Exception:
+            REFINEMENTS.labels(outcome="failed").inc()
+            return
+        
+        REFINEMENTS.labels(outcome="refined").inc()
+        schedule.schedule_id = heuristic_schedule.schedule_id
+        schedule.stream_id = heuristic_schedule.stream_id
+        if on_refined is not None:
+            await on_refined(schedule)
+    
+    def _refinement_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.get('refinement_workers', 2),
+                thread_name_prefix="dispatch-refinement"
+            )
+        return self._executor
+    
+    async def create_stochastic_schedule(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        start_time: datetime,
+        end_time: datetime,
+        optimization_objective: Optional[OptimizationObjective] = None,
+        price_scenarios: Optional[np.ndarray] = None,
+        n_reduced: Optional[int] = None,
+        method: Optional[str] = None
+    ) -> Tuple[DispatchSchedule, StochasticDispatchReport]:
+        """Dispatch storage against a reduced set of price scenarios.
+        
+        ``price_scenarios`` is a (scenarios x intervals) price matrix; when
+        omitted it is sampled around the market signals. The set is reduced
+        to ``n_reduced`` representatives, and storage is planned with a
+        two-stage LP whose first ``non_anticipative_intervals`` decisions are
+        shared by every scenario. The schedule carries the first-stage
+        decisions followed by the probability-weighted recourse, which stays
+        feasible because every constraint is linear. Other resource types are
+        optimized deterministically as in ``create_dispatch_schedule``.
+        """
+        if optimization_objective is None:
+            optimization_objective = OptimizationObjective()
+        started = time.perf_counter()
+        
+        intervals = self._calculate_intervals(start_time, end_time)
+        prices = self._interval_prices(market_signals, intervals)
+        if price_scenarios is None:
+            price_scenarios = self._sample_price_scenarios(market_signals, intervals, prices)
+        price_scenarios = np.nan_to_num(np.asarray(price_scenarios, dtype=float))
+        
+        method = method or self.config.get('scenario_reduction_method', 'fast_forward')
+        reduction = reduce_scenarios(
+            price_scenarios,
+            n_reduced or self.config.get('stochastic_scenarios', 10),
+            method
+        )
+        first_stage = min(self.config.get('non_anticipative_intervals', 4), len(intervals))
+        
+        storage = [resource for resource in resources if resource.resource_type == ResourceType.BATTERY]
+        schedule = await self.create_dispatch_schedule(
+            [resource for resource in resources if resource.resource_type != ResourceType.BATTERY],
+            market_signals, start_time, end_time, optimization_objective
+        )
+        
+        reduced_objective = evaluated_objective = 0.0
+        if storage and intervals:
+            reduced_prices = price_scenarios[reduction.selected]
+            grid_value = self._grid_support_value(storage, market_signals, intervals)
+            with stage("model_build"):
+                prob, power_vars, soc_vars = self._build_stochastic_storage_problem(
+                    storage, reduced_prices, reduction.probabilities, intervals,
+                    optimization_objective, first_stage, grid_value
+                )
+            self._solve(prob)
+            reduced_objective = value(prob.objective) or 0.0
+            
+            shape = (len(storage), len(reduced_prices), len(intervals))
+            power = np.array([value(power_vars[key]) or 0.0 for key in np.ndindex(*shape)]).reshape(shape)
+            soc = np.array([value(soc_vars[key]) or 0.0 for key in np.ndindex(*shape)]).reshape(shape)
+            
+            # Every original scenario follows the recourse of its representative
+            evaluated_objective = float(np.mean(self._storage_objective(
+                storage, power[:, reduction.assignment, :], price_scenarios, intervals,
+                optimization_objective, grid_value
+            )))
+            
+            expected_power = np.tensordot(reduction.probabilities, power, axes=([0], [1]))
+            expected_soc = np.tensordot(reduction.probabilities, soc, axes=([0], [1]))
+            hours = self._interval_hours(intervals)
+            cycle_cost = np.array([resource.constraints.cycle_cost or 0 for resource in storage])
+            energy = expected_power * hours[None, :]
+            
+            results = self._build_results(
+                resources=storage,
+                intervals=intervals,
+                columns={
+                    "target_power": expected_power,
+                    "expected_cost": np.where(energy < 0, -energy * cycle_cost[:, None], 0.0),
+                    "expected_revenue": np.where(energy > 0, energy * np.nan_to_num(prices)[None, :], 0.0),
+                    "expected_soc": expected_soc
+                },
+                grid_services=self._grid_service_matrix(storage, expected_power)
+            )
+            for resource_id, resource_schedule in results.items():
+                self._add_resource_schedule(schedule, resource_id, resource_schedule)
+            
+            schedule.risk_metrics = self._calculate_risk_metrics(schedule)
+            schedule.carbon_savings = self._calculate_carbon_savings(schedule)
+        
+        report = StochasticDispatchReport(
+            schedule_id=schedule.schedule_id,
+            method=method,
+            scenarios_total=len(price_scenarios),
+            scenarios_reduced=len(reduction.selected),
+            scenario_probabilities=reduction.probabilities.tolist(),
+            non_anticipative_intervals=first_stage,
+            reduction_distance=reduction.distance,
+            relative_distance=reduction.relative_distance,
+            reduced_objective=reduced_objective,
+            evaluated_objective=evaluated_objective,
+            objective_gap=(
+                (reduced_objective - evaluated_objective) / abs(evaluated_objective)
+                if evaluated_objective else 0.0
+            ),
+            solve_time_seconds=time.perf_counter() - started
+        )
+        return schedule, report
+    
+    def _sample_price_scenarios(
+        self,
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        prices: np.ndarray
+    ) -> np.ndarray:
+        """Sample price paths around the interval prices, wider where signal confidence is low"""
+        confidence = self._interval_signal_means(
+            market_signals, intervals, lambda signal: signal.confidence_level
+        )
+        sigma = np.maximum(
+            self.config.get('price_volatility', 0.3) * (1 - np.nan_to_num(confidence)),
+            self.config.get('scenario_price_volatility', 0.1)
+        )
+        return sample_price_scenarios(
+            np.nan_to_num(prices),
+            sigma,
+            self.config.get('scenario_count', 500),
+            seed=self.config.get('scenario_seed')
+        )
+    
+    def _grid_support_value(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> np.ndarray:
+        """Grid service price per unit of throughput, as valued by the storage LP"""
+        value_matrix = np.zeros((len(resources), len(intervals)))
+        for t, (start_time, end_time) in enumerate(intervals):
+            for signal in self._get_interval_signals(market_signals, start_time, end_time):
+                for service, price in signal.grid_service_prices.items():
+                    for i, resource in enumerate(resources):
+                        if service in resource.grid_services_enabled:
+                            value_matrix[i, t] += price
+        return value_matrix
+    
+    def _storage_objective(
+        self,
+        resources: List[ResourceState],
+        power: np.ndarray,
+        price_scenarios: np.ndarray,
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective,
+        grid_value: np.ndarray
+    ) -> np.ndarray:
+        """Storage LP objective of (resources x scenarios x intervals) power, per scenario"""
+        hours = self._interval_hours(intervals)
+        cycle_cost = np.array([resource.constraints.cycle_cost or 0 for resource in resources])
+        throughput = np.abs(power) * hours[None, None, :]
+        revenue = (power * hours[None, None, :] * price_scenarios[None, :, :]).sum(axis=(0, 2))
+        degradation = (throughput * cycle_cost[:, None, None]).sum(axis=(0, 2))
+        grid_support = (throughput * grid_value[:, None, :]).sum(axis=(0, 2))
+        return (
+            optimization_objective.revenue_weight * revenue -
+            optimization_objective.battery_degradation_weight * degradation +
+            optimization_objective.grid_support_weight * grid_support
+        )
+    
+    def _build_stochastic_storage_problem(
+        self,
+        resources: List[ResourceState],
+        price_scenarios: np.ndarray,
+        probabilities: np.ndarray,
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective,
+        first_stage: int,
+        grid_value: np.ndarray
+    ) -> Tuple[LpProblem, Dict, Dict]:
+        """Two-stage storage LP over reduced scenarios.
+        
+        Variables are keyed (resource index, scenario, interval). Intervals
+        before ``first_stage`` map to the same variable in every scenario,
+        which enforces non-anticipativity.
+        """
+        prob = LpProblem("Stochastic_Storage_Optimization", LpMaximize)
+        hours = self._interval_hours(intervals)
+        power_vars = {}
+        abs_power_vars = {}
+        soc_vars = {}
+        lower, upper = power_bounds(resources)
+        min_soc, max_soc = soc_bounds(resources)
+        
+        for i, resource in enumerate(resources):
+            for k in range(len(price_scenarios)):
+                for t in range(len(intervals)):
+                    if t < first_stage and k > 0:
+                        power_vars[(i, k, t)] = power_vars[(i, 0, t)]
+                        abs_power_vars[(i, k, t)] = abs_power_vars[(i, 0, t)]
+                        soc_vars[(i, k, t)] = soc_vars[(i, 0, t)]
+                        continue
+                    stage = "first" if t < first_stage else f"s{k}"
+                    power_vars[(i, k, t)] = LpVariable(
+                        f"power_{resource.resource_id}_{stage}_{t}",
+                        lowBound=lower[i],
+                        upBound=upper[i]
+                    )
+                    abs_power_vars[(i, k, t)] = LpVariable(
+                        f"abs_power_{resource.resource_id}_{stage}_{t}",
+                        lowBound=0,
+                        upBound=max(-lower[i], upper[i])
+                    )
+                    prob += abs_power_vars[(i, k, t)] >= power_vars[(i, k, t)]
+                    prob += abs_power_vars[(i, k, t)] >= -power_vars[(i, k, t)]
+                    soc_vars[(i, k, t)] = LpVariable(
+                        f"soc_{resource.resource_id}_{stage}_{t}",
+                        lowBound=min_soc[i],
+                        upBound=max_soc[i]
+                    )
+        
+        prob += lpSum(
+            probabilities[k] * (
+                optimization_objective.revenue_weight * price_scenarios[k, t] * hours[t] * power_vars[(i, k, t)] -
+                optimization_objective.battery_degradation_weight * (resource.constraints.cycle_cost or 0) * hours[t] * abs_power_vars[(i, k, t)] +
+                optimization_objective.grid_support_weight * grid_value[i, t] * hours[t] * abs_power_vars[(i, k, t)]
+            )
+            for i, resource in enumerate(resources)
+            for k in range(len(price_scenarios))
+            for t in range(len(intervals))
+        )
+        
+        for i, resource in enumerate(resources):
+            constraints = resource.constraints
+            for k in range(len(price_scenarios)):
+                if k == 0 or first_stage == 0:
+                    prob += soc_vars[(i, k, 0)] == resource.state_of_charge
+                # Constraints within the first stage are shared and only added once
+                for t in range(max(first_stage - 1, 0) if k > 0 else 0, len(intervals) - 1):
+                    prob += (
+                        soc_vars[(i, k, t + 1)] ==
+                        soc_vars[(i, k, t)] - power_vars[(i, k, t)] * constraints.efficiency
+                    )
+                    prob += power_vars[(i, k, t + 1)] - power_vars[(i, k, t)] <= constraints.ramp_up_rate
+                    prob += power_vars[(i, k, t)] - power_vars[(i, k, t + 1)] <= constraints.ramp_down_rate
+        
+        return prob, power_vars, soc_vars
+    
+    def validate_with_simulation(self, schedule: DispatchSchedule) -> Optional['BatchSimulationResult']:
+        """Simulate a candidate schedule in one batch call and flag the results it violates.
+        
+        Each flagged result gets ``simulated_<violation>`` added to its
+        ``constraints_violated``, so ``validate_schedule`` rejects it.
+        """
+        if not self.simulator:
+            return None
+        
+        simulation = self.simulator.simulate_schedule(schedule)
+        by_start = {}
+        for violation in simulation.violation_list():
+            resource_id = violation["component_id"]
+            if resource_id not in by_start:
+                by_start[resource_id] = {
+                    result.start_time: result for result in schedule.resources[resource_id]
+                }
+            result = by_start[resource_id].get(violation["interval_start"])
+            if result is not None:
+                result.constraints_violated.append(f"simulated_{violation['violation']}")
+        if by_start:
+            schedule.clear_columnar()
+        
+        return simulation
+    
+    async def redispatch_schedule(
+        self,
+        previous_schedule: DispatchSchedule,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        shift_intervals: int = 1,
+        locked_intervals: int = 1
+    ) -> Tuple[DispatchSchedule, RedispatchReport]:
+        """Re-optimize a schedule over a receding horizon.
+        
+        The previous schedule is shifted forward by ``shift_intervals``; the first
+        ``locked_intervals`` of the shifted window are already in execution and are
+        copied unchanged. Resources that continue from the previous schedule are
+        only re-optimized over the remaining horizon, starting from the state the
+        previous schedule expects at that point, so the locked intervals and the
+        rolled-forward state are the warm start; the solver itself starts
+        cold. The new schedule keeps the previous schedule's ``stream_id``.
+        """
+        if previous_schedule.interval_minutes != self.interval_minutes:
+            raise ValueError(
+                f"Cannot re-dispatch a {previous_schedule.interval_minutes}-minute schedule "
+                f"with a {self.interval_minutes}-minute optimizer"
+            )
+        if shift_intervals < 0 or locked_intervals < 0:
+            raise ValueError("shift_intervals and locked_intervals must be non-negative")
+        
+        shift = timedelta(minutes=self.interval_minutes * shift_intervals)
+        start_time = previous_schedule.start_time + shift
+        end_time = previous_schedule.end_time + shift
+        
+        schedule = DispatchSchedule(
+            schedule_id=f"schedule_{datetime.utcnow().timestamp()}",
+            start_time=start_time,
+            end_time=end_time,
+            interval_minutes=self.interval_minutes,
+            resources={},
+            total_cost=0.0,
+            total_revenue=0.0,
+            market_conditions=market_signals,
+            optimization_objective=previous_schedule.optimization_objective,
+            stream_id=previous_schedule.stream_id
+        )
+        
+        try:
+            intervals = self._calculate_intervals(start_time, end_time)
+            locked = intervals[:locked_intervals]
+            free_intervals = intervals[locked_intervals:]
+            
+            previous_results = {
+                resource_id: {result.start_time: result for result in results}
+                for resource_id, results in previous_schedule.resources.items()
+            }
+            
+            # Resources whose locked intervals are all covered by the previous
+            # schedule continue from it; anything else is optimized in full
+            continuing, new_resources = [], []
+            for resource in resources:
+                previous = previous_results.get(resource.resource_id, {})
+                if all(interval_start in previous for interval_start, _ in locked):
+                    continuing.append(self._roll_forward_state(resource, previous, locked, free_intervals))
+                    schedule.resources[resource.resource_id] = [
+                        previous[interval_start] for interval_start, _ in locked
+                    ]
+                else:
+                    new_resources.append(resource)
+            
+            solve_started = time.perf_counter()
+            for group_resources, group_intervals in ((continuing, free_intervals), (new_resources, intervals)):
+                if not group_resources or not group_intervals:
+                    continue
+                for resource_type, typed_resources in self._group_resources(group_resources).items():
+                    group_schedule = self._optimize_resource_group(
+                        resource_type=resource_type,
+                        resources=typed_resources,
+                        market_signals=market_signals,
+                        intervals=group_intervals,
+                        optimization_objective=schedule.optimization_objective
+                    )
+                    for resource_id, resource_schedule in group_schedule.items():
+                        schedule.resources[resource_id] = (
+                            schedule.resources.get(resource_id, []) + resource_schedule
+                        )
+            solve_time = time.perf_counter() - solve_started
+            
+            resource_schedules, schedule.resources = schedule.resources, {}
+            for resource_id, resource_schedule in resource_schedules.items():
+                self._add_resource_schedule(schedule, resource_id, resource_schedule)
+            
+            schedule.risk_metrics = self._calculate_risk_metrics(schedule)
+            schedule.carbon_savings = self._calculate_carbon_savings(schedule)
+            
+        except Exception as e:
+            raise ValueError(f"Re-dispatch failed: {str(e)}")
+        
+        report = RedispatchReport(
+            schedule_id=schedule.schedule_id,
+            previous_schedule_id=previous_schedule.schedule_id,
+            stream_id=schedule.stream_id,
+            shifted_intervals=shift_intervals,
+            fixed_intervals=len(locked),
+            reoptimized_intervals=len(free_intervals),
+            solve_time_seconds=solve_time,
+            **self._compare_schedules(previous_results, schedule)
+        )
+        return schedule, report
+    
+    def _roll_forward_state(
+        self,
+        resource: ResourceState,
+        previous: Dict[datetime, OptimizationResult],
+        locked: List[Tuple[datetime, datetime]],
+        free_intervals: List[Tuple[datetime, datetime]]
+    ) -> ResourceState:
+        """Project a resource's state to the end of the locked intervals"""
+        if not locked:
+            return resource
+        
+        last_locked = previous[locked[-1][0]]
+        updates = {"current_power": last_locked.target_power}
+        
+        if resource.resource_type == ResourceType.BATTERY:
+            next_result = previous.get(free_intervals[0][0]) if free_intervals else None
+            if next_result is not None and next_result.expected_soc is not None:
+                updates["state_of_charge"] = next_result.expected_soc
+            elif last_locked.expected_soc is not None:
+                updates["state_of_charge"] = (
+                    last_locked.expected_soc -
+                    last_locked.target_power * resource.constraints.efficiency
+                )
+        
+        return resource.copy(update=updates)
+    
+    def _compare_schedules(
+        self,
+        previous_results: Dict[str, Dict[datetime, OptimizationResult]],
+        schedule: DispatchSchedule
+    ) -> Dict[str, float]:
+        """Measure how far a schedule moved from the previous one on overlapping intervals"""
+        tolerance = self.config.get('redispatch_change_tolerance', 1e-3)
+        compared = changed = 0
+        energy_change = max_change = 0.0
+        
+        for resource_id, resource_schedule in schedule.resources.items():
+            previous = previous_results.get(resource_id, {})
+            for result in resource_schedule:
+                old = previous.get(result.start_time)
+                if old is None:
+                    continue
+                delta = abs(result.target_power - old.target_power)
+                compared += 1
+                if delta > tolerance:
+                    changed += 1
+                energy_change += delta * (result.end_time - result.start_time).total_seconds() / 3600
+                max_change = max(max_change, delta)
+        
+        return {
+            "compared_intervals": compared,
+            "changed_intervals": changed,
+            "energy_change_mwh": energy_change,
+            "max_power_change": max_change
+        }
+    
+    async def update_dispatch_schedule(
+        self,
+        stored_schedule: DispatchSchedule,
+        stored_resources: List[ResourceState],
+        resources: Optional[List[ResourceState]] = None,
+        removed_resource_ids: Optional[List[str]] = None,
+        market_signals: Optional[List[MarketSignal]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Tuple[DispatchSchedule, ScheduleUpdateReport]:
+        """Apply a partial update to a stored schedule.
+        
+        Resources in ``resources`` replace or extend the stored ones and
+        ``market_signals`` replace stored signals with the same timestamp. Only
+        resources and intervals affected by the change are re-solved; every
+        other result is carried over from the stored schedule.
+        """
+        start_time = start_time or stored_schedule.start_time
+        end_time = end_time or stored_schedule.end_time
+        removed = set(removed_resource_ids or [])
+        
+        # Work out which resources changed
+        previous_states = {resource.resource_id: resource for resource in stored_resources}
+        current_states = dict(previous_states)
+        added, changed = [], []
+        for resource in resources or []:
+            previous = previous_states.get(resource.resource_id)
+            if previous is None:
+                added.append(resource.resource_id)
+            elif previous.dict() != resource.dict():
+                changed.append(resource.resource_id)
+            current_states[resource.resource_id] = resource
+        removed &= set(current_states)
+        for resource_id in removed:
+            current_states.pop(resource_id)
+        
+        # Merge signals and find intervals whose market conditions changed
+        merged_signals = {signal.timestamp: signal for signal in stored_schedule.market_conditions}
+        for signal in market_signals or []:
+            merged_signals[signal.timestamp] = signal
+        merged_signals = [merged_signals[timestamp] for timestamp in sorted(merged_signals)]
+        
+        stored_intervals = set(self._calculate_intervals(stored_schedule.start_time, stored_schedule.end_time))
+        intervals = self._calculate_intervals(start_time, end_time)
+        affected_intervals = set()
+        for interval in intervals:
+            if interval not in stored_intervals:
+                affected_intervals.add(interval)
+            elif market_signals and (
+                [signal.dict() for signal in self._get_interval_signals(stored_schedule.market_conditions, *interval)] !=
+                [signal.dict() for signal in self._get_interval_signals(merged_signals, *interval)]
+            ):
+                affected_intervals.add(interval)
+        
+        schedule = DispatchSchedule(
+            schedule_id=stored_schedule.schedule_id,
+            start_time=start_time,
+            end_time=end_time,
+            interval_minutes=self.interval_minutes,
+            resources={},
+            total_cost=0.0,
+            total_revenue=0.0,
+            market_conditions=merged_signals,
+            optimization_objective=stored_schedule.optimization_objective,
+            status=stored_schedule.status
+        )
+        
+        # Build the subproblems: full horizon for new, changed and coupled
+        # resources, affected intervals only for the rest
+        full_resolve = set(added) | set(changed)
+        subproblems: Dict[Tuple[ResourceType, bool], List[ResourceState]] = {}
+        for resource_id, resource in current_states.items():
+            if resource_id in full_resolve or (
+                affected_intervals and resource.resource_type in COUPLED_RESOURCE_TYPES
+            ):
+                subproblems.setdefault((resource.resource_type, True), []).append(resource)
+            elif affected_intervals:
+                subproblems.setdefault((resource.resource_type, False), []).append(resource)
+        
+        try:
+            resolved: Dict[str, List[OptimizationResult]] = {}
+            resolved_slots = 0
+            solve_started = time.perf_counter()
+            for (resource_type, full_horizon), group_resources in subproblems.items():
+                group_intervals = intervals if full_horizon else sorted(affected_intervals)
+                group_schedule = self._optimize_resource_group(
+                    resource_type=resource_type,
+                    resources=group_resources,
+                    market_signals=merged_signals,
+                    intervals=group_intervals,
+                    optimization_objective=schedule.optimization_objective
+                )
+                resolved.update(group_schedule)
+                resolved_slots += len(group_resources) * len(group_intervals)
+            solve_time = time.perf_counter() - solve_started
+            
+            # Splice re-solved results into the stored schedule
+            for resource_id in current_states:
+                results = {
+                    result.start_time: result
+                    for result in stored_schedule.resources.get(resource_id, [])
+                }
+                for result in resolved.get(resource_id, []):
+                    results[result.start_time] = result
+                self._add_resource_schedule(
+                    schedule,
+                    resource_id,
+                    [results[interval_start] for interval_start, _ in intervals if interval_start in results]
+                )
+            
+            schedule.risk_metrics = self._calculate_risk_metrics(schedule)
+            schedule.carbon_savings = self._calculate_carbon_savings(schedule)
+            
+        except Exception as e:
+            raise ValueError(f"Schedule update failed: {str(e)}")
+        
+        total_slots = len(current_states) * len(intervals)
+        report = ScheduleUpdateReport(
+            resources_total=len(current_states),
+            resources_added=added,
+            resources_removed=sorted(removed),
+            resources_changed=changed,
+            resources_resolved=sum(len(group) for group in subproblems.values()),
+            intervals_affected=len(affected_intervals),
+            result_slots_total=total_slots,
+            result_slots_resolved=resolved_slots,
+            work_skipped_fraction=1 - resolved_slots / total_slots if total_slots else 1.0,
+            solve_time_seconds=solve_time
+        )
+        return schedule, report
+    
+    def _add_resource_schedule(
+        self,
+        schedule: DispatchSchedule,
+        resource_id: str,
+        resource_schedule: List[OptimizationResult]
+    ):
+        """Add a resource's results to the schedule and update its totals"""
+        schedule.resources[resource_id] = resource_schedule
+        schedule.total_cost += sum(result.expected_cost for result in resource_schedule)
+        schedule.total_revenue += sum(result.expected_revenue for result in resource_schedule)
+        
+        # Aggregate grid services
+        for result in resource_schedule:
+            for service, amount in result.grid_service_contribution.items():
+                schedule.grid_services_provided[service] = (
+                    schedule.grid_services_provided.get(service, 0) + amount
+                )
+    
     def _group_resources(self, resources: List[ResourceState]) -> Dict[ResourceType, List[ResourceState]]:
         """Group resources by type for coordinated optimization"""
         groups = {}
@@ -131,6 +854,114 @@ class DispatchOptimizer:
                 resources, market_signals, intervals, optimization_objective
             )
     
+    def _heuristic_resource_group(
+        self,
+        resource_type: ResourceType,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective
+    ) -> Dict[str, List[OptimizationResult]]:
+        """Heuristic counterpart of ``_optimize_resource_group``.
+        
+        The price-threshold rule only models storage-like limits, so demand
+        response and EV charging, whose rebound and session envelopes it
+        would break, use their exact optimizers.
+        """
+        if resource_type in [ResourceType.SOLAR, ResourceType.WIND]:
+            # Already closed-form and vectorized
+            return self._optimize_renewable_resources(
+                resources, market_signals, intervals, optimization_objective
+            )
+        if resource_type == ResourceType.DEMAND_RESPONSE:
+            return self._optimize_demand_response(
+                resources, market_signals, intervals, optimization_objective
+            )
+        if resource_type == ResourceType.EV_CHARGER:
+            return self._optimize_ev_chargers(
+                resources, market_signals, intervals, optimization_objective
+            )
+        if not resources or not intervals:
+            return {resource.resource_id: [] for resource in resources}
+        
+        prices = self._interval_prices(market_signals, intervals)
+        hours = self._interval_hours(intervals)
+        power, soc = self._heuristic_power_matrix(resources, prices, hours)
+        
+        energy = power * hours[None, :]
+        columns = {
+            "target_power": power,
+            "expected_cost": np.where(power < 0, -energy * np.nan_to_num(prices)[None, :], 0.0),
+            "expected_revenue": np.where(power > 0, energy * np.nan_to_num(prices)[None, :], 0.0)
+        }
+        if resource_type == ResourceType.BATTERY:
+            columns["expected_soc"] = soc
+        return self._build_results(
+            resources=resources,
+            intervals=intervals,
+            columns=columns,
+            grid_services=self._grid_service_matrix(resources, power)
+        )
+    
+    def _heuristic_power_matrix(
+        self,
+        resources: List[ResourceState],
+        prices: np.ndarray,
+        hours: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized ``_optimize_interval`` price-threshold strategy.
+        
+        Every resource ramps towards max_power in intervals priced above the
+        threshold and towards min_power otherwise, starting from its current
+        power. Storage is additionally held within its SOC limits using the
+        same SOC update as the storage LP. The threshold is
+        ``high_price_threshold`` when configured, otherwise the median
+        interval price. Returns (resources x intervals) power and SOC at the
+        start of each interval (NaN for resources without SOC).
+        """
+        threshold = self.config.get('high_price_threshold')
+        if threshold is None:
+            threshold = np.nanmedian(prices) if not np.isnan(prices).all() else np.inf
+        high = np.nan_to_num(prices, nan=-np.inf) > threshold
+        
+        available = np.array([resource.is_available and not resource.maintenance_mode for resource in resources])
+        max_power = np.array([resource.constraints.max_power for resource in resources])
+        min_power = np.array([resource.constraints.min_power for resource in resources])
+        ramp_up = np.array([resource.constraints.ramp_up_rate for resource in resources])
+        ramp_down = np.array([resource.constraints.ramp_down_rate for resource in resources])
+        efficiency = np.array([resource.constraints.efficiency for resource in resources])
+        soc = np.array([
+            resource.state_of_charge if resource.state_of_charge is not None else np.nan
+            for resource in resources
+        ], dtype=float)
+        min_soc = np.array([resource.constraints.min_soc or 0 for resource in resources])
+        max_soc = np.array([resource.constraints.max_soc or 100 for resource in resources])
+        has_soc = ~np.isnan(soc)
+        
+        current = np.where(available, [resource.current_power for resource in resources], 0.0)
+        power = np.zeros((len(resources), len(hours)))
+        soc_path = np.full((len(resources), len(hours)), np.nan)
+        
+        for t, interval_hours in enumerate(hours):
+            minutes = interval_hours * 60
+            if high[t]:
+                target = np.minimum(max_power, current + ramp_up * minutes)
+            else:
+                target = np.maximum(min_power, current - ramp_down * minutes)
+            
+            # Discharge down to min_soc, charge up to max_soc
+            discharge_limit = np.where(has_soc, (soc - min_soc) / efficiency, np.inf)
+            charge_limit = np.where(has_soc, (max_soc - soc) / efficiency, np.inf)
+            target = np.clip(target, -np.maximum(charge_limit, 0), np.maximum(discharge_limit, 0))
+            target = np.where(available, target, 0.0)
+            
+            soc_path[:, t] = soc
+            power[:, t] = target
+            soc = soc - target * efficiency
+            current = target
+        
+        return power, soc_path
+    
     def _optimize_storage_resources(
         self,
         resources: List[ResourceState],
@@ -139,6 +970,86 @@ class DispatchOptimizer:
         optimization_objective: OptimizationObjective
     ) -> Dict[str, List[OptimizationResult]]:
         """Optimize storage resources using linear programming"""
+        with stage("model_build"):
+            prob, power_vars, soc_vars = self._build_storage_problem(
+                resources, market_signals, intervals, optimization_objective
+            )
+        
+        # Solve optimization problem
+        self._solve(prob)
+        
+        with stage("result_extraction"):
+            return self._extract_storage_results(
+                resources, market_signals, intervals, power_vars, soc_vars
+            )
+    
+    def _extract_storage_results(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        power_vars: Dict[Tuple[str, int], LpVariable],
+        soc_vars: Dict[Tuple[str, int], LpVariable]
+    ) -> Dict[str, List[OptimizationResult]]:
+        """Read solved storage variables back into results"""
+        # Intervals without a price signal earn nothing
+        prices = np.nan_to_num(self._interval_prices(market_signals, intervals))
+        results = {}
+        for resource in resources:
+            resource_results = []
+            
+            for i, (start_time, end_time) in enumerate(intervals):
+                power = value(power_vars[(resource.resource_id, i)])
+                soc = value(soc_vars[(resource.resource_id, i)])
+                
+                # Calculate economics
+                interval_signals = self._get_interval_signals(
+                    market_signals, start_time, end_time
+                )
+                avg_price = prices[i]
+                interval_hours = (end_time - start_time).total_seconds() / 3600
+                
+                result = OptimizationResult(
+                    resource_id=resource.resource_id,
+                    target_power=power,
+                    start_time=start_time,
+                    end_time=end_time,
+                    expected_cost=abs(power) * (resource.constraints.cycle_cost or 0) * interval_hours if power < 0 else 0,
+                    expected_revenue=power * avg_price * interval_hours if power > 0 else 0,
+                    expected_soc=soc,
+                    grid_service_contribution=self._calculate_grid_services(
+                        resource, power, interval_signals
+                    )
+                )
+                
+                resource_results.append(result)
+            
+            results[resource.resource_id] = resource_results
+        
+        return results
+    
+    def _solve(self, prob: LpProblem) -> int:
+        """Solve a problem with the configured backend and options.
+        
+        Raises ValueError unless the backend reports an optimal solution.
+        """
+        with stage("solve"):
+            status = self.solver_backend.solve(prob, self.solver_options)
+        if status != LpStatusOptimal:
+            raise ValueError(
+                f"{prob.name} was not solved to optimality: {LpStatus[status]} "
+                f"({self.solver_backend.name})"
+            )
+        return status
+    
+    def _build_storage_problem(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective
+    ) -> Tuple[LpProblem, Dict, Dict]:
+        """Build the storage LP, returning it with its power and SOC variables"""
         
         # Create optimization problem
         prob = LpProblem("Storage_Optimization", LpMaximize)
@@ -146,27 +1057,41 @@ class DispatchOptimizer:
         # Create variables for each resource and interval
         power_vars = {}
         soc_vars = {}
+        abs_power_vars = {}
+        lower, upper = power_bounds(resources)
+        min_soc, max_soc = soc_bounds(resources)
         
-        for resource in resources:
+        for r, resource in enumerate(resources):
             for i, (start_time, end_time) in enumerate(intervals):
                 # Power variable (positive for discharge, negative for charge)
                 power_vars[(resource.resource_id, i)] = LpVariable(
                     f"power_{resource.resource_id}_{i}",
-                    lowBound=-resource.constraints.max_power,
-                    upBound=resource.constraints.max_power
+                    lowBound=lower[r],
+                    upBound=upper[r]
+                )
+                
+                # Throughput variable, linearizes |power| for the objective
+                abs_power_vars[(resource.resource_id, i)] = LpVariable(
+                    f"abs_power_{resource.resource_id}_{i}",
+                    lowBound=0,
+                    upBound=max(-lower[r], upper[r])
                 )
+                prob += abs_power_vars[(resource.resource_id, i)] >= power_vars[(resource.resource_id, i)]
+                prob += abs_power_vars[(resource.resource_id, i)] >= -power_vars[(resource.resource_id, i)]
                 
                 # State of charge variable
                 soc_vars[(resource.resource_id, i)] = LpVariable(
                     f"soc_{resource.resource_id}_{i}",
-                    lowBound=resource.constraints.min_soc or 0,
-                    upBound=resource.constraints.max_soc or 100
+                    lowBound=min_soc[r],
+                    upBound=max_soc[r]
                 )
         
         # Objective function components
         revenue_component = 0
         degradation_component = 0
         grid_support_component = 0
+        # Intervals without a price signal, e.g. shifted in by a re-dispatch, earn nothing
+        prices = np.nan_to_num(self._interval_prices(market_signals, intervals))
         
         for resource in resources:
             for i, (start_time, end_time) in enumerate(intervals):
@@ -175,7 +1100,7 @@ class DispatchOptimizer:
                 )
                 
                 # Average price for interval
-                avg_price = np.mean([signal.price for signal in interval_signals])
+                avg_price = prices[i]
                 
                 # Revenue from energy arbitrage
                 interval_hours = (end_time - start_time).total_seconds() / 3600
@@ -184,7 +1109,7 @@ class DispatchOptimizer:
                 # Battery degradation cost
                 if resource.constraints.cycle_cost:
                     degradation_component += (
-                        abs(power_vars[(resource.resource_id, i)]) * 
+                        abs_power_vars[(resource.resource_id, i)] * 
                         resource.constraints.cycle_cost * 
                         interval_hours
                     )
@@ -194,7 +1119,7 @@ class DispatchOptimizer:
                     for service, price in signal.grid_service_prices.items():
                         if service in resource.grid_services_enabled:
                             grid_support_component += (
-                                abs(power_vars[(resource.resource_id, i)]) * 
+                                abs_power_vars[(resource.resource_id, i)] * 
                                 price * 
                                 interval_hours
                             )
@@ -232,138 +1157,304 @@ class DispatchOptimizer:
                     resource.constraints.ramp_down_rate
                 )
         
-        # Solve optimization problem
-        prob.solve()
+        return prob, power_vars, soc_vars
+    
+    def _optimize_renewable_resources(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective
+    ) -> Dict[str, List[OptimizationResult]]:
+        """Optimize renewable resources considering forecasts.
         
-        # Extract results
-        results = {}
-        for resource in resources:
-            resource_results = []
-            
-            for i, (start_time, end_time) in enumerate(intervals):
-                power = value(power_vars[(resource.resource_id, i)])
-                soc = value(soc_vars[(resource.resource_id, i)])
-                
-                # Calculate economics
-                interval_signals = self._get_interval_signals(
-                    market_signals, start_time, end_time
-                )
-                avg_price = np.mean([signal.price for signal in interval_signals])
-                interval_hours = (end_time - start_time).total_seconds() / 3600
-                
-                result = OptimizationResult(
-                    resource_id=resource.resource_id,
-                    target_power=power,
-                    start_time=start_time,
-                    end_time=end_time,
-                    expected_cost=abs(power) * resource.constraints.cycle_cost * interval_hours if power < 0 else 0,
-                    expected_revenue=power * avg_price * interval_hours if power > 0 else 0,
-                    expected_soc=soc,
-                    grid_service_contribution=self._calculate_grid_services(
-                        resource, power, interval_signals
-                    )
-                )
-                
-                resource_results.append(result)
-            
-            results[resource.resource_id] = resource_results
+        Forecast power, curtailment and economics are computed for every
+        resource and interval at once as (resources x intervals) arrays.
+        """
+        if not resources or not intervals:
+            return {resource.resource_id: [] for resource in resources}
         
-        return results
+        prices = self._interval_prices(market_signals, intervals)
+        hours = self._interval_hours(intervals)
+        forecast_power = self._forecast_power_matrix(resources, intervals)
+        min_power = np.array([resource.constraints.min_power for resource in resources])
+        
+        # Curtail to minimum output wherever generating loses value, i.e. the
+        # weighted energy price plus avoided-carbon value is negative
+        generation_value = (
+            optimization_objective.revenue_weight * np.nan_to_num(prices) +
+            optimization_objective.environmental_weight * self.carbon_price
+        )
+        curtailed_power = np.minimum(np.maximum(min_power, 0.0)[:, None], forecast_power)
+        power = np.where(generation_value[None, :] < 0, curtailed_power, forecast_power)
+        
+        energy = power * hours[None, :]
+        return self._build_results(
+            resources=resources,
+            intervals=intervals,
+            columns={
+                "target_power": power,
+                "expected_cost": np.zeros_like(power),  # Assume zero marginal cost
+                "expected_revenue": energy * np.nan_to_num(prices)[None, :],
+                "carbon_impact": -energy  # Negative because it's carbon saving
+            },
+            grid_services=self._grid_service_matrix(resources, power)
+        )
     
-    def _optimize_renewable_resources(
+    def _optimize_demand_response(
+        self,
+        resources: List[ResourceState],
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]],
+        optimization_objective: OptimizationObjective
+    ) -> Dict[str, List[OptimizationResult]]:
+        """Optimize demand response resources as clustered virtual batteries.
+        
+        Positive power is load curtailment, negative power is the rebound
+        consumption that repays it; ``expected_soc`` carries the energy still
+        owed at the start of each interval.
+        """
+        if not resources or not intervals:
+            return {resource.resource_id: [] for resource in resources}
+        
+        prices = np.nan_to_num(self._interval_prices(market_signals, intervals))
+        hours = self._interval_hours(intervals)
+        plan = self.demand_response.optimize(resources, prices, hours, optimization_objective)
+        
+        power = plan.power
+        energy = power * hours[None, :]
+        activation_cost = np.array([resource.constraints.cycle_cost or 0.0 for resource in resources])
+        return self._build_results(
+            resources=resources,
+            intervals=intervals,
+            columns={
+                "target_power": power,
+                "expected_cost": (
+                    np.where(power < 0, -energy * prices[None, :], 0.0) +
+                    np.maximum(energy, 0.0) * activation_cost[:, None]
+                ),
+                "expected_revenue": np.where(power > 0, energy * prices[None, :], 0.0),
+                "expected_soc": plan.owed_energy
+            },
+            grid_services=self._grid_service_matrix(resources, power)
+        )
+    
+    def _optimize_generic_resources(
         self,
         resources: List[ResourceState],
         market_signals: List[MarketSignal],
         intervals: List[Tuple[datetime, datetime]],
         optimization_objective: OptimizationObjective
     ) -> Dict[str, List[OptimizationResult]]:
-        """Optimize renewable resources considering weather forecasts"""
+        """Optimize other resource types"""
         results = {}
         
+        ev_sites = [resource for resource in resources if resource.resource_type == ResourceType.EV_CHARGER]
+        if ev_sites:
+            results.update(self._optimize_ev_chargers(
+                ev_sites, market_signals, intervals, optimization_objective
+            ))
+        
+        # Remaining types use the per-interval price heuristic
         for resource in resources:
-            resource_results = []
-            
-            for start_time, end_time in intervals:
-                # Get weather forecast for interval
-                if resource.weather_forecast:
-                    forecast_power = self._calculate_forecast_power(
-                        resource, start_time, end_time
-                    )
-                else:
-                    forecast_power = resource.current_power
-                
-                interval_signals = self._get_interval_signals(
-                    market_signals, start_time, end_time
-                )
-                
-                # Calculate optimal curtailment based on prices and grid services
-                optimal_power = self._optimize_renewable_output(
-                    resource, forecast_power, interval_signals, optimization_objective
+            if resource.resource_type == ResourceType.EV_CHARGER:
+                continue
+            results[resource.resource_id] = [
+                self._optimize_interval(
+                    resource,
+                    self._get_interval_signals(market_signals, start_time, end_time),
+                    start_time,
+                    end_time
                 )
-                
-                # Calculate economics
-                avg_price = np.mean([signal.price for signal in interval_signals])
-                interval_hours = (end_time - start_time).total_seconds() / 3600
-                
-                result = OptimizationResult(
-                    resource_id=resource.resource_id,
-                    target_power=optimal_power,
-                    start_time=start_time,
-                    end_time=end_time,
-                    expected_cost=0,  # Assume zero marginal cost
-                    expected_revenue=optimal_power * avg_price * interval_hours,
-                    grid_service_contribution=self._calculate_grid_services(
-                        resource, optimal_power, interval_signals
-                    ),
-                    carbon_impact=-optimal_power * interval_hours  # Negative because it's carbon saving
-                )
-                
-                resource_results.append(result)
-            
-            results[resource.resource_id] = resource_results
+                for start_time, end_time in intervals
+            ]
         
         return results
     
-    def _optimize_demand_response(
+    def _optimize_ev_chargers(
         self,
         resources: List[ResourceState],
         market_signals: List[MarketSignal],
         intervals: List[Tuple[datetime, datetime]],
         optimization_objective: OptimizationObjective
     ) -> Dict[str, List[OptimizationResult]]:
-        """Optimize demand response resources"""
-        # Similar structure to other optimization methods
-        # Implementation specific to demand response
-        pass
+        """Optimize EV charging sites from their sessions.
+        
+        Charging is consumption, so site power is negative. Sessions that
+        cannot get their energy before departure are flagged on the site's
+        result for their departure interval; validation reports the flag as
+        a warning, so the rest of the fleet is still scheduled.
+        """
+        if not intervals:
+            return {resource.resource_id: [] for resource in resources}
+        
+        prices = self._interval_prices(market_signals, intervals)
+        hours = self._interval_hours(intervals)
+        plan = self.ev_fleet.schedule(resources, intervals, prices)
+        
+        power = -plan.site_energy / hours[None, :]
+        results = self._build_results(
+            resources=resources,
+            intervals=intervals,
+            columns={
+                "target_power": power,
+                "expected_cost": plan.site_energy * np.nan_to_num(prices)[None, :],
+                "expected_revenue": np.zeros_like(power)
+            },
+            grid_services=self._grid_service_matrix(resources, power)
+        )
+        
+        interval_ends = np.array([end_time.timestamp() for _, end_time in intervals])
+        unmet = plan.unmet_energy > self.config.get('ev_energy_tolerance', 1e-6)
+        departure_interval = np.minimum(
+            np.searchsorted(interval_ends, plan.sessions.departure[unmet], side="left"),
+            len(intervals) - 1
+        )
+        for site, interval in zip(plan.sessions.site[unmet], departure_interval):
+            violations = results[resources[site].resource_id][interval].constraints_violated
+            if "ev_energy_not_met" not in violations:
+                violations.append("ev_energy_not_met")
+        
+        return results
     
-    def _optimize_generic_resources(
+    def _forecast_power_matrix(
         self,
         resources: List[ResourceState],
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> np.ndarray:
+        """Forecast power as a (resources x intervals) array.
+        
+        ``ResourceState.forecast`` maps ISO interval start times to expected
+        output; intervals without a forecast fall back to current power.
+        """
+        column = {start_time.isoformat(): j for j, (start_time, _) in enumerate(intervals)}
+        power = np.array([resource.current_power for resource in resources], dtype=float)[:, None].repeat(len(intervals), axis=1)
+        
+        for i, resource in enumerate(resources):
+            if not resource.forecast:
+                continue
+            points = [(column[key], value) for key, value in resource.forecast.items() if key in column]
+            if points:
+                cols, values = zip(*points)
+                power[i, list(cols)] = values
+        
+        max_power = np.array([resource.constraints.max_power for resource in resources])
+        return np.clip(power, 0.0, max_power[:, None])
+    
+    def _interval_prices(
+        self,
+        market_signals: List[MarketSignal],
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> np.ndarray:
+        """Average market price per interval, NaN for intervals without signals"""
+        return self._interval_signal_means(market_signals, intervals, lambda signal: signal.price)
+    
+    def _interval_signal_means(
+        self,
         market_signals: List[MarketSignal],
         intervals: List[Tuple[datetime, datetime]],
-        optimization_objective: OptimizationObjective
+        getter
+    ) -> np.ndarray:
+        """Average of a signal attribute per interval, computed by bucketing signal timestamps"""
+        if not market_signals:
+            return np.full(len(intervals), np.nan)
+        
+        starts = np.array([start_time.timestamp() for start_time, _ in intervals])
+        ends = np.array([end_time.timestamp() for _, end_time in intervals])
+        timestamps = np.array([signal.timestamp.timestamp() for signal in market_signals])
+        values = np.array([getter(signal) for signal in market_signals], dtype=float)
+        
+        order = np.argsort(starts)
+        bucket = np.searchsorted(starts[order], timestamps, side="right") - 1
+        inside = bucket >= 0
+        bucket = order[np.clip(bucket, 0, None)]
+        inside &= timestamps < ends[bucket]
+        
+        totals = np.bincount(bucket[inside], weights=values[inside], minlength=len(intervals))
+        counts = np.bincount(bucket[inside], minlength=len(intervals))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, totals / counts, np.nan)
+    
+    def _interval_hours(self, intervals: List[Tuple[datetime, datetime]]) -> np.ndarray:
+        """Interval durations in hours"""
+        return np.array([(end_time - start_time).total_seconds() / 3600 for start_time, end_time in intervals])
+    
+    def _grid_service_matrix(
+        self,
+        resources: List[ResourceState],
+        power: np.ndarray
+    ) -> Dict[GridService, np.ndarray]:
+        """Vectorized ``_calculate_grid_services``, NaN where a service is not enabled"""
+        services = {}
+        max_power = np.array([resource.constraints.max_power for resource in resources])
+        for service, amount in (
+            (GridService.FREQUENCY_REGULATION, np.minimum(np.abs(power), max_power[:, None] * 0.1)),
+            (GridService.VOLTAGE_SUPPORT, np.abs(power) * 0.3)
+        ):
+            enabled = np.array([service in resource.grid_services_enabled for resource in resources])
+            if enabled.any():
+                services[service] = np.where(enabled[:, None], amount, np.nan)
+        return services
+    
+    def _build_results(
+        self,
+        resources: List[ResourceState],
+        intervals: List[Tuple[datetime, datetime]],
+        columns: Dict[str, np.ndarray],
+        grid_services: Optional[Dict[GridService, np.ndarray]] = None
     ) -> Dict[str, List[OptimizationResult]]:
-        """Optimize other resource types"""
-        # Generic optimization method for other resource types
-        pass
+        """Turn (resources x intervals) arrays into result lists without per-field validation"""
+        fields = {name: array.tolist() for name, array in columns.items()}
+        services = {service: array.tolist() for service, array in (grid_services or {}).items()}
+        empty = [None] * len(intervals)
+        results = {}
+        
+        with stage("result_extraction"), paused_gc():
+            for i, resource in enumerate(resources):
+                results[resource.resource_id] = self._build_resource_results(
+                    resource, i, intervals, fields, services, empty
+                )
+        
+        return results
     
-    def _calculate_forecast_power(
+    def _build_resource_results(
         self,
         resource: ResourceState,
-        start_time: datetime,
-        end_time: datetime
-    ) -> float:
-        """Calculate forecast power output based on weather forecast"""
-        if not resource.weather_forecast:
-            return resource.current_power
-            
-        # Implementation depends on resource type and weather model
-        if resource.resource_type == ResourceType.SOLAR:
-            return self._calculate_solar_power(resource, start_time, end_time)
-        elif resource.resource_type == ResourceType.WIND:
-            return self._calculate_wind_power(resource, start_time, end_time)
-        else:
-            return resource.current_power
+        i: int,
+        intervals: List[Tuple[datetime, datetime]],
+        fields: Dict[str, List[List[float]]],
+        services: Dict[GridService, List[List[float]]],
+        empty: List[None]
+    ) -> List[OptimizationResult]:
+        power = fields["target_power"][i]
+        cost = fields["expected_cost"][i]
+        revenue = fields["expected_revenue"][i]
+        soc = fields["expected_soc"][i] if "expected_soc" in fields else empty
+        carbon = fields["carbon_impact"][i] if "carbon_impact" in fields else empty
+        resource_services = [
+            (service, values[i]) for service, values in services.items()
+            if service in resource.grid_services_enabled
+        ]
+        
+        return [
+            make_result({
+                "resource_id": resource.resource_id,
+                "target_power": power[j],
+                "start_time": start_time,
+                "end_time": end_time,
+                "expected_cost": cost[j],
+                "expected_revenue": revenue[j],
+                "grid_service_contribution": {
+                    service: values[j] for service, values in resource_services
+                },
+                "constraints_violated": [],
+                "confidence_level": 1.0,
+                "expected_soc": soc[j],
+                "carbon_impact": carbon[j],
+                "risk_level": "low"
+            })
+            for j, (start_time, end_time) in enumerate(intervals)
+        ]
     
     def _calculate_grid_services(
         self,
@@ -389,13 +1480,89 @@ class DispatchOptimizer:
         return services
     
     def _calculate_risk_metrics(self, schedule: DispatchSchedule) -> Dict[str, float]:
-        """Calculate risk metrics for the schedule"""
+        """Calculate risk metrics for the schedule.
+        
+        Metrics ending in ``_risk`` are expected revenue shortfalls and are
+        deducted from the risk-adjusted profit; the others describe the
+        combined revenue distribution.
+        """
+        columnar = schedule.columnar()
+        exposure = self._risk_exposure(schedule, columnar)
+        combined = self.risk_engine.evaluate(**exposure)
+        
         return {
-            "price_risk": self._calculate_price_risk(schedule),
-            "weather_risk": self._calculate_weather_risk(schedule),
-            "technical_risk": self._calculate_technical_risk(schedule)
+            "price_risk": self._calculate_price_risk(exposure),
+            "weather_risk": self._calculate_weather_risk(exposure),
+            "technical_risk": self._calculate_technical_risk(columnar),
+            "revenue_var": combined["var"],
+            "revenue_cvar": combined["cvar"],
+            "revenue_std": combined["revenue_std"],
+            "downside_probability": combined["downside_probability"],
+            "loss_probability": combined["loss_probability"]
         }
     
+    def _risk_exposure(
+        self,
+        schedule: DispatchSchedule,
+        columnar: ColumnarSchedule
+    ) -> Dict[str, np.ndarray]:
+        """Per-interval prices, energy and uncertainty for the risk engine"""
+        intervals = list(zip(columnar.interval_starts, columnar.interval_ends))
+        if not intervals:
+            return {"prices": np.zeros(0), "energy": np.zeros(0)}
+        
+        hours = self._interval_hours(intervals)
+        energy = np.nan_to_num(columnar.columns["target_power"]) * hours
+        # Only weather-dependent resources report a carbon impact
+        renewable = ~np.isnan(columnar.columns["carbon_impact"]).all(axis=1)
+        
+        prices = self._interval_prices(schedule.market_conditions, intervals)
+        price_confidence = self._interval_signal_means(
+            schedule.market_conditions, intervals, lambda signal: signal.confidence_level
+        )
+        price_sigma = self.config.get('price_volatility', 0.3) * (1 - np.nan_to_num(price_confidence))
+        
+        # Forecast error grows with lead time; low-confidence results widen it further
+        lead_hours = np.array([(start - schedule.start_time).total_seconds() / 3600 for start, _ in intervals])
+        forecast_sigma = self.config.get('weather_volatility', 0.15) * np.sqrt(np.maximum(lead_hours, 0) / 24 + 1 / 24)
+        if renewable.any():
+            confidence = np.nanmean(columnar.columns["confidence_level"][renewable], axis=0)
+            weather_sigma = np.maximum(forecast_sigma, 1 - np.nan_to_num(confidence, nan=1.0))
+        else:
+            weather_sigma = np.zeros(len(intervals))
+        
+        return {
+            "prices": prices,
+            "energy": energy.sum(axis=0),
+            "price_sigma": price_sigma,
+            "renewable_energy": energy[renewable].sum(axis=0),
+            "weather_sigma": weather_sigma
+        }
+    
+    def _calculate_price_risk(self, exposure: Dict[str, np.ndarray]) -> float:
+        """Revenue CVaR under price uncertainty alone"""
+        return self.risk_engine.evaluate(
+            prices=exposure["prices"],
+            energy=exposure["energy"],
+            price_sigma=exposure.get("price_sigma")
+        )["cvar"]
+    
+    def _calculate_weather_risk(self, exposure: Dict[str, np.ndarray]) -> float:
+        """Revenue CVaR under renewable output uncertainty alone"""
+        return self.risk_engine.evaluate(
+            prices=exposure["prices"],
+            energy=exposure["energy"],
+            renewable_energy=exposure.get("renewable_energy"),
+            weather_sigma=exposure.get("weather_sigma")
+        )["cvar"]
+    
+    def _calculate_technical_risk(self, columnar: ColumnarSchedule) -> float:
+        """Expected revenue at intervals that violate a constraint and may not be delivered"""
+        if not columnar.constraints_violated:
+            return 0.0
+        rows, cols = map(list, zip(*columnar.constraints_violated))
+        return float(np.nansum(np.maximum(columnar.columns["expected_revenue"][rows, cols], 0)))
+    
     def _calculate_carbon_savings(self, schedule: DispatchSchedule) -> float:
         """Calculate total carbon savings from the schedule"""
         total_savings = 0.0
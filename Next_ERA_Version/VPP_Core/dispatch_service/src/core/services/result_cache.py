@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from prometheus_client import Counter, Gauge
+from pydantic.json import pydantic_encoder
+from ..models.optimization import (
+    MarketSignal,
+    OptimizationObjective,
+    ResourceState
+)
+from .admission import AdmissionRejected
+
+CACHE_REQUESTS = Counter(
+    'dispatch_result_cache_requests_total',
+    'Optimization result cache lookups',
+    ['outcome']  # hit, miss, coalesced
+)
+CACHE_ENTRIES = Gauge('dispatch_result_cache_entries', 'Optimization results currently cached')
+
+# Result handed to coalesced callers when the computation has to be retried
+_RETRY = object()
+
+def canonical_request_hash(
+    resources: List[ResourceState],
+    market_signals: List[MarketSignal],
+    start_time: datetime,
+    end_time: datetime,
+    optimization_objective: Optional[OptimizationObjective] = None,
+    extra: Optional[Dict[str, Any]] = None
+) -> str:
+    """Hash an optimization request independently of resource and signal order"""
+    payload = {
+        "resources": sorted(
+            (resource.dict() for resource in resources),
+            key=lambda resource: resource["resource_id"]
+        ),
+        "market_signals": sorted(
+            (signal.dict() for signal in market_signals),
+            key=lambda signal: (signal["timestamp"].isoformat(), signal["source"])
+        ),
+        "start_time": start_time,
+        "end_time": end_time,
+        "objective": (optimization_objective or OptimizationObjective()).dict(),
+        "extra": extra or {}
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=pydantic_encoder)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class OptimizationResultCache:
+    """TTL and size-bounded LRU cache of optimization results with in-flight deduplication.
+
+    Cached values are shared between callers and must not be mutated.
+    ``retry_on`` lists errors that belong to the computing caller rather than
+    to the request, such as its own admission being shed; like cancellation,
+    they are not shared with coalesced callers, which compute again instead.
+    With ``result_id``, entries can also be dropped by the id of their value,
+    e.g. when the schedule they hold is updated or deleted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 30.0,
+        retry_on: Tuple[Type[BaseException], ...] = (),
+        result_id: Optional[Callable[[Any], str]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.retry_on = (asyncio.CancelledError,) + tuple(retry_on)
+        self.result_id = result_id
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_result: Dict[str, str] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get an unexpired cached value"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            CACHE_ENTRIES.set(len(self._entries))
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Cache a value, evicting the least recently used entries beyond max_entries"""
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        if self.result_id is not None:
+            self._keys_by_result[self.result_id(value)] = key
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        CACHE_ENTRIES.set(len(self._entries))
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.result_id is not None:
+            self._keys_by_result.pop(self.result_id(entry[1]), None)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """Return a cached value, wait on an identical in-flight computation, or compute it.
+
+        Returns the value and the outcome: "hit", "coalesced" or "miss".
+        Failed computations are not cached and their error is raised to every
+        waiting caller, except for ``retry_on`` errors, after which waiting
+        callers compute the value themselves.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            CACHE_REQUESTS.labels(outcome="hit").inc()
+            return value, "hit"
+
+        in_flight = self._in_flight.get(key)
+        while in_flight is not None:
+            value = await asyncio.shield(in_flight)
+            if value is not _RETRY:
+                self.coalesced += 1
+                CACHE_REQUESTS.labels(outcome="coalesced").inc()
+                return value, "coalesced"
+            in_flight = self._in_flight.get(key)
+
+        self.misses += 1
+        CACHE_REQUESTS.labels(outcome="miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+        except self.retry_on:
+            future.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value, "miss"
+        finally:
+            self._in_flight.pop(key, None)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or all entries when no key is given"""
+        if key is None:
+            self._entries.clear()
+            self._keys_by_result.clear()
+        else:
+            self._drop(key)
+        CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate_result(self, result_id: str):
+        """Drop the entry holding the value with this ``result_id``, if cached"""
+        key = self._keys_by_result.get(result_id)
+        if key is not None:
+            self.invalidate(key)
+
+    def stats(self) -> Dict[str, float]:
+        """Lookup counters and hit rate since startup"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+_result_cache: Optional[OptimizationResultCache] = None
+
+def get_result_cache() -> OptimizationResultCache:
+    """Get the process-wide optimization result cache"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = OptimizationResultCache(
+            max_entries=int(os.getenv("DISPATCH_RESULT_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("DISPATCH_RESULT_CACHE_TTL", "30")),
+            retry_on=(AdmissionRejected,),
+            result_id=lambda schedule: schedule.schedule_id
+        )
+    return _result_cache
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+@dataclass
+class ScenarioReduction:
+    """Representative scenarios chosen from a larger set"""
+    selected: np.ndarray       # indices of the kept scenarios
+    probabilities: np.ndarray  # probability of every kept scenario
+    assignment: np.ndarray     # kept scenario (position in ``selected``) that represents each original one
+    distance: float            # probability-weighted distance of the originals to their representatives
+    relative_distance: float   # distance relative to reducing to a single scenario
+
+def sample_price_scenarios(
+    prices: np.ndarray,
+    sigma: np.ndarray,
+    n_scenarios: int,
+    correlation: float = 0.9,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Price paths with AR(1) correlated relative errors, (scenarios x intervals)"""
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((n_scenarios, len(prices)))
+    errors = np.empty_like(shocks)
+    innovation = np.sqrt(1 - correlation ** 2)
+    for t in range(len(prices)):
+        errors[:, t] = shocks[:, t] if t == 0 else correlation * errors[:, t - 1] + innovation * shocks[:, t]
+    return prices[None, :] * (1 + sigma[None, :] * errors)
+
+def scenario_distances(scenarios: np.ndarray) -> np.ndarray:
+    """Euclidean distance between every pair of scenarios"""
+    squared = (scenarios ** 2).sum(axis=1)
+    distances = squared[:, None] - 2 * scenarios @ scenarios.T + squared[None, :]
+    return np.sqrt(np.maximum(distances, 0.0))
+
+def _finish(
+    distances: np.ndarray,
+    probabilities: np.ndarray,
+    selected: np.ndarray
+) -> ScenarioReduction:
+    """Give every scenario's probability to its nearest kept scenario"""
+    assignment = distances[:, selected].argmin(axis=1)
+    reduced = np.bincount(assignment, weights=probabilities, minlength=len(selected))
+    distance = float(probabilities @ distances[np.arange(len(distances)), selected[assignment]])
+    # Baseline: the single scenario that best represents the whole set
+    single = float((probabilities @ distances).min())
+    return ScenarioReduction(
+        selected=selected,
+        probabilities=reduced,
+        assignment=assignment,
+        distance=distance,
+        relative_distance=distance / single if single > 0 else 0.0
+    )
+
+def fast_forward_selection(
+    scenarios: np.ndarray,
+    n_reduced: int,
+    probabilities: Optional[np.ndarray] = None
+) -> ScenarioReduction:
+    """Heitsch-Roemisch fast forward selection.
+
+    Greedily adds the scenario that most reduces the probability-weighted
+    distance of all scenarios to their nearest selected one.
+    """
+    n_scenarios = len(scenarios)
+    probabilities = np.full(n_scenarios, 1 / n_scenarios) if probabilities is None else probabilities
+    distances = scenario_distances(scenarios)
+    n_reduced = min(n_reduced, n_scenarios)
+
+    nearest = np.full(n_scenarios, np.inf)
+    selected = []
+    for _ in range(n_reduced):
+        # Weighted distance of every scenario if each candidate were added
+        candidate_cost = probabilities @ np.minimum(distances, nearest[:, None])
+        candidate_cost[selected] = np.inf
+        chosen = int(candidate_cost.argmin())
+        selected.append(chosen)
+        nearest = np.minimum(nearest, distances[:, chosen])
+
+    return _finish(distances, probabilities, np.array(selected))
+
+def kmedoids(
+    scenarios: np.ndarray,
+    n_reduced: int,
+    probabilities: Optional[np.ndarray] = None,
+    iterations: int = 20
+) -> ScenarioReduction:
+    """Probability-weighted k-medoids, started from fast forward selection"""
+    n_scenarios = len(scenarios)
+    probabilities = np.full(n_scenarios, 1 / n_scenarios) if probabilities is None else probabilities
+    distances = scenario_distances(scenarios)
+    medoids = fast_forward_selection(scenarios, n_reduced, probabilities).selected.copy()
+
+    for _ in range(iterations):
+        assignment = distances[:, medoids].argmin(axis=1)
+        updated = medoids.copy()
+        for k in range(len(medoids)):
+            members = np.flatnonzero(assignment == k)
+            if len(members):
+                cost = probabilities[members] @ distances[np.ix_(members, members)]
+                updated[k] = members[cost.argmin()]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return _finish(distances, probabilities, medoids)
+
+REDUCTION_METHODS = {
+    "fast_forward": fast_forward_selection,
+    "kmedoids": kmedoids
+}
+
+def reduce_scenarios(
+    scenarios: np.ndarray,
+    n_reduced: int,
+    method: str = "fast_forward",
+    probabilities: Optional[np.ndarray] = None
+) -> ScenarioReduction:
+    """Reduce a (scenarios x features) set to ``n_reduced`` representatives"""
+    if method not in REDUCTION_METHODS:
+        raise ValueError(f"Unknown scenario reduction method: {method}")
+    return REDUCTION_METHODS[method](scenarios, n_reduced, probabilities)
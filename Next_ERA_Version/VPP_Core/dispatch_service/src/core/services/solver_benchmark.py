@@ -0,0 +1,128 @@
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..models.optimization import (
+    MarketSignal,
+    OptimizationObjective,
+    ResourceConstraint,
+    ResourceState,
+    ResourceType
+)
+from .optimizer import DispatchOptimizer
+from .solvers import SOLVER_BACKENDS, SolverOptions
+
+# Problem classes: (storage resources, intervals, interval minutes)
+BENCHMARK_CORPUS = {
+    "small": (10, 96, 15),
+    "medium": (200, 96, 15),
+    "large": (5000, 24, 60)
+}
+
+BENCHMARK_START = datetime(2024, 1, 1)
+
+def build_corpus_problem(
+    n_resources: int,
+    n_intervals: int,
+    interval_minutes: int,
+    seed: int = 0
+) -> Tuple[List[ResourceState], List[MarketSignal], List[Tuple[datetime, datetime]]]:
+    """Deterministic storage fleet and price curve for one problem class"""
+    rng = np.random.default_rng(seed)
+    resources = []
+    for i in range(n_resources):
+        max_power = float(rng.uniform(0.5, 5.0))
+        resources.append(ResourceState(
+            resource_id=f"battery_{i}",
+            resource_type=ResourceType.BATTERY,
+            current_power=0.0,
+            state_of_charge=float(rng.uniform(20, 80)),
+            is_available=True,
+            last_state_change=BENCHMARK_START,
+            constraints=ResourceConstraint(
+                min_power=-max_power,
+                max_power=max_power,
+                ramp_up_rate=max_power,
+                ramp_down_rate=max_power,
+                efficiency=float(rng.uniform(0.85, 0.95)),
+                min_soc=10.0,
+                max_soc=90.0,
+                cycle_cost=float(rng.uniform(0.5, 2.0))
+            ),
+            location={"latitude": 0.0, "longitude": 0.0}
+        ))
+
+    step = timedelta(minutes=interval_minutes)
+    hours = np.arange(n_intervals) * interval_minutes / 60
+    prices = 50 + 30 * np.sin(2 * np.pi * (hours - 6) / 24) + rng.normal(0, 5, n_intervals)
+    market_signals = [
+        MarketSignal(timestamp=BENCHMARK_START + k * step, price=float(price), demand=1000.0)
+        for k, price in enumerate(prices)
+    ]
+    intervals = [(BENCHMARK_START + k * step, BENCHMARK_START + (k + 1) * step) for k in range(n_intervals)]
+    return resources, market_signals, intervals
+
+def run_solver_benchmark(
+    problem_classes: Optional[List[str]] = None,
+    backends: Optional[List[str]] = None,
+    options: Optional[SolverOptions] = None,
+    repeats: int = 1
+) -> Dict[str, Dict]:
+    """Solve the corpus with every available backend and record solve times.
+
+    Each problem is built once per backend and repeat, and only the solve
+    call is timed. Returns per-class results and the fastest backend per
+    class.
+    """
+    options = options or SolverOptions()
+    report = {}
+
+    for problem_class in problem_classes or list(BENCHMARK_CORPUS):
+        n_resources, n_intervals, interval_minutes = BENCHMARK_CORPUS[problem_class]
+        resources, market_signals, intervals = build_corpus_problem(n_resources, n_intervals, interval_minutes)
+        runs = {}
+
+        for name in backends or list(SOLVER_BACKENDS):
+            backend = SOLVER_BACKENDS[name]
+            if not backend.available():
+                runs[name] = {"available": False}
+                continue
+
+            optimizer = DispatchOptimizer({"interval_minutes": interval_minutes})
+            solve_times = []
+            for _ in range(repeats):
+                build_started = time.perf_counter()
+                prob, _, _ = optimizer._build_storage_problem(
+                    resources, market_signals, intervals, OptimizationObjective()
+                )
+                build_seconds = time.perf_counter() - build_started
+
+                solve_started = time.perf_counter()
+                status = backend.solve(prob, options)
+                solve_times.append(time.perf_counter() - solve_started)
+
+            runs[name] = {
+                "available": True,
+                "status": status,
+                "objective": prob.objective.value() if prob.objective is not None else None,
+                "build_seconds": build_seconds,
+                "solve_seconds": min(solve_times),
+                "variables": len(prob.variables()),
+                "constraints": len(prob.constraints)
+            }
+
+        solved = {name: run for name, run in runs.items() if run.get("status") == 1}
+        report[problem_class] = {
+            "resources": n_resources,
+            "intervals": n_intervals,
+            "backends": runs,
+            "fastest": min(solved, key=lambda name: solved[name]["solve_seconds"]) if solved else None
+        }
+
+    return report
+
+if __name__ == "__main__":
+    classes = sys.argv[1:] or None
+    print(json.dumps(run_solver_benchmark(classes), indent=2))
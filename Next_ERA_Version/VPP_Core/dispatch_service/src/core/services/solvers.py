@@ -0,0 +1,166 @@
+import importlib.util
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+from pulp import (
+    HiGHS,
+    HiGHS_CMD,
+    LpConstraintEQ,
+    LpConstraintGE,
+    LpMaximize,
+    LpProblem,
+    LpStatusInfeasible,
+    LpStatusNotSolved,
+    LpStatusOptimal,
+    LpStatusUnbounded,
+    PULP_CBC_CMD
+)
+
+@dataclass
+class SolverOptions:
+    """Solver settings passed through to whichever backend is used"""
+    time_limit: Optional[float] = None  # seconds
+    threads: Optional[int] = None
+    mip_gap: Optional[float] = None     # relative
+    presolve: bool = True
+    msg: bool = False
+    warm_start: bool = False            # MIP start from initial values, CBC only
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SolverOptions":
+        """Build options from a config dict, ignoring unknown keys"""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in config.items() if key in names})
+
+class CBCBackend:
+    """COIN-OR CBC through the binary bundled with PuLP"""
+    name = "cbc"
+
+    def available(self) -> bool:
+        return PULP_CBC_CMD().available()
+
+    def solve(self, prob: LpProblem, options: SolverOptions) -> int:
+        return prob.solve(PULP_CBC_CMD(
+            msg=options.msg,
+            timeLimit=options.time_limit,
+            threads=options.threads,
+            gapRel=options.mip_gap,
+            presolve=options.presolve,
+            warmStart=options.warm_start
+        ))
+
+class HiGHSBackend:
+    """HiGHS through highspy when installed, otherwise the highs executable"""
+    name = "highs"
+
+    def available(self) -> bool:
+        return HiGHS().available() or bool(HiGHS_CMD().available())
+
+    def solve(self, prob: LpProblem, options: SolverOptions) -> int:
+        presolve = "on" if options.presolve else "off"
+        if HiGHS().available():
+            solver = HiGHS(
+                msg=options.msg,
+                timeLimit=options.time_limit,
+                threads=options.threads,
+                gapRel=options.mip_gap,
+                presolve=presolve
+            )
+        else:
+            solver = HiGHS_CMD(
+                msg=options.msg,
+                timeLimit=options.time_limit,
+                threads=options.threads,
+                gapRel=options.mip_gap,
+                options=[f"presolve={presolve}"]
+            )
+        return prob.solve(solver)
+
+class GLOPBackend:
+    """Google OR-Tools GLOP for pure linear programs.
+
+    PuLP has no GLOP interface, so the problem is copied into a pywraplp
+    model and the solution is written back onto the PuLP variables.
+    """
+    name = "glop"
+
+    def available(self) -> bool:
+        return importlib.util.find_spec("ortools") is not None
+
+    def solve(self, prob: LpProblem, options: SolverOptions) -> int:
+        from ortools.linear_solver import pywraplp
+
+        variables = prob.variables()
+        if any(variable.isInteger() for variable in variables):
+            raise ValueError("GLOP only solves linear programs without integer variables")
+
+        solver = pywraplp.Solver.CreateSolver("GLOP")
+        infinity = solver.infinity()
+        model_vars = {
+            variable.name: solver.NumVar(
+                variable.lowBound if variable.lowBound is not None else -infinity,
+                variable.upBound if variable.upBound is not None else infinity,
+                variable.name
+            )
+            for variable in variables
+        }
+
+        for name, constraint in prob.constraints.items():
+            rhs = -constraint.constant
+            if constraint.sense == LpConstraintEQ:
+                bounds = (rhs, rhs)
+            elif constraint.sense == LpConstraintGE:
+                bounds = (rhs, infinity)
+            else:
+                bounds = (-infinity, rhs)
+            model_constraint = solver.Constraint(*bounds, name)
+            for variable, coefficient in constraint.items():
+                model_constraint.SetCoefficient(model_vars[variable.name], coefficient)
+
+        objective = solver.Objective()
+        if prob.objective is not None:
+            for variable, coefficient in prob.objective.items():
+                objective.SetCoefficient(model_vars[variable.name], coefficient)
+            objective.SetOffset(prob.objective.constant)
+        if prob.sense == LpMaximize:
+            objective.SetMaximization()
+
+        if options.time_limit is not None:
+            solver.SetTimeLimit(int(options.time_limit * 1000))
+        if options.threads is not None:
+            solver.SetNumThreads(options.threads)
+        if options.msg:
+            solver.EnableOutput()
+        parameters = pywraplp.MPSolverParameters()
+        parameters.SetIntegerParam(
+            parameters.PRESOLVE,
+            parameters.PRESOLVE_ON if options.presolve else parameters.PRESOLVE_OFF
+        )
+
+        result = solver.Solve(parameters)
+        status = {
+            pywraplp.Solver.OPTIMAL: LpStatusOptimal,
+            # A feasible but unproven solution, e.g. at the time limit, is not optimal
+            pywraplp.Solver.FEASIBLE: LpStatusNotSolved,
+            pywraplp.Solver.INFEASIBLE: LpStatusInfeasible,
+            pywraplp.Solver.UNBOUNDED: LpStatusUnbounded
+        }.get(result, LpStatusNotSolved)
+
+        if status == LpStatusOptimal:
+            for variable in variables:
+                variable.varValue = model_vars[variable.name].solution_value()
+        prob.status = status
+        return status
+
+SOLVER_BACKENDS = {
+    backend.name: backend
+    for backend in (CBCBackend(), HiGHSBackend(), GLOPBackend())
+}
+
+def get_solver_backend(name: str = "cbc"):
+    """Look up a solver backend that is installed"""
+    backend = SOLVER_BACKENDS.get(name.lower())
+    if backend is None:
+        raise ValueError(f"Unknown solver backend: {name}. Choose from {', '.join(SOLVER_BACKENDS)}")
+    if not backend.available():
+        raise ValueError(f"Solver backend {name} is not installed")
+    return backend
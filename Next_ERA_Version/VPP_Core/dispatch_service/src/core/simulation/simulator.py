@@ -1,6 +1,8 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+import numpy as np
+from ..models.optimization import DispatchSchedule
 
 @dataclass
 class SimulationConfig:
@@ -47,6 +49,79 @@ class BatterySimulator(ComponentSimulator):
             'state_of_charge': new_state
         }
 
+@dataclass
+class BatchSimulationResult:
+    """Trajectories of a whole-schedule simulation, arrays are (components x intervals)"""
+    component_ids: List[str]
+    interval_starts: List[datetime]
+    power_output: np.ndarray  # achieved power, schedule sign convention (positive = discharge)
+    state_of_charge: np.ndarray  # state of charge at the end of each interval, NaN for non-storage
+    violations: Dict[str, np.ndarray] = field(default_factory=dict)  # boolean masks
+
+    @property
+    def any_violation(self) -> np.ndarray:
+        """Combined violation mask"""
+        masks = list(self.violations.values())
+        if not masks:
+            return np.zeros(self.power_output.shape, dtype=bool)
+        return np.logical_or.reduce(masks)
+
+    def violation_list(self) -> List[Dict[str, object]]:
+        """Flatten the violation masks into (component, interval, violation) records"""
+        records = []
+        for name, mask in self.violations.items():
+            for row, col in zip(*np.nonzero(mask)):
+                records.append({
+                    "component_id": self.component_ids[row],
+                    "interval_start": self.interval_starts[col],
+                    "violation": name
+                })
+        return records
+
+class BatteryFleet:
+    """Struct-of-arrays model of many batteries, stepped together.
+
+    Applies the same physics as ``BatterySimulator`` to every battery at once.
+    """
+
+    def __init__(self, component_ids: List[str], configs: List[ComponentConfig], states: List[float]):
+        self.component_ids = component_ids
+        self.capacity = np.array([config.capacity for config in configs], dtype=float)
+        self.efficiency = np.array([config.efficiency for config in configs], dtype=float)
+        self.state = np.array(states, dtype=float)
+        self.min_soc = np.array([config.constraints.get('min_soc', 0.0) for config in configs], dtype=float)
+        self.max_soc = np.array([config.constraints.get('max_soc', 1.0) for config in configs], dtype=float)
+        self.max_power = np.array([config.constraints.get('max_power', np.inf) for config in configs], dtype=float)
+
+    def step(self, energy_request: np.ndarray) -> Dict[str, np.ndarray]:
+        """Advance every battery by one interval.
+
+        ``energy_request`` is energy into each battery (negative to discharge),
+        in the same units as capacity.
+        """
+        stored = np.where(
+            energy_request > 0,
+            energy_request * self.efficiency,
+            energy_request / self.efficiency
+        )
+        unclamped = self.state + stored / self.capacity
+        new_state = np.clip(unclamped, 0.0, 1.0)
+
+        # Energy actually exchanged with the grid after hitting SOC bounds
+        achieved_stored = (new_state - self.state) * self.capacity
+        achieved_request = np.where(
+            achieved_stored > 0,
+            achieved_stored / self.efficiency,
+            achieved_stored * self.efficiency
+        )
+
+        self.state = new_state
+        return {
+            'energy_delivered': achieved_request,
+            'state_of_charge': new_state,
+            'soc_limit': (unclamped < self.min_soc) | (unclamped > self.max_soc)
+        }
+
 class VPPSimulator:
     def __init__(self, config: SimulationConfig):
         self.config = config
@@ -68,5 +143,57 @@ class VPPSimulator:
             inputs = dispatch_commands.get(component_id, {})
             results[component_id] = component.step(self.current_time, inputs)
         
-        self.current_time += self.config.time_step
-        return results 
\ No newline at end of file
+        self.current_time += timedelta(seconds=self.config.time_step)
+        return results
+
+    def simulate_schedule(self, schedule: DispatchSchedule, tolerance: float = 1e-6) -> BatchSimulationResult:
+        """Simulate every component over every interval of a schedule in one call.
+
+        Batteries are stepped together as a ``BatteryFleet`` starting from their
+        current state; the simulator's own state is not changed. Components
+        without a batch model are assumed to follow their setpoints.
+        """
+        columns = schedule.columnar()
+        target = columns.columns["target_power"]
+        hours = np.array([
+            (end - start).total_seconds() / 3600
+            for start, end in zip(columns.interval_starts, columns.interval_ends)
+        ])
+
+        power_output = target.copy()
+        state_of_charge = np.full(target.shape, np.nan)
+        soc_limit = np.zeros(target.shape, dtype=bool)
+        power_limit = np.zeros(target.shape, dtype=bool)
+
+        batteries = [
+            (row, component_id) for row, component_id in enumerate(columns.resource_ids)
+            if isinstance(self.components.get(component_id), BatterySimulator)
+        ]
+        if batteries:
+            rows = [row for row, _ in batteries]
+            fleet = BatteryFleet(
+                component_ids=[component_id for _, component_id in batteries],
+                configs=[self.components[component_id].config for _, component_id in batteries],
+                states=[self.components[component_id].current_state for _, component_id in batteries]
+            )
+            fleet_target = target[rows]
+            power_limit[rows] = np.abs(fleet_target) > fleet.max_power[:, None] + tolerance
+
+            # Schedule power is positive when discharging, the fleet takes energy in
+            for t in range(len(hours)):
+                step = fleet.step(-fleet_target[:, t] * hours[t])
+                power_output[rows, t] = -step['energy_delivered'] / hours[t]
+                state_of_charge[rows, t] = step['state_of_charge']
+                soc_limit[rows, t] = step['soc_limit']
+
+        return BatchSimulationResult(
+            component_ids=columns.resource_ids,
+            interval_starts=columns.interval_starts,
+            power_output=power_output,
+            state_of_charge=state_of_charge,
+            violations={
+                'soc_limit': soc_limit,
+                'power_limit': power_limit,
+                'setpoint_not_met': np.abs(power_output - target) > tolerance
+            }
+        ) 
\ No newline at end of file
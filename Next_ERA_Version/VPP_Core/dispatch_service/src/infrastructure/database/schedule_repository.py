@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic.json import pydantic_encoder
+from ...core.models.optimization import (
+    DispatchSchedule,
+    OptimizationResult,
+    ResourceState
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    schedule_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    error_message TEXT,
+    header TEXT NOT NULL,
+    resource_states TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_status ON schedules (status);
+CREATE INDEX IF NOT EXISTS idx_schedules_window ON schedules (start_time, end_time);
+CREATE TABLE IF NOT EXISTS schedule_resources (
+    schedule_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    results TEXT NOT NULL,
+    PRIMARY KEY (schedule_id, resource_id)
+);
+"""
+
+@dataclass
+class ScheduleStatusRecord:
+    """Lightweight status entry kept in memory for every stored schedule"""
+    schedule_id: str
+    status: str
+    start_time: datetime
+    end_time: datetime
+    last_update: datetime
+    error_message: Optional[str] = None
+
+class ScheduleRepository:
+    """Schedule store with an in-memory LRU cache in front of SQLite.
+
+    Each resource's results are stored in their own row, so a single resource's
+    slice of a schedule can be read without deserializing the whole schedule.
+    Status records for all schedules are held in memory for cheap polling.
+    """
+
+    def __init__(self, db_path: str = ":memory:", cache_size: int = 128):
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, DispatchSchedule]" = OrderedDict()
+        self._status: Dict[str, ScheduleStatusRecord] = {}
+
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self._load_status_records()
+
+    def _load_status_records(self):
+        """Warm the status cache from disk"""
+        rows = self.connection.execute(
+            "SELECT schedule_id, status, start_time, end_time, updated_at, error_message FROM schedules"
+        )
+        for schedule_id, status, start_time, end_time, updated_at, error_message in rows:
+            self._status[schedule_id] = ScheduleStatusRecord(
+                schedule_id=schedule_id,
+                status=status,
+                start_time=datetime.fromisoformat(start_time),
+                end_time=datetime.fromisoformat(end_time),
+                last_update=datetime.fromisoformat(updated_at),
+                error_message=error_message
+            )
+
+    def _cache_put(self, schedule: DispatchSchedule):
+        self._cache[schedule.schedule_id] = schedule
+        self._cache.move_to_end(schedule.schedule_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def save(
+        self,
+        schedule: DispatchSchedule,
+        status: str = "created",
+        resources: Optional[List[ResourceState]] = None
+    ):
+        """Insert or replace a schedule, optionally with the resource states it was built from"""
+        now = datetime.utcnow()
+        header = schedule.json(exclude={"resources"})
+        resource_states = (
+            json.dumps([resource.dict() for resource in resources], default=pydantic_encoder)
+            if resources is not None else None
+        )
+
+        with self._lock, self.connection:
+            if resource_states is None:
+                row = self.connection.execute(
+                    "SELECT resource_states FROM schedules WHERE schedule_id = ?",
+                    (schedule.schedule_id,)
+                ).fetchone()
+                resource_states = row[0] if row else None
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    schedule.schedule_id,
+                    status,
+                    schedule.start_time.isoformat(),
+                    schedule.end_time.isoformat(),
+                    schedule.created_at.isoformat(),
+                    now.isoformat(),
+                    None,
+                    header,
+                    resource_states
+                )
+            )
+            self.connection.execute(
+                "DELETE FROM schedule_resources WHERE schedule_id = ?",
+                (schedule.schedule_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO schedule_resources VALUES (?, ?, ?)",
+                [
+                    (
+                        schedule.schedule_id,
+                        resource_id,
+                        json.dumps([result.dict() for result in results], default=pydantic_encoder)
+                    )
+                    for resource_id, results in schedule.resources.items()
+                ]
+            )
+
+            self._cache_put(schedule)
+            self._status[schedule.schedule_id] = ScheduleStatusRecord(
+                schedule_id=schedule.schedule_id,
+                status=status,
+                start_time=schedule.start_time,
+                end_time=schedule.end_time,
+                last_update=now
+            )
+
+    def get(self, schedule_id: str) -> Optional[DispatchSchedule]:
+        """Get a complete schedule by ID"""
+        with self._lock:
+            schedule = self._cache.get(schedule_id)
+            if schedule is not None:
+                self._cache.move_to_end(schedule_id)
+                return schedule
+
+            row = self.connection.execute(
+                "SELECT header FROM schedules WHERE schedule_id = ?",
+                (schedule_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            data = json.loads(row[0])
+            data["resources"] = {
+                resource_id: json.loads(results)
+                for resource_id, results in self.connection.execute(
+                    "SELECT resource_id, results FROM schedule_resources WHERE schedule_id = ?",
+                    (schedule_id,)
+                )
+            }
+            schedule = DispatchSchedule.parse_obj(data)
+            self._cache_put(schedule)
+            return schedule
+
+    def get_resource_schedule(
+        self,
+        schedule_id: str,
+        resource_id: str
+    ) -> Optional[List[OptimizationResult]]:
+        """Get one resource's results without loading the rest of the schedule"""
+        with self._lock:
+            schedule = self._cache.get(schedule_id)
+            if schedule is not None:
+                return schedule.resources.get(resource_id)
+
+            row = self.connection.execute(
+                "SELECT results FROM schedule_resources WHERE schedule_id = ? AND resource_id = ?",
+                (schedule_id, resource_id)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return [OptimizationResult.parse_obj(result) for result in json.loads(row[0])]
+
+    def get_resources(self, schedule_id: str) -> Optional[List[ResourceState]]:
+        """Get the resource states a schedule was optimized for"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT resource_states FROM schedules WHERE schedule_id = ?",
+                (schedule_id,)
+            ).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+        return [ResourceState.parse_obj(resource) for resource in json.loads(row[0])]
+
+    def get_status(self, schedule_id: str) -> Optional[ScheduleStatusRecord]:
+        """Get a schedule's status record from memory"""
+        return self._status.get(schedule_id)
+
+    def update_status(
+        self,
+        schedule_id: str,
+        status: str,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """Update a schedule's status, returns False if the schedule does not exist"""
+        record = self._status.get(schedule_id)
+        if record is None:
+            return False
+
+        now = datetime.utcnow()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE schedules SET status = ?, error_message = ?, updated_at = ? WHERE schedule_id = ?",
+                (status, error_message, now.isoformat(), schedule_id)
+            )
+            record.status = status
+            record.error_message = error_message
+            record.last_update = now
+        return True
+
+    def delete(self, schedule_id: str) -> bool:
+        """Delete a schedule, returns False if it did not exist"""
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM schedules WHERE schedule_id = ?",
+                (schedule_id,)
+            )
+            self.connection.execute(
+                "DELETE FROM schedule_resources WHERE schedule_id = ?",
+                (schedule_id,)
+            )
+            self._cache.pop(schedule_id, None)
+            self._status.pop(schedule_id, None)
+            return cursor.rowcount > 0
+
+    def find(
+        self,
+        status: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[str]:
+        """Find schedule IDs by status and/or overlap with a time range"""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if start_time is not None:
+            clauses.append("end_time > ?")
+            params.append(start_time.isoformat())
+        if end_time is not None:
+            clauses.append("start_time < ?")
+            params.append(end_time.isoformat())
+
+        query = "SELECT schedule_id FROM schedules"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY start_time LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self.connection.execute(query, params)]
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.connection.close()
+
+_repository: Optional[ScheduleRepository] = None
+
+def get_schedule_repository() -> ScheduleRepository:
+    """Get the process-wide schedule repository"""
+    global _repository
+    if _repository is None:
+        _repository = ScheduleRepository(
+            db_path=os.getenv("SCHEDULE_DB_PATH", "schedules.db"),
+            cache_size=int(os.getenv("SCHEDULE_CACHE_SIZE", "128"))
+        )
+    return _repository
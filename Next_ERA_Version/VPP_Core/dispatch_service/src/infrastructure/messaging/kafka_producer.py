@@ -1,79 +1,257 @@
+import asyncio
 import json
-from typing import Any, Dict, Optional
-from kafka import KafkaProducer as KafkaClient
-from kafka.errors import KafkaError
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from aiokafka import AIOKafkaProducer
 from datetime import datetime
+from pydantic.json import pydantic_encoder
 from ...core.models.optimization import DispatchSchedule
+from .schedule_delta import ScheduleDeltaEncoder
 
-class KafkaProducer:
-    """Kafka producer for publishing dispatch-related messages"""
-    
-    def __init__(self, bootstrap_servers: str):
-        self.producer = KafkaClient(
+Record = Tuple[Optional[bytes], bytes]
+
+def serialize_message(value: Dict[str, Any]) -> bytes:
+    """Compact JSON serialization for Kafka payloads"""
+    return json.dumps(value, separators=(",", ":"), default=pydantic_encoder).encode("utf-8")
+
+class AIOKafkaTransport:
+    """Transport that delivers producer batches to a Kafka cluster via aiokafka"""
+
+    def __init__(self, bootstrap_servers: str, compression_type: Optional[str] = "gzip"):
+        self.producer = AIOKafkaProducer(
             bootstrap_servers=bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-            key_serializer=lambda k: k.encode('utf-8') if k else None
+            compression_type=compression_type,
+            linger_ms=0  # batching happens in KafkaProducer
         )
-        
-    async def publish_schedule(self, schedule: DispatchSchedule) -> bool:
-        """Publish dispatch schedule to Kafka"""
+
+    async def start(self):
+        await self.producer.start()
+
+    async def send_batch(self, topic: str, records: List[Record]):
+        """Enqueue a whole batch, then wait for the broker acknowledgements"""
+        futures = [
+            await self.producer.send(topic, value=value, key=key)
+            for key, value in records
+        ]
+        await asyncio.gather(*futures)
+
+    async def stop(self):
+        await self.producer.stop()
+
+class KafkaProducer:
+    """Asyncio-native Kafka producer for publishing dispatch-related messages.
+
+    Messages are grouped per topic for up to ``linger_ms`` (or until a batch is
+    full), compressed by the transport and sent without blocking the event loop.
+    At most ``max_in_flight`` messages are buffered or awaiting acknowledgement;
+    further publishes wait for capacity. Publishing returns a future that
+    resolves to the delivery outcome.
+
+    With ``snapshot_every`` set, schedules are published as versioned
+    snapshots and deltas (see ``ScheduleDeltaEncoder``) instead of full dumps.
+    A schedule message that is not delivered makes the stream's next message
+    a snapshot, so consumers do not wait out the snapshot interval.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: Optional[str] = None,
+        transport: Optional[Any] = None,
+        linger_ms: float = 5.0,
+        max_batch_size: int = 500,
+        max_batch_bytes: int = 1024 * 1024,
+        max_in_flight: int = 10000,
+        compression_type: Optional[str] = "gzip",
+        snapshot_every: Optional[int] = None,
+        max_schedule_streams: int = 1000
+    ):
+        if transport is None:
+            if bootstrap_servers is None:
+                raise ValueError("Either bootstrap_servers or transport is required")
+            transport = AIOKafkaTransport(bootstrap_servers, compression_type)
+        self.transport = transport
+        self.linger = linger_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_in_flight = max_in_flight
+        self.schedule_encoder = (
+            ScheduleDeltaEncoder(snapshot_every, max_streams=max_schedule_streams)
+            if snapshot_every else None
+        )
+
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[str, List[Tuple[Record, asyncio.Future, float]]] = {}
+        self._pending_bytes: Dict[str, int] = {}
+        self._linger_tasks: Dict[str, asyncio.Task] = {}
+        self._send_tasks: set = set()
+        self.stats = {
+            "messages_sent": 0,
+            "messages_failed": 0,
+            "batches_sent": 0,
+            "bytes_sent": 0,
+            "delivery_latency_total": 0.0
+        }
+
+    async def start(self):
+        """Start the transport, called automatically on first publish"""
+        if self._started:
+            return
+        async with self._start_lock:
+            if not self._started:
+                await self.transport.start()
+                self._in_flight = asyncio.Semaphore(self.max_in_flight)
+                self._started = True
+
+    async def send(
+        self,
+        topic: str,
+        key: Optional[str],
+        value: Dict[str, Any]
+    ) -> asyncio.Future:
+        """Queue a message and return a future resolving to True once delivered"""
+        await self.start()
+        await self._in_flight.acquire()
+
+        record = (key.encode("utf-8") if key else None, serialize_message(value))
+        delivery = asyncio.get_running_loop().create_future()
+
+        batch = self._pending.setdefault(topic, [])
+        batch.append((record, delivery, time.perf_counter()))
+        self._pending_bytes[topic] = self._pending_bytes.get(topic, 0) + len(record[1])
+
+        if len(batch) >= self.max_batch_size or self._pending_bytes[topic] >= self.max_batch_bytes:
+            self._flush_topic(topic)
+            # Let the batch go out before the caller keeps producing
+            await asyncio.sleep(0)
+        elif topic not in self._linger_tasks:
+            self._linger_tasks[topic] = asyncio.create_task(self._linger(topic))
+
+        return delivery
+
+    async def _linger(self, topic: str):
+        await asyncio.sleep(self.linger)
+        self._linger_tasks.pop(topic, None)
+        self._flush_topic(topic)
+
+    def _flush_topic(self, topic: str):
+        """Hand the pending batch for a topic to the transport"""
+        batch = self._pending.pop(topic, [])
+        self._pending_bytes.pop(topic, None)
+        linger_task = self._linger_tasks.pop(topic, None)
+        if linger_task is not None and linger_task is not asyncio.current_task():
+            linger_task.cancel()
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._send_batch(topic, batch))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
+
+    async def _send_batch(self, topic: str, batch: List[Tuple[Record, asyncio.Future, float]]):
         try:
-            # Convert schedule to dictionary
-            schedule_dict = schedule.dict()
-            
-            # Add metadata
+            await self.transport.send_batch(topic, [record for record, _, _ in batch])
+            delivered = True
+        except Exception as e:
+            delivered = False
+            print(f"Failed to publish batch to {topic}: {str(e)}")
+
+        now = time.perf_counter()
+        for record, delivery, queued_at in batch:
+            self._in_flight.release()
+            if delivered:
+                self.stats["messages_sent"] += 1
+                self.stats["bytes_sent"] += len(record[1])
+                self.stats["delivery_latency_total"] += now - queued_at
+            else:
+                self.stats["messages_failed"] += 1
+            if not delivery.done():
+                delivery.set_result(delivered)
+        if delivered:
+            self.stats["batches_sent"] += 1
+
+    async def flush(self):
+        """Send every pending batch and wait for all deliveries"""
+        for topic in list(self._pending):
+            self._flush_topic(topic)
+        while self._send_tasks:
+            await asyncio.gather(*list(self._send_tasks))
+
+    async def publish_schedule(self, schedule: DispatchSchedule) -> asyncio.Future:
+        """Publish dispatch schedule to Kafka"""
+        if self.schedule_encoder is None:
             message = {
                 "type": "dispatch_schedule",
                 "timestamp": datetime.utcnow().isoformat(),
-                "schedule": schedule_dict
+                "schedule": schedule.dict()
             }
-            
-            # Send message
-            future = self.producer.send(
-                topic="dispatch_schedules",
-                key=schedule.schedule_id,
-                value=message
-            )
-            
-            # Wait for message to be sent
-            future.get(timeout=10)
-            return True
-            
-        except KafkaError as e:
-            print(f"Failed to publish schedule: {str(e)}")
-            return False
-            
+            return await self.send(topic="dispatch_schedules", key=schedule.stream_id, value=message)
+
+        message = self.schedule_encoder.encode(schedule)
+        message["timestamp"] = datetime.utcnow().isoformat()
+        stream_id = schedule.stream_id
+
+        def resync_if_lost(delivery: asyncio.Future):
+            if delivery.cancelled() or not delivery.result():
+                self.schedule_encoder.resync(stream_id)
+
+        # Keyed by stream so a schedule's versions stay on one partition, in order
+        try:
+            delivery = await self.send(topic="dispatch_schedules", key=stream_id, value=message)
+        except BaseException:
+            self.schedule_encoder.resync(stream_id)
+            raise
+        delivery.add_done_callback(resync_if_lost)
+        return delivery
+
+    def forget_schedule_stream(self, stream_id: str):
+        """Drop the delta state of a schedule stream that will not be published again"""
+        if self.schedule_encoder is not None:
+            self.schedule_encoder.forget(stream_id)
+
     async def publish_command(
         self,
         topic: str,
         key: str,
         value: Dict[str, Any]
-    ) -> bool:
+    ) -> asyncio.Future:
         """Publish command message to Kafka"""
-        try:
-            # Add metadata
-            message = {
-                "type": "command",
-                "timestamp": datetime.utcnow().isoformat(),
-                "payload": value
-            }
-            
-            # Send message
-            future = self.producer.send(
-                topic=topic,
-                key=key,
-                value=message
-            )
-            
-            # Wait for message to be sent
-            future.get(timeout=10)
-            return True
-            
-        except KafkaError as e:
-            print(f"Failed to publish command: {str(e)}")
-            return False
-            
-    def close(self):
-        """Close Kafka producer"""
-        if self.producer:
-            self.producer.close() 
\ No newline at end of file
+        message = {
+            "type": "command",
+            "timestamp": datetime.utcnow().isoformat(),
+            "payload": value
+        }
+
+        return await self.send(topic=topic, key=key, value=message)
+
+    async def close(self):
+        """Flush pending messages and close the transport"""
+        async with self._start_lock:
+            if self._started:
+                await self.flush()
+                await self.transport.stop()
+                self._started = False
+
+_kafka_producer: Optional[KafkaProducer] = None
+
+def get_kafka_producer() -> KafkaProducer:
+    """Get the process-wide Kafka producer, so every route shares its batches"""
+    global _kafka_producer
+    if _kafka_producer is None:
+        _kafka_producer = KafkaProducer(
+            bootstrap_servers=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"),
+            linger_ms=float(os.getenv("KAFKA_LINGER_MS", "5")),
+            max_in_flight=int(os.getenv("KAFKA_MAX_IN_FLIGHT", "10000")),
+            snapshot_every=int(os.getenv("KAFKA_SCHEDULE_SNAPSHOT_EVERY", "10")) or None,
+            max_schedule_streams=int(os.getenv("KAFKA_SCHEDULE_MAX_STREAMS", "1000"))
+        )
+    return _kafka_producer
+
+async def close_kafka_producer():
+    """Flush and close the process-wide producer, if it was created"""
+    global _kafka_producer
+    if _kafka_producer is not None:
+        await _kafka_producer.close()
+        _kafka_producer = None
@@ -0,0 +1,137 @@
+import asyncio
+import gzip
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from .kafka_producer import KafkaProducer, Record
+
+COMPRESSORS = {
+    None: lambda payload: payload,
+    "gzip": gzip.compress,
+    "zlib": zlib.compress
+}
+
+@dataclass
+class BrokerRecord:
+    offset: int
+    key: Optional[bytes]
+    value: bytes
+    timestamp: float
+
+@dataclass
+class BrokerStats:
+    batches: int = 0
+    records: int = 0
+    bytes_raw: int = 0
+    bytes_on_wire: int = 0
+
+class InMemoryBroker:
+    """In-process stand-in for a Kafka broker.
+
+    Stores records per topic and simulates the per-request round trip with
+    ``latency_ms``. Batches are compressed as they would be on the wire so that
+    byte counts are comparable with a real cluster.
+    """
+
+    def __init__(self, latency_ms: float = 2.0, compression_type: Optional[str] = "gzip"):
+        if compression_type not in COMPRESSORS:
+            raise ValueError(f"Unsupported compression type: {compression_type}")
+        self.latency = latency_ms / 1000
+        self.compress = COMPRESSORS[compression_type]
+        self.topics: Dict[str, List[BrokerRecord]] = {}
+        self.stats = BrokerStats()
+
+    async def append(self, topic: str, records: List[Record]):
+        """Append a batch of records to a topic after one simulated round trip"""
+        raw = b"".join((key or b"") + value for key, value in records)
+        wire = self.compress(raw)
+        await asyncio.sleep(self.latency)
+
+        log = self.topics.setdefault(topic, [])
+        now = time.time()
+        for key, value in records:
+            log.append(BrokerRecord(offset=len(log), key=key, value=value, timestamp=now))
+
+        self.stats.batches += 1
+        self.stats.records += len(records)
+        self.stats.bytes_raw += len(raw)
+        self.stats.bytes_on_wire += len(wire)
+
+    def records(self, topic: str, from_offset: int = 0) -> List[BrokerRecord]:
+        """Read records from a topic starting at an offset"""
+        return self.topics.get(topic, [])[from_offset:]
+
+class InMemoryTransport:
+    """KafkaProducer transport backed by an InMemoryBroker"""
+
+    def __init__(self, broker: InMemoryBroker):
+        self.broker = broker
+
+    async def start(self):
+        pass
+
+    async def send_batch(self, topic: str, records: List[Record]):
+        await self.broker.append(topic, records)
+
+    async def stop(self):
+        pass
+
+async def run_producer_benchmark(
+    messages: int = 10000,
+    payload_size: int = 512,
+    linger_ms: float = 5.0,
+    max_batch_size: int = 500,
+    max_in_flight: int = 10000,
+    latency_ms: float = 2.0,
+    compression_type: Optional[str] = "gzip"
+) -> Dict[str, float]:
+    """Measure producer throughput and delivery latency against the in-process broker"""
+    broker = InMemoryBroker(latency_ms=latency_ms, compression_type=compression_type)
+    producer = KafkaProducer(
+        transport=InMemoryTransport(broker),
+        linger_ms=linger_ms,
+        max_batch_size=max_batch_size,
+        max_in_flight=max_in_flight
+    )
+    rng = np.random.default_rng(0)
+    payload = {"values": rng.random(payload_size // 20).round(6).tolist()}
+
+    latencies = []
+
+    def record_latency(sent_at: float):
+        return lambda _: latencies.append(time.perf_counter() - sent_at)
+
+    started = time.perf_counter()
+    deliveries = []
+    for i in range(messages):
+        sent_at = time.perf_counter()
+        delivery = await producer.send("benchmark", key=f"resource_{i % 100}", value=payload)
+        delivery.add_done_callback(record_latency(sent_at))
+        deliveries.append(delivery)
+    await asyncio.gather(*deliveries)
+    elapsed = time.perf_counter() - started
+    await producer.close()
+
+    latencies = np.array(latencies)
+    return {
+        "messages": messages,
+        "elapsed_seconds": elapsed,
+        "throughput_msgs_per_second": messages / elapsed,
+        "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "latency_p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "batches": broker.stats.batches,
+        "compression_ratio": broker.stats.bytes_raw / max(broker.stats.bytes_on_wire, 1),
+        "delivered": all(delivery.result() for delivery in deliveries)
+    }
+
+if __name__ == "__main__":
+    results = {
+        "batched": asyncio.run(run_producer_benchmark()),
+        "unbatched": asyncio.run(run_producer_benchmark(
+            messages=1000, linger_ms=0, max_batch_size=1, max_in_flight=1
+        ))
+    }
+    print(json.dumps(results, indent=2))
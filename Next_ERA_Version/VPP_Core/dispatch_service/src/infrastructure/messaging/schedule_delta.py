@@ -0,0 +1,210 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ...core.models.columnar_schedule import (
+    NUMERIC_FIELDS,
+    ColumnarSchedule,
+    decode_array,
+    encode_array
+)
+from ...core.models.optimization import DispatchSchedule, GridService
+
+SNAPSHOT_MESSAGE = "dispatch_schedule_snapshot"
+DELTA_MESSAGE = "dispatch_schedule_delta"
+
+def _value_fields(schedule: ColumnarSchedule) -> List[str]:
+    """Names of every per-cell value, numeric columns then grid services"""
+    return list(NUMERIC_FIELDS) + [service.value for service in schedule.grid_services]
+
+def _value_cube(schedule: ColumnarSchedule, fields: List[str]) -> np.ndarray:
+    """Stack per-cell values into a (resources x intervals x fields) array"""
+    shape = (len(schedule.resource_ids), schedule.n_intervals)
+    layers = [
+        schedule.columns[field] if field in schedule.columns
+        else schedule.grid_services.get(GridService(field), np.full(shape, np.nan))
+        for field in fields
+    ]
+    return np.stack(layers, axis=-1) if layers else np.empty(shape + (0,))
+
+def _align(
+    schedule: ColumnarSchedule,
+    fields: List[str],
+    resource_ids: List[str],
+    interval_starts: List[datetime]
+) -> np.ndarray:
+    """Reindex a schedule's value cube onto another resource/interval axis, NaN where missing"""
+    cube = np.full((len(resource_ids), len(interval_starts), len(fields)), np.nan)
+    rows = [(i, schedule.resource_index[rid]) for i, rid in enumerate(resource_ids) if rid in schedule.resource_index]
+    positions = {start: j for j, start in enumerate(schedule.interval_starts)}
+    cols = [(j, positions[start]) for j, start in enumerate(interval_starts) if start in positions]
+    if rows and cols:
+        target_rows, source_rows = map(list, zip(*rows))
+        target_cols, source_cols = map(list, zip(*cols))
+        source = _value_cube(schedule, fields)
+        cube[np.ix_(target_rows, target_cols)] = source[np.ix_(source_rows, source_cols)]
+    return cube
+
+class ScheduleDeltaEncoder:
+    """Producer-side versioning for schedule publication.
+
+    Versions are counted per ``stream_id``, so a schedule and its re-dispatches
+    form one chain even though each re-dispatch has its own schedule_id. Every
+    publication in a stream gets the next version. A full snapshot is sent for
+    the first version and every ``snapshot_every`` versions after that; in
+    between, only the (resource_id, interval) cells whose values changed are
+    sent. After ``resync`` the next version is a snapshot again.
+
+    The last published schedule is held for at most ``max_streams`` streams;
+    a stream evicted as least recently published starts over with a snapshot.
+    """
+
+    def __init__(self, snapshot_every: int = 10, tolerance: float = 1e-9, max_streams: int = 1000):
+        self.snapshot_every = snapshot_every
+        self.tolerance = tolerance
+        self.max_streams = max_streams
+        # Last version per stream, with its schedule or None when a snapshot is due
+        self._published: "OrderedDict[str, Tuple[int, Optional[ColumnarSchedule]]]" = OrderedDict()
+
+    def encode(self, schedule: DispatchSchedule) -> Dict:
+        """Build the next message for a schedule"""
+        current = schedule.columnar()
+        previous = self._published.get(schedule.stream_id)
+        version = previous[0] + 1 if previous else 1
+        self._published[schedule.stream_id] = (version, current)
+        self._published.move_to_end(schedule.stream_id)
+        while len(self._published) > self.max_streams:
+            self._published.popitem(last=False)
+
+        if previous is None or previous[1] is None or (version - 1) % self.snapshot_every == 0:
+            return {
+                "type": SNAPSHOT_MESSAGE,
+                "stream_id": schedule.stream_id,
+                "schedule_id": schedule.schedule_id,
+                "version": version,
+                "schedule": current.to_payload()
+            }
+        return self._delta(schedule.stream_id, schedule.schedule_id, version, previous[1], current)
+
+    def _delta(
+        self,
+        stream_id: str,
+        schedule_id: str,
+        version: int,
+        previous: ColumnarSchedule,
+        current: ColumnarSchedule
+    ) -> Dict:
+        fields = _value_fields(current)
+        new_cube = _value_cube(current, fields)
+        old_cube = _align(previous, fields, current.resource_ids, current.interval_starts)
+
+        changed = ~np.isclose(new_cube, old_cube, rtol=0, atol=self.tolerance, equal_nan=True)
+        rows, cols = np.nonzero(changed.any(axis=-1))
+        values = encode_array(new_cube[rows, cols]) if len(rows) else []
+
+        message = {
+            "type": DELTA_MESSAGE,
+            "stream_id": stream_id,
+            "schedule_id": schedule_id,
+            "version": version,
+            "base_version": version - 1,
+            "fields": fields,
+            "changes": [
+                [current.resource_ids[row], current.interval_starts[col].isoformat(), cell]
+                for row, col, cell in zip(rows.tolist(), cols.tolist(), values)
+            ],
+            **current.sparse_entries()
+        }
+
+        header_changes = {
+            key: value for key, value in current.header.items()
+            if previous.header.get(key) != value
+        }
+        if header_changes:
+            message["header"] = header_changes
+        if current.resource_ids != previous.resource_ids:
+            message["resource_ids"] = current.resource_ids
+        if current.interval_starts != previous.interval_starts or current.interval_ends != previous.interval_ends:
+            message["interval_starts"] = [start.isoformat() for start in current.interval_starts]
+            message["interval_ends"] = [end.isoformat() for end in current.interval_ends]
+        return message
+
+    def resync(self, stream_id: str):
+        """Send a snapshot next, e.g. after a message of the stream was not delivered"""
+        if stream_id in self._published:
+            self._published[stream_id] = (self._published[stream_id][0], None)
+
+    def forget(self, stream_id: str):
+        """Drop the state for a finished stream"""
+        self._published.pop(stream_id, None)
+
+class ScheduleStateReconstructor:
+    """Consumer-side helper that rebuilds schedules from snapshots and deltas.
+
+    State is held per ``stream_id``; the returned schedule's header carries
+    the schedule_id of the latest message.
+    """
+
+    def __init__(self):
+        self.schedules: Dict[str, Tuple[int, ColumnarSchedule]] = {}
+
+    def apply(self, message: Dict) -> Optional[ColumnarSchedule]:
+        """Apply a snapshot or delta message.
+
+        Returns the current state of the schedule, or None when a delta does
+        not follow the version held locally and the consumer has to wait for
+        the next snapshot.
+        """
+        stream_id = message["stream_id"]
+
+        if message["type"] == SNAPSHOT_MESSAGE:
+            schedule = ColumnarSchedule.from_payload(message["schedule"])
+            self.schedules[stream_id] = (message["version"], schedule)
+            return schedule
+
+        if message["type"] != DELTA_MESSAGE:
+            raise ValueError(f"Unknown schedule message type: {message['type']}")
+
+        held = self.schedules.get(stream_id)
+        if held is None or held[0] != message["base_version"]:
+            self.schedules.pop(stream_id, None)
+            return None
+        previous = held[1]
+
+        resource_ids = message.get("resource_ids", previous.resource_ids)
+        if "interval_starts" in message:
+            interval_starts = [datetime.fromisoformat(start) for start in message["interval_starts"]]
+            interval_ends = [datetime.fromisoformat(end) for end in message["interval_ends"]]
+        else:
+            interval_starts, interval_ends = previous.interval_starts, previous.interval_ends
+
+        fields = message["fields"]
+        cube = _align(previous, fields, resource_ids, interval_starts)
+        if message["changes"]:
+            row_index = {resource_id: i for i, resource_id in enumerate(resource_ids)}
+            col_index = {start.isoformat(): j for j, start in enumerate(interval_starts)}
+            rows = [row_index[resource_id] for resource_id, _, _ in message["changes"]]
+            cols = [col_index[start] for _, start, _ in message["changes"]]
+            cube[rows, cols] = decode_array([cell for _, _, cell in message["changes"]])
+
+        header = dict(previous.header)
+        header.update(message.get("header", {}))
+
+        numeric = set(NUMERIC_FIELDS)
+        schedule = ColumnarSchedule(
+            resource_ids=resource_ids,
+            interval_starts=interval_starts,
+            interval_ends=interval_ends,
+            columns={field: cube[..., k] for k, field in enumerate(fields) if field in numeric},
+            grid_services={field: cube[..., k] for k, field in enumerate(fields) if field not in numeric},
+            constraints_violated={(row, col): violations for row, col, violations in message["constraints_violated"]},
+            risk_levels={(row, col): level for row, col, level in message["risk_levels"]},
+            header=header
+        )
+        self.schedules[stream_id] = (message["version"], schedule)
+        return schedule
+
+    def apply_bytes(self, value: bytes) -> Optional[ColumnarSchedule]:
+        """Apply a raw Kafka record value"""
+        return self.apply(json.loads(value))
@@ -1,24 +1,102 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import Dict, List
+import asyncio
+import json
 import uuid
 from datetime import datetime, timedelta
 
+from ...core.models.columnar_forecast import BINARY_MEDIA_TYPE
 from ...core.models.forecast_models import (
+    ForecastFormat,
     ForecastType,
     ForecastRequest,
     ForecastResponse,
-    ForecastSeries
+    ForecastSeries,
+    HistoryUpdate,
+    TrainingJob
 )
+from ...core.services.forecast_cache import ForecastCache
 from ...core.services.forecasting_service import ForecastingService
 from ...config.settings import settings
 
 router = APIRouter(prefix="/api/v1/forecasts", tags=["forecasts"])
 forecasting_service = ForecastingService()
+forecast_cache = ForecastCache(
+    forecasting_service,
+    refresh_interval=settings.UPDATE_INTERVAL,
+    warm_keys=[
+        ForecastCache.key(forecast_type, int(settings.FORECAST_HORIZON.total_seconds() // 3600), "15min")
+        for forecast_type in (ForecastType.LOAD, ForecastType.RENEWABLE)
+    ]
+)
+
+# Refreshes started by model swaps, referenced until they finish
+_refresh_tasks: set = set()
+
+async def _refresh_swapped_forecasts(forecast_type: ForecastType):
+    # Cached forecasts came from the previous model; recompute the ones still in use
+    recent = forecast_cache.invalidate(forecast_type)
+    task = asyncio.get_running_loop().create_task(forecast_cache.refresh(forecast_type, keys=recent))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+forecasting_service.model_swap_listeners.append(_refresh_swapped_forecasts)
+
+def _forecast_response(forecast_body: bytes, format: ForecastFormat, headers: Dict[str, str] = None, **envelope) -> Response:
+    """Response around an already encoded forecast body.
+    
+    JSON formats wrap the body in the ``ForecastResponse`` envelope, the
+    binary format returns it as is.
+    """
+    if format == ForecastFormat.BINARY:
+        return Response(content=forecast_body, media_type=BINARY_MEDIA_TYPE, headers=headers)
+    
+    envelope_json = json.dumps({
+        "request_id": str(uuid.uuid4()),
+        "created_at": datetime.utcnow().isoformat(),
+        "status": "success",
+        "message": None,
+        **envelope
+    }, default=str)
+    return Response(
+        content=b'{"forecast":' + forecast_body + b"," + envelope_json[1:].encode("utf-8"),
+        media_type="application/json",
+        headers=headers
+    )
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Forecast cache entries and the age of the oldest one"""
+    return forecast_cache.stats()
+
+@router.get("/startup-report")
+async def get_startup_report():
+    """Model load and backend import times from service startup"""
+    return forecasting_service.startup_report
+
+@router.get("/history")
+async def get_history_stats():
+    """Rows and time span of every series history window"""
+    return forecasting_service.history.stats()
+
+@router.get("/training-jobs", response_model=List[TrainingJob])
+async def list_training_jobs() -> List[TrainingJob]:
+    """Recent model training jobs, oldest first"""
+    return forecasting_service.training.list_jobs()
+
+@router.get("/training-jobs/{job_id}", response_model=TrainingJob)
+async def get_training_job(job_id: str) -> TrainingJob:
+    """Status and progress of a model training job"""
+    job = forecasting_service.training.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job
 
 @router.post("/{forecast_type}", response_model=ForecastResponse)
 async def generate_forecast(
     forecast_type: ForecastType,
-    request: ForecastRequest
+    request: ForecastRequest,
+    format: ForecastFormat = ForecastFormat.POINTS
 ) -> ForecastResponse:
     """Generate a forecast for the specified type and parameters"""
     try:
@@ -27,9 +105,14 @@ async def generate_forecast(
             start_time=request.start_time,
             end_time=request.end_time,
             resolution=request.resolution,
-            parameters=request.parameters
+            parameters=request.parameters,
+            columnar=format != ForecastFormat.POINTS
         )
         
+        if format == ForecastFormat.COLUMNAR:
+            return _forecast_response(forecast.to_json_bytes(), format)
+        if format == ForecastFormat.BINARY:
+            return _forecast_response(forecast.to_binary(), format)
         return ForecastResponse(
             request_id=str(uuid.uuid4()),
             forecast=forecast
@@ -40,30 +123,46 @@ async def generate_forecast(
 @router.post("/{forecast_type}/batch", response_model=List[ForecastResponse])
 async def generate_batch_forecasts(
     forecast_type: ForecastType,
-    requests: List[ForecastRequest]
+    requests: List[ForecastRequest],
+    format: ForecastFormat = ForecastFormat.POINTS
 ) -> List[ForecastResponse]:
-    """Generate multiple forecasts in batch"""
+    """Generate multiple forecasts in batch with one model call"""
+    if format == ForecastFormat.BINARY:
+        raise HTTPException(status_code=400, detail="The binary format is only available for single forecasts")
+    try:
+        results = await forecasting_service.generate_batch_forecasts(
+            forecast_type, requests, columnar=format == ForecastFormat.COLUMNAR
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if format == ForecastFormat.COLUMNAR:
+        bodies = []
+        for result in results:
+            if isinstance(result, Exception):
+                bodies.append(ForecastResponse(
+                    request_id=str(uuid.uuid4()),
+                    forecast=None,
+                    status="error",
+                    message=str(result)
+                ).json().encode("utf-8"))
+            else:
+                bodies.append(_forecast_response(result.to_json_bytes(), format).body)
+        return Response(content=b"[" + b",".join(bodies) + b"]", media_type="application/json")
+    
     responses = []
-    for request in requests:
-        try:
-            forecast = await forecasting_service.generate_forecast(
-                forecast_type=forecast_type,
-                start_time=request.start_time,
-                end_time=request.end_time,
-                resolution=request.resolution,
-                parameters=request.parameters
-            )
-            
+    for result in results:
+        if isinstance(result, Exception):
             responses.append(ForecastResponse(
                 request_id=str(uuid.uuid4()),
-                forecast=forecast
+                forecast=None,
+                status="error",
+                message=str(result)
             ))
-        except Exception as e:
+        else:
             responses.append(ForecastResponse(
                 request_id=str(uuid.uuid4()),
-                forecast=None,
-                status="error",
-                message=str(e)
+                forecast=result
             ))
     
     return responses
@@ -72,42 +171,35 @@ async def generate_batch_forecasts(
 async def get_latest_forecast(
     forecast_type: ForecastType,
     horizon: int = 24,  # hours
-    resolution: str = "15min"
+    resolution: str = "15min",
+    format: ForecastFormat = ForecastFormat.POINTS
 ) -> ForecastResponse:
-    """Get the latest forecast for the specified type"""
-    now = datetime.utcnow()
-    request = ForecastRequest(
-        forecast_type=forecast_type,
-        start_time=now,
-        end_time=now + timedelta(hours=horizon),
-        resolution=resolution
-    )
-    
+    """Get the latest forecast for the specified type, served from the forecast cache"""
     try:
-        forecast = await forecasting_service.generate_forecast(
-            forecast_type=forecast_type,
-            start_time=request.start_time,
-            end_time=request.end_time,
-            resolution=request.resolution
-        )
-        
-        return ForecastResponse(
-            request_id=str(uuid.uuid4()),
-            forecast=forecast
-        )
+        cached = await forecast_cache.get(forecast_type, horizon, resolution)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    # The forecast was serialized once when cached, only the envelope is per request
+    return _forecast_response(
+        cached.encoded(format),
+        format,
+        headers={"X-Forecast-Age": f"{cached.age():.3f}"},
+        created_at=cached.created_at.isoformat(),
+        cache_age_seconds=cached.age()
+    )
 
-@router.post("/{forecast_type}/update-data")
+@router.post("/{forecast_type}/update-data", response_model=HistoryUpdate, status_code=202)
 async def update_historical_data(
     forecast_type: ForecastType,
     data: List[dict]  # List of timestamp-value pairs
-):
-    """Update historical data for the forecasting models"""
+) -> HistoryUpdate:
+    """Append historical data and retrain the model in the background when due"""
     try:
         import pandas as pd
         df = pd.DataFrame(data)
-        await forecasting_service.update_historical_data(forecast_type, df)
-        return {"status": "success", "message": "Historical data updated successfully"}
+        return await forecasting_service.update_historical_data(forecast_type, df)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -15,11 +15,19 @@ class ServiceConfig(BaseSettings):
     FORECAST_HORIZON: timedelta = timedelta(hours=24)  # Default 24-hour forecast
     UPDATE_INTERVAL: timedelta = timedelta(minutes=15)  # Update forecasts every 15 minutes
     HISTORY_WINDOW: timedelta = timedelta(days=30)  # Historical data window for training
+    FORECAST_WORKERS: int = 4  # Threads running batch model predictions
     
     # Model Configuration
     LOAD_MODEL_TYPE: str = "prophet"  # Options: prophet, lstm, xgboost
     RENEWABLE_MODEL_TYPE: str = "prophet"
     CONTROLLABILITY_MODEL_TYPE: str = "xgboost"
+    MODEL_REGISTRY_PATH: str = "models"  # Trained model versions, loaded at startup
+    MODEL_REGISTRY_KEEP_VERSIONS: int = 5  # Older versions are pruned after each save
+    TRAINING_WORKERS: int = 1  # Processes running model training
+    TRAINING_HOLDOUT_FRACTION: float = 0.1  # Most recent share of the data held out for validation
+    TRAINING_MAX_ERROR_RATIO: float = 1.1  # Candidate holdout MAE allowed relative to the serving model
+    RETRAIN_EVERY_POINTS: int = 96  # New history rows that trigger a model update
+    RETRAIN_DRIFT_RATIO: float = 2.0  # Error on new rows, relative to the model's holdout MAE, that forces a full refit
     
     # Kafka Configuration
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
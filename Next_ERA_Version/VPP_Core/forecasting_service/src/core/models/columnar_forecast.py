@@ -0,0 +1,139 @@
+import json
+import struct
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from pydantic.json import pydantic_encoder
+
+from .forecast_models import ForecastSeries
+
+BINARY_MAGIC = b"VPPF"
+BINARY_VERSION = 1
+BINARY_MEDIA_TYPE = "application/x-vpp-forecast"
+
+# Series fields carried as arrays rather than in the header
+_ARRAY_FIELDS = {"points"}
+
+def encode_array(array: np.ndarray) -> List:
+    """Convert an array to a list with NaN as None"""
+    if np.isnan(array).any():
+        return np.where(np.isnan(array), None, array).tolist()
+    return array.tolist()
+
+class ColumnarForecast:
+    """Forecast series as parallel timestamp, value, lower and upper arrays.
+
+    Built straight from a forecaster's prediction frame, it avoids creating
+    and serializing one ``ForecastPoint`` per timestamp. Timestamps are naive
+    UTC, missing bounds are NaN. ``header`` holds the series fields other
+    than the points, e.g. forecast type, resolution, unit and model info.
+    """
+
+    def __init__(
+        self,
+        header: Dict,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        lower: np.ndarray,
+        upper: np.ndarray
+    ):
+        self.header = header
+        self.timestamps = timestamps.astype("datetime64[us]")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, series: ForecastSeries) -> "ColumnarForecast":
+        """Wrap a timestamp-indexed value/lower/upper frame, with the header of ``series``"""
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return cls(
+            json.loads(series.json(exclude=_ARRAY_FIELDS)),
+            index.to_numpy(dtype="datetime64[us]"),
+            frame["value"].to_numpy(dtype=np.float64),
+            frame["lower"].to_numpy(dtype=np.float64, na_value=np.nan),
+            frame["upper"].to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+
+    @classmethod
+    def from_series(cls, series: ForecastSeries) -> "ColumnarForecast":
+        """Convert a series of points, for forecasters that only produce points"""
+        points = series.points
+        return cls(
+            json.loads(series.json(exclude=_ARRAY_FIELDS)),
+            pd.DatetimeIndex([point.timestamp for point in points]).to_numpy(dtype="datetime64[us]"),
+            np.array([point.value for point in points], dtype=np.float64),
+            np.array([point.confidence_lower for point in points], dtype=np.float64),
+            np.array([point.confidence_upper for point in points], dtype=np.float64)
+        )
+
+    def iso_timestamps(self) -> List[str]:
+        """Timestamps as ISO strings, without fractional seconds when there are none"""
+        whole_seconds = not (self.timestamps.astype(np.int64) % 1_000_000).any()
+        return np.datetime_as_string(self.timestamps, unit="s" if whole_seconds else "us").tolist()
+
+    def to_payload(self) -> Dict:
+        """JSON-compatible columnar payload, NaN encoded as null"""
+        return {
+            **self.header,
+            "timestamps": self.iso_timestamps(),
+            "values": encode_array(self.values),
+            "lower": encode_array(self.lower),
+            "upper": encode_array(self.upper)
+        }
+
+    def to_points_json_bytes(self) -> bytes:
+        """Points JSON encoding, the series body of the points response format"""
+        points = [
+            {"timestamp": timestamp, "value": value, "confidence_lower": lower, "confidence_upper": upper, "metadata": {}}
+            for timestamp, value, lower, upper in zip(
+                self.iso_timestamps(),
+                encode_array(self.values),
+                encode_array(self.lower),
+                encode_array(self.upper)
+            )
+        ]
+        return json.dumps({**self.header, "points": points}, default=pydantic_encoder).encode("utf-8")
+
+    def to_json_bytes(self) -> bytes:
+        """Compact columnar JSON encoding for API responses"""
+        return json.dumps(self.to_payload(), separators=(",", ":"), default=pydantic_encoder).encode("utf-8")
+
+    def to_binary(self) -> bytes:
+        """Binary encoding: magic, version, JSON header, then raw little-endian arrays.
+
+        Timestamps are int64 microseconds since the epoch, followed by the
+        float64 values, lower and upper bounds.
+        """
+        header = json.dumps(self.header, separators=(",", ":"), default=pydantic_encoder).encode("utf-8")
+        arrays = [self.timestamps.astype(np.int64), self.values, self.lower, self.upper]
+        body = b"".join(np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<")).tobytes() for array in arrays)
+        return BINARY_MAGIC + struct.pack("<HI", BINARY_VERSION, len(self)) + \
+            struct.pack("<I", len(header)) + header + body
+
+    @classmethod
+    def from_binary(cls, data: bytes) -> "ColumnarForecast":
+        """Decode a forecast produced by ``to_binary``"""
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("Not a columnar forecast payload")
+        version, count = struct.unpack_from("<HI", data, 4)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported columnar forecast version {version}")
+        (header_length,) = struct.unpack_from("<I", data, 10)
+        offset = 14 + header_length
+        header = json.loads(data[14:offset])
+
+        def take(dtype: str) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        timestamps = take("<i8").astype("datetime64[us]")
+        return cls(header, timestamps, take("<f8"), take("<f8"), take("<f8"))
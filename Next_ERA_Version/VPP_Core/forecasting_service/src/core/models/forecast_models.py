@@ -8,6 +8,11 @@ class ForecastType(str, Enum):
     RENEWABLE = "renewable"
     CONTROLLABILITY = "controllability"
 
+class ForecastFormat(str, Enum):
+    POINTS = "points"  # one object per point
+    COLUMNAR = "columnar"  # parallel timestamp, value, lower and upper arrays
+    BINARY = "binary"  # columnar arrays in the compact binary encoding
+
 class ForecastPoint(BaseModel):
     timestamp: datetime
     value: float
@@ -55,7 +60,52 @@ class ForecastRequest(BaseModel):
 
 class ForecastResponse(BaseModel):
     request_id: str
-    forecast: ForecastSeries
+    forecast: Optional[ForecastSeries] = None  # None when the request failed
     created_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = "success"
-    message: Optional[str] = None 
\ No newline at end of file
+    message: Optional[str] = None
+    cache_age_seconds: Optional[float] = None  # set when served from the forecast cache
+
+class ModelVersion(BaseModel):
+    version: str
+    forecast_type: ForecastType
+    model_type: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    service_version: Optional[str] = None
+    training_rows: int = 0
+    training_start: Optional[datetime] = None
+    training_end: Optional[datetime] = None
+    metrics: Dict[str, float] = Field(default_factory=dict)
+
+class TrainingStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"  # validated and serving
+    REJECTED = "rejected"  # trained but failed validation, previous model kept
+    FAILED = "failed"
+
+class TrainingJob(BaseModel):
+    job_id: str
+    forecast_type: ForecastType
+    model_type: str
+    status: TrainingStatus = TrainingStatus.QUEUED
+    progress: float = 0.0  # 0..1
+    stage: Optional[str] = None
+    rows: int = 0
+    incremental: bool = False  # updates the serving model instead of a full refit
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_version: Optional[str] = None
+    metrics: Dict[str, float] = Field(default_factory=dict)
+    message: Optional[str] = None
+
+class HistoryUpdate(BaseModel):
+    forecast_type: ForecastType
+    added: int  # rows with new timestamps
+    overwritten: int  # rows replacing stored timestamps
+    history_rows: int  # rows in the history window after the update
+    pending_rows: int  # new rows the serving model has not been trained on
+    drift_mae: Optional[float] = None  # serving model error on the posted rows
+    retrain_reason: Optional[str] = None  # initial, new_points or drift when a job was started
+    job: Optional[TrainingJob] = None
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..models.columnar_forecast import ColumnarForecast
+from ..models.forecast_models import ForecastFormat, ForecastType
+
+CacheKey = Tuple[ForecastType, int, str, str]  # forecast type, horizon hours, resolution, parameters
+
+# Result handed to waiting readers when the computing task was cancelled
+_RETRY = object()
+
+@dataclass
+class CachedForecast:
+    forecast: ColumnarForecast
+    created_at: datetime
+    created_monotonic: float
+    last_requested: float
+    encodings: Dict[ForecastFormat, bytes] = field(default_factory=dict)  # response bodies, built on first request
+
+    def age(self) -> float:
+        return time.monotonic() - self.created_monotonic
+
+    def encoded(self, format: ForecastFormat) -> bytes:
+        """Forecast body in a response format, encoded once per entry"""
+        if format not in self.encodings:
+            if format == ForecastFormat.POINTS:
+                self.encodings[format] = self.forecast.to_points_json_bytes()
+            elif format == ForecastFormat.COLUMNAR:
+                self.encodings[format] = self.forecast.to_json_bytes()
+            else:
+                self.encodings[format] = self.forecast.to_binary()
+        return self.encodings[format]
+
+class ForecastCache:
+    """Rolling forecasts kept in memory and refreshed on the update interval.
+
+    Every key that has been requested recently is recomputed by a background
+    task at each ``refresh_interval`` boundary, so reads are served from
+    memory. A read that finds no entry, or one older than the interval,
+    computes it, and identical concurrent reads share one computation.
+    Forecasts are predicted as arrays on the forecasting service's worker
+    pool, so a refresh does not hold up the event loop. Computations that
+    started before an ``invalidate`` are returned to their readers but not
+    cached.
+    """
+
+    def __init__(
+        self,
+        forecasting_service,
+        refresh_interval: timedelta,
+        idle_intervals: int = 4,
+        warm_keys: Optional[List[CacheKey]] = None
+    ):
+        self.forecasting_service = forecasting_service
+        self.refresh_interval = refresh_interval
+        self.idle_intervals = idle_intervals
+        self._entries: Dict[CacheKey, CachedForecast] = {}
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        # Invalidations per forecast type, None counting those of every type
+        self._invalidations: Dict[Optional[ForecastType], int] = {}
+        self._warm_keys = list(warm_keys or [])
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def key(
+        forecast_type: ForecastType,
+        horizon: int,
+        resolution: str,
+        parameters: Optional[Dict] = None
+    ) -> CacheKey:
+        return (
+            ForecastType(forecast_type),
+            horizon,
+            resolution,
+            json.dumps(parameters or {}, sort_keys=True, default=str)
+        )
+
+    async def get(
+        self,
+        forecast_type: ForecastType,
+        horizon: int,
+        resolution: str,
+        parameters: Optional[Dict] = None
+    ) -> CachedForecast:
+        """Latest forecast for a key, computing it only when missing or stale"""
+        key = self.key(forecast_type, horizon, resolution, parameters)
+        entry = self._entries.get(key)
+        if entry is None or entry.age() >= self.refresh_interval.total_seconds():
+            entry = await self._compute(key)
+        entry.last_requested = time.monotonic()
+        return entry
+
+    def invalidate(self, forecast_type: Optional[ForecastType] = None) -> List[CacheKey]:
+        """Drop cached forecasts, for one forecast type or all, e.g. after a model swap.
+
+        Returns the keys of the dropped entries that were requested recently,
+        for ``refresh`` to recompute.
+        """
+        self._invalidations[forecast_type] = self._invalidations.get(forecast_type, 0) + 1
+        idle_after = self.idle_intervals * self.refresh_interval.total_seconds()
+        now = time.monotonic()
+        recent = []
+        for key in list(self._entries):
+            if forecast_type is None or key[0] == forecast_type:
+                if now - self._entries.pop(key).last_requested <= idle_after:
+                    recent.append(key)
+        # Later reads must not wait on a computation with the old model
+        for key in list(self._in_flight):
+            if forecast_type is None or key[0] == forecast_type:
+                del self._in_flight[key]
+        return recent
+
+    async def refresh(
+        self,
+        forecast_type: Optional[ForecastType] = None,
+        keys: Optional[List[CacheKey]] = None
+    ):
+        """Recompute the warm keys, ``keys`` and every recently requested key, dropping idle ones"""
+        idle_after = self.idle_intervals * self.refresh_interval.total_seconds()
+        now = time.monotonic()
+        keys = list(keys or [])
+        for key in list(dict.fromkeys(self._warm_keys + keys + list(self._entries))):
+            if forecast_type is not None and key[0] != forecast_type:
+                continue
+            entry = self._entries.get(key)
+            if key not in self._warm_keys and key not in keys and (entry is None or now - entry.last_requested > idle_after):
+                self._entries.pop(key, None)
+                continue
+            try:
+                await self._compute(key)
+            except Exception as e:
+                print(f"Failed to refresh cached {key[0].value} forecast: {str(e)}")
+
+    def start(self):
+        """Start the background refresh task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "oldest_age_seconds": max((entry.age() for entry in self._entries.values()), default=None)
+        }
+
+    async def _run(self):
+        for key in self._warm_keys:
+            try:
+                await self._compute(key)
+            except Exception as e:
+                print(f"Failed to warm cached {key[0].value} forecast: {str(e)}")
+
+        interval = self.refresh_interval.total_seconds()
+        while True:
+            # Refresh on wall-clock boundaries of the update interval, e.g. :00, :15, :30, :45
+            await asyncio.sleep(interval - time.time() % interval)
+            await self.refresh()
+
+    async def _compute(self, key: CacheKey) -> CachedForecast:
+        """Compute an entry, or wait for the identical computation in flight.
+
+        Errors are shared with the waiting readers, except cancellation of
+        the computing task, after which they compute the entry themselves.
+        """
+        in_flight = self._in_flight.get(key)
+        while in_flight is not None:
+            entry = await asyncio.shield(in_flight)
+            if entry is not _RETRY:
+                return entry
+            in_flight = self._in_flight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        generation = self._generation(key[0])
+        try:
+            forecast_type, horizon, resolution, parameters = key
+            now = datetime.utcnow()
+            forecast = await self.forecasting_service.generate_forecast(
+                forecast_type=forecast_type,
+                start_time=now,
+                end_time=now + timedelta(hours=horizon),
+                resolution=resolution,
+                parameters=json.loads(parameters) or None,
+                columnar=True
+            )
+            previous = self._entries.get(key)
+            entry = CachedForecast(
+                forecast=forecast,
+                created_at=now,
+                created_monotonic=time.monotonic(),
+                last_requested=previous.last_requested if previous else time.monotonic()
+            )
+            if self._generation(forecast_type) == generation:
+                self._entries[key] = entry
+        except asyncio.CancelledError:
+            future.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(entry)
+            return entry
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _generation(self, forecast_type: ForecastType) -> int:
+        return self._invalidations.get(forecast_type, 0) + self._invalidations.get(None, 0)
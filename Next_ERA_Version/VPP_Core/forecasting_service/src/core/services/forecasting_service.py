@@ -1,11 +1,15 @@
-from typing import List, Dict, Optional, Type
+from typing import Awaitable, Callable, List, Dict, Optional, Type, Union
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import importlib
+import os
+import pickle
+import sys
+import time
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-from sklearn.ensemble import GradientBoostingRegressor
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
+from prometheus_client import Gauge
 
 from ..models.forecast_models import (
     ForecastType,
@@ -14,10 +18,65 @@ from ..models.forecast_models import (
     LoadForecast,
     RenewableForecast,
     ControllabilityForecast,
+    ForecastRequest,
+    ModelVersion,
+    TrainingJob,
+    HistoryUpdate,
 )
+from ..models.columnar_forecast import ColumnarForecast
+from .history_store import HistoryStore
+from .model_registry import ModelRegistry
+from .training_jobs import TrainingJobManager, holdout_error
 from ...config.settings import settings
 
+BACKEND_IMPORT_TIME = Gauge(
+    'forecasting_backend_import_seconds',
+    'Time taken to import a forecasting backend on first use',
+    ['backend']
+)
+
+# Seconds spent importing each backend, recorded when it is first needed
+BACKEND_IMPORT_SECONDS: Dict[str, float] = {}
+
+def import_backend(module: str):
+    """Import a heavy forecasting backend on first use and record how long it took.
+
+    Prophet, scikit-learn and TensorFlow are only imported by the forecaster
+    classes that need them, so a deployment never pays for backends its
+    configured model types do not use.
+    """
+    if module in sys.modules:
+        return sys.modules[module]
+    started = time.perf_counter()
+    imported = importlib.import_module(module)
+    elapsed = time.perf_counter() - started
+    BACKEND_IMPORT_SECONDS[module] = elapsed
+    BACKEND_IMPORT_TIME.labels(backend=module).set(elapsed)
+    return imported
+
+def frame_to_points(frame: pd.DataFrame) -> List[ForecastPoint]:
+    """Points from a timestamp-indexed value/lower/upper frame"""
+    return [
+        ForecastPoint(timestamp=timestamp, value=value, confidence_lower=lower, confidence_upper=upper)
+        for timestamp, value, lower, upper in zip(
+            frame.index.to_pydatetime(),
+            frame["value"].tolist(),
+            frame["lower"].tolist(),
+            frame["upper"].tolist()
+        )
+    ]
+
+def request_timestamps(start_time: datetime, end_time: datetime, resolution: str) -> pd.DatetimeIndex:
+    """Forecast timestamps of a request, as naive UTC"""
+    timestamps = pd.date_range(start=start_time, end=end_time, freq=resolution)
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert("UTC").tz_localize(None)
+    return timestamps
+
 class BaseForecaster:
+    # Whether ``update`` can refresh a trained model without a full refit
+    supports_incremental = False
+    
     def __init__(self):
         self.model = None
         self.history: pd.DataFrame = pd.DataFrame()
@@ -25,13 +84,56 @@ class BaseForecaster:
     async def train(self, data: pd.DataFrame):
         raise NotImplementedError
         
+    async def update(self, data: pd.DataFrame, new_rows: int):
+        """Update a trained model with the newest ``new_rows`` rows of the windowed history ``data``"""
+        raise NotImplementedError
+    
     async def predict(self, start_time: datetime, end_time: datetime, resolution: str) -> List[ForecastPoint]:
         raise NotImplementedError
+    
+    def predict_timestamps(self, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
+        """Predict arbitrary timestamps in one call.
+        
+        Returns a frame indexed by timestamp with value, lower and upper
+        columns. Forecasters without it are predicted request by request.
+        """
+        raise NotImplementedError
+    
+    def save(self, directory: str):
+        """Write the forecaster to a directory: the model, then the remaining state"""
+        self._save_model(directory)
+        state = {key: value for key, value in self.__dict__.items() if key != "model"}
+        with open(os.path.join(directory, "forecaster.pkl"), "wb") as f:
+            pickle.dump(state, f)
+    
+    @classmethod
+    def load(cls, directory: str) -> "BaseForecaster":
+        """Restore a forecaster written by ``save`` without rebuilding its model"""
+        forecaster = cls.__new__(cls)
+        with open(os.path.join(directory, "forecaster.pkl"), "rb") as f:
+            forecaster.__dict__.update(pickle.load(f))
+        forecaster.model = forecaster._load_model(directory)
+        return forecaster
+    
+    def _save_model(self, directory: str):
+        with open(os.path.join(directory, "model.pkl"), "wb") as f:
+            pickle.dump(self.model, f)
+    
+    def _load_model(self, directory: str):
+        with open(os.path.join(directory, "model.pkl"), "rb") as f:
+            return pickle.load(f)
 
 class ProphetForecaster(BaseForecaster):
+    supports_incremental = True
+    
     def __init__(self):
         super().__init__()
-        self.model = Prophet(
+        self.model = self._new_model()
+    
+    @staticmethod
+    def _new_model():
+        Prophet = import_backend("prophet").Prophet
+        return Prophet(
             yearly_seasonality=True,
             weekly_seasonality=True,
             daily_seasonality=True,
@@ -41,29 +143,51 @@ class ProphetForecaster(BaseForecaster):
     async def train(self, data: pd.DataFrame):
         df = data.rename(columns={"timestamp": "ds", "value": "y"})
         self.model.fit(df)
+    
+    async def update(self, data: pd.DataFrame, new_rows: int):
+        # Prophet cannot be fit on new rows alone; refitting the window
+        # warm-started from the current parameters converges in a few steps
+        params = self.model.params
+        init = {name: float(np.mean(params[name])) for name in ("k", "m", "sigma_obs")}
+        init.update({name: np.mean(params[name], axis=0) for name in ("delta", "beta")})
+        model = self._new_model()
+        model.fit(data.rename(columns={"timestamp": "ds", "value": "y"}), init=init)
+        self.model = model
+    
+    def _save_model(self, directory: str):
+        model_to_json = import_backend("prophet.serialize").model_to_json
+        with open(os.path.join(directory, "model.json"), "w") as f:
+            f.write(model_to_json(self.model))
+    
+    def _load_model(self, directory: str):
+        model_from_json = import_backend("prophet.serialize").model_from_json
+        with open(os.path.join(directory, "model.json")) as f:
+            return model_from_json(f.read())
         
     async def predict(self, start_time: datetime, end_time: datetime, resolution: str) -> List[ForecastPoint]:
-        future_dates = pd.date_range(start=start_time, end=end_time, freq=resolution)
-        future = pd.DataFrame({"ds": future_dates})
-        forecast = self.model.predict(future)
-        
-        return [
-            ForecastPoint(
-                timestamp=row.ds,
-                value=row.yhat,
-                confidence_lower=row.yhat_lower,
-                confidence_upper=row.yhat_upper
-            )
-            for _, row in forecast.iterrows()
-        ]
+        return frame_to_points(self.predict_timestamps(request_timestamps(start_time, end_time, resolution)))
+    
+    def predict_timestamps(self, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
+        forecast = self.model.predict(pd.DataFrame({"ds": timestamps}))
+        return pd.DataFrame(
+            {
+                "value": forecast["yhat"].to_numpy(),
+                "lower": forecast["yhat_lower"].to_numpy(),
+                "upper": forecast["yhat_upper"].to_numpy()
+            },
+            index=pd.DatetimeIndex(forecast["ds"])
+        )
 
 class LSTMForecaster(BaseForecaster):
+    supports_incremental = True
+    
     def __init__(self, sequence_length: int = 24):
         super().__init__()
         self.sequence_length = sequence_length
-        self.model = Sequential([
-            LSTM(50, activation='relu', input_shape=(sequence_length, 1)),
-            Dense(1)
+        keras = import_backend("tensorflow").keras
+        self.model = keras.models.Sequential([
+            keras.layers.LSTM(50, activation='relu', input_shape=(sequence_length, 1)),
+            keras.layers.Dense(1)
         ])
         self.model.compile(optimizer='adam', loss='mse')
         
@@ -71,14 +195,28 @@ class LSTMForecaster(BaseForecaster):
         values = data['value'].values
         X, y = self._prepare_sequences(values)
         self.model.fit(X, y, epochs=50, batch_size=32, verbose=0)
+    
+    async def update(self, data: pd.DataFrame, new_rows: int):
+        # Fine-tune on the new values, with one sequence of context before them
+        values = data['value'].values[-(new_rows + self.sequence_length):]
+        X, y = self._prepare_sequences(values)
+        self.model.fit(X, y, epochs=5, batch_size=32, verbose=0)
         
     async def predict(self, start_time: datetime, end_time: datetime, resolution: str) -> List[ForecastPoint]:
         # Implementation for LSTM predictions
         pass
+    
+    def _save_model(self, directory: str):
+        self.model.save(os.path.join(directory, "model.keras"))
+    
+    def _load_model(self, directory: str):
+        keras = import_backend("tensorflow").keras
+        return keras.models.load_model(os.path.join(directory, "model.keras"))
 
 class XGBoostForecaster(BaseForecaster):
     def __init__(self):
         super().__init__()
+        GradientBoostingRegressor = import_backend("sklearn.ensemble").GradientBoostingRegressor
         self.model = GradientBoostingRegressor(
             n_estimators=100,
             learning_rate=0.1,
@@ -90,13 +228,18 @@ class XGBoostForecaster(BaseForecaster):
         X = self._prepare_features(data)
         y = data['value']
         self.model.fit(X, y)
+    
+    def _load_model(self, directory: str):
+        # Import scikit-learn through the timed path before unpickling needs it
+        import_backend("sklearn.ensemble")
+        return super()._load_model(directory)
         
     async def predict(self, start_time: datetime, end_time: datetime, resolution: str) -> List[ForecastPoint]:
         # Implementation for XGBoost predictions
         pass
 
 class ForecastingService:
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None):
         self.forecasters: Dict[ForecastType, Dict[str, Type[BaseForecaster]]] = {
             ForecastType.LOAD: {
                 "prophet": ProphetForecaster,
@@ -113,18 +256,146 @@ class ForecastingService:
             }
         }
         
+        self.model_types: Dict[ForecastType, str] = {
+            ForecastType.LOAD: settings.LOAD_MODEL_TYPE,
+            ForecastType.RENEWABLE: settings.RENEWABLE_MODEL_TYPE,
+            ForecastType.CONTROLLABILITY: settings.CONTROLLABILITY_MODEL_TYPE
+        }
+        
+        self.registry = registry or ModelRegistry(
+            settings.MODEL_REGISTRY_PATH,
+            keep_versions=settings.MODEL_REGISTRY_KEEP_VERSIONS
+        )
         self.active_forecasters: Dict[ForecastType, BaseForecaster] = {}
+        self.model_versions: Dict[ForecastType, Optional[ModelVersion]] = {}
+        self.startup_report: Dict = {}
+        self.history = HistoryStore(settings.HISTORY_WINDOW)
+        # Awaited with the forecast type after a newly trained model is swapped in
+        self.model_swap_listeners: List[Callable[[ForecastType], Awaitable[None]]] = []
+        # Newest history timestamp of each forecast type's last training job that was not swapped in
+        self._training_attempts: Dict[ForecastType, np.datetime64] = {}
+        self.training = TrainingJobManager(
+            self.registry,
+            workers=settings.TRAINING_WORKERS,
+            holdout_fraction=settings.TRAINING_HOLDOUT_FRACTION,
+            max_error_ratio=settings.TRAINING_MAX_ERROR_RATIO,
+            service_version=settings.SERVICE_VERSION,
+            on_trained=self._swap_in
+        )
+        self._executor = ThreadPoolExecutor(max_workers=settings.FORECAST_WORKERS, thread_name_prefix="forecast")
         self._initialize_forecasters()
         
     def _initialize_forecasters(self):
-        self.active_forecasters[ForecastType.LOAD] = self.forecasters[ForecastType.LOAD][settings.LOAD_MODEL_TYPE]()
-        self.active_forecasters[ForecastType.RENEWABLE] = self.forecasters[ForecastType.RENEWABLE][settings.RENEWABLE_MODEL_TYPE]()
-        self.active_forecasters[ForecastType.CONTROLLABILITY] = self.forecasters[ForecastType.CONTROLLABILITY][settings.CONTROLLABILITY_MODEL_TYPE]()
+        """Load the latest trained model of every forecast type, creating untrained ones where none is stored"""
+        initialization_started = time.perf_counter()
+        models = {}
+        for forecast_type, model_type in self.model_types.items():
+            forecaster_class = self.forecasters[forecast_type][model_type]
+            started = time.perf_counter()
+            try:
+                loaded = self.registry.load(forecast_type, model_type, forecaster_class)
+            except Exception as e:
+                print(f"Failed to load stored {model_type} model for {forecast_type.value}: {str(e)}")
+                loaded = None
+            
+            if loaded is None:
+                self.active_forecasters[forecast_type] = forecaster_class()
+                self.model_versions[forecast_type] = None
+            else:
+                self.active_forecasters[forecast_type], self.model_versions[forecast_type] = loaded
+            
+            models[forecast_type.value] = {
+                "model_type": model_type,
+                "source": "registry" if loaded else "untrained",
+                "version": loaded[1].version if loaded else None,
+                "seconds": time.perf_counter() - started
+            }
+        
+        self.startup_report = {
+            "initialization_seconds": time.perf_counter() - initialization_started,
+            "backend_imports": dict(BACKEND_IMPORT_SECONDS),
+            "models": models
+        }
     
-    async def update_historical_data(self, forecast_type: ForecastType, data: pd.DataFrame):
-        """Update historical data and retrain the model if necessary"""
-        forecaster = self.active_forecasters[forecast_type]
-        await forecaster.train(data)
+    async def update_historical_data(self, forecast_type: ForecastType, data: pd.DataFrame) -> HistoryUpdate:
+        """Append rows to the series history and start a training job when the retraining policy calls for one.
+        
+        The first upload trains a model. After that the serving model is
+        updated once ``RETRAIN_EVERY_POINTS`` rows newer than its training
+        data have arrived, incrementally when the forecaster supports it, and
+        fully refit when its error on the new rows exceeds
+        ``RETRAIN_DRIFT_RATIO`` times its holdout error. The current model
+        keeps serving until the new one is swapped in. After a job that did
+        not swap in a model, e.g. one rejected or failed, the next job waits
+        for ``RETRAIN_EVERY_POINTS`` rows newer than that job's data.
+        """
+        history = self.history.series(forecast_type)
+        added, overwritten = history.append(data)
+        
+        version = self.model_versions[forecast_type]
+        pending = len(history)
+        if version is not None and version.training_end is not None:
+            pending -= int(np.searchsorted(history.timestamps, np.datetime64(version.training_end, "ns"), side="right"))
+        update = HistoryUpdate(
+            forecast_type=forecast_type,
+            added=added,
+            overwritten=overwritten,
+            history_rows=len(history),
+            pending_rows=pending
+        )
+        
+        if version is None:
+            reason = "initial" if len(history) else None
+        else:
+            baseline = version.metrics.get("holdout_mae")
+            if pending and baseline is not None:
+                forecaster = self.active_forecasters[forecast_type]
+                recent = history.frame(last=pending)
+                update.drift_mae = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, holdout_error, forecaster, recent
+                )
+            if update.drift_mae is not None and update.drift_mae > baseline * settings.RETRAIN_DRIFT_RATIO:
+                reason = "drift"
+            elif pending >= settings.RETRAIN_EVERY_POINTS:
+                reason = "new_points"
+            else:
+                reason = None
+        
+        attempted = self._training_attempts.get(forecast_type)
+        if reason is not None and attempted is not None:
+            since_attempt = len(history) - int(np.searchsorted(history.timestamps, attempted, side="right"))
+            if since_attempt < settings.RETRAIN_EVERY_POINTS:
+                reason = None
+        
+        if reason is not None and not self.training.active(forecast_type):
+            model_type = self.model_types[forecast_type]
+            forecaster_class = self.forecasters[forecast_type][model_type]
+            incremental = reason == "new_points" and forecaster_class.supports_incremental
+            update.job = self.training.submit(
+                forecast_type,
+                model_type,
+                forecaster_class,
+                history.frame(),
+                new_rows=pending if incremental else None
+            )
+            update.retrain_reason = reason
+            self._training_attempts[forecast_type] = history.timestamps[-1]
+        return update
+    
+    async def _swap_in(self, job: TrainingJob, version: ModelVersion):
+        """Load a validated model version and make it the one serving its forecast type"""
+        forecaster_class = self.forecasters[job.forecast_type][job.model_type]
+        forecaster, version = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            lambda: self.registry.load(job.forecast_type, job.model_type, forecaster_class, version=version.version)
+        )
+        
+        # Requests in flight keep the forecaster they already hold
+        self.active_forecasters[job.forecast_type] = forecaster
+        self.model_versions[job.forecast_type] = version
+        self._training_attempts.pop(job.forecast_type, None)
+        for listener in self.model_swap_listeners:
+            await listener(job.forecast_type)
     
     async def generate_forecast(
         self,
@@ -132,11 +403,103 @@ class ForecastingService:
         start_time: datetime,
         end_time: datetime,
         resolution: str,
-        parameters: Optional[Dict] = None
-    ) -> ForecastSeries:
-        """Generate a forecast for the specified type and time range"""
+        parameters: Optional[Dict] = None,
+        columnar: bool = False
+    ) -> Union[ForecastSeries, ColumnarForecast]:
+        """Generate a forecast for the specified type and time range, as arrays when ``columnar``"""
         forecaster = self.active_forecasters[forecast_type]
+        if columnar:
+            try:
+                frame = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    forecaster.predict_timestamps,
+                    request_timestamps(start_time, end_time, resolution)
+                )
+                series = self._build_series(forecast_type, start_time, end_time, resolution, [], parameters)
+                return ColumnarForecast.from_frame(frame, series)
+            except NotImplementedError:
+                pass
+        
         forecast_points = await forecaster.predict(start_time, end_time, resolution)
+        series = self._build_series(forecast_type, start_time, end_time, resolution, forecast_points, parameters)
+        return ColumnarForecast.from_series(series) if columnar else series
+    
+    async def generate_batch_forecasts(
+        self,
+        forecast_type: ForecastType,
+        requests: List[ForecastRequest],
+        columnar: bool = False
+    ) -> List[Union[ForecastSeries, ColumnarForecast, Exception]]:
+        """Forecast many requests with one model call.
+        
+        The union of all requested timestamps is predicted once on the worker
+        pool and every request's series is sliced out of the result. Each
+        entry is the request's series, as arrays when ``columnar``, or the
+        exception it failed with; when the model call fails, that error is
+        the entry of every request.
+        """
+        forecaster = self.active_forecasters[forecast_type]
+        grids: List[Union[pd.DatetimeIndex, Exception]] = []
+        for request in requests:
+            try:
+                grids.append(request_timestamps(request.start_time, request.end_time, request.resolution))
+            except Exception as e:
+                grids.append(e)
+        
+        valid = [grid for grid in grids if not isinstance(grid, Exception)]
+        union = valid[0].append(valid[1:]).unique().sort_values() if valid else pd.DatetimeIndex([])
+        predicted = prediction_error = None
+        try:
+            loop = asyncio.get_running_loop()
+            predicted = await loop.run_in_executor(self._executor, forecaster.predict_timestamps, union)
+        except NotImplementedError:
+            pass
+        except Exception as e:
+            prediction_error = e
+        
+        results: List[Union[ForecastSeries, ColumnarForecast, Exception]] = []
+        for request, grid in zip(requests, grids):
+            if isinstance(grid, Exception):
+                results.append(grid)
+                continue
+            if prediction_error is not None:
+                results.append(prediction_error)
+                continue
+            try:
+                if predicted is None:
+                    points = await forecaster.predict(request.start_time, request.end_time, request.resolution)
+                elif columnar:
+                    series = self._build_series(
+                        forecast_type, request.start_time, request.end_time,
+                        request.resolution, [], request.parameters
+                    )
+                    results.append(ColumnarForecast.from_frame(predicted.reindex(grid), series))
+                    continue
+                else:
+                    points = frame_to_points(predicted.reindex(grid))
+                series = self._build_series(
+                    forecast_type, request.start_time, request.end_time,
+                    request.resolution, points, request.parameters
+                )
+                results.append(ColumnarForecast.from_series(series) if columnar else series)
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _build_series(
+        self,
+        forecast_type: ForecastType,
+        start_time: datetime,
+        end_time: datetime,
+        resolution: str,
+        forecast_points: List[ForecastPoint],
+        parameters: Optional[Dict] = None
+    ) -> ForecastSeries:
+        version = self.model_versions.get(forecast_type)
+        model_info = {
+            "model_type": self.model_types[forecast_type],
+            "version": version.version if version else None
+        }
         
         # Create appropriate forecast series based on type
         if forecast_type == ForecastType.LOAD:
@@ -146,6 +509,7 @@ class ForecastingService:
                 end_time=end_time,
                 resolution=resolution,
                 points=forecast_points,
+                model_info=model_info,
                 location_id=parameters.get("location_id") if parameters else None,
                 customer_segment=parameters.get("customer_segment") if parameters else None
             )
@@ -156,6 +520,7 @@ class ForecastingService:
                 end_time=end_time,
                 resolution=resolution,
                 points=forecast_points,
+                model_info=model_info,
                 source_type=parameters.get("source_type", "solar") if parameters else "solar",
                 location_id=parameters.get("location_id") if parameters else None,
                 capacity=parameters.get("capacity") if parameters else None
@@ -167,6 +532,7 @@ class ForecastingService:
                 end_time=end_time,
                 resolution=resolution,
                 points=forecast_points,
+                model_info=model_info,
                 resource_id=parameters["resource_id"],
                 min_power=parameters.get("min_power", []),
                 max_power=parameters.get("max_power", []),
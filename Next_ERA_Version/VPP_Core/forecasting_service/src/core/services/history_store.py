@@ -0,0 +1,151 @@
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..models.forecast_models import ForecastType
+
+class SeriesHistory:
+    """Append-only columnar history of one series, bounded by a time window.
+
+    Rows are kept sorted by timestamp in growable numpy columns, so appending
+    newer rows copies nothing but the new values. A posted timestamp that is
+    already stored overwrites its row instead of adding a duplicate, and rows
+    older than ``window`` before the newest timestamp are dropped.
+    """
+
+    def __init__(self, window: timedelta, initial_capacity: int = 1024):
+        self.window = np.timedelta64(int(window.total_seconds() * 1e9), "ns")
+        self._timestamps = np.empty(initial_capacity, dtype="datetime64[ns]")
+        self._columns: Dict[str, np.ndarray] = {"value": np.empty(initial_capacity, dtype=float)}
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._start:self._end]
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def append(self, data: pd.DataFrame) -> Tuple[int, int]:
+        """Add rows with a timestamp and numeric columns, returning (added, overwritten)"""
+        if "timestamp" not in data or "value" not in data:
+            raise ValueError("History rows need timestamp and value columns")
+        timestamps = pd.to_datetime(data["timestamp"], utc=True).dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+        columns = {
+            name: pd.to_numeric(data[name], errors="coerce").to_numpy(dtype=float)
+            for name in data.columns if name != "timestamp"
+        }
+
+        # Last row wins for timestamps repeated within the upload
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        last = np.append(timestamps[1:] != timestamps[:-1], True) if len(timestamps) else np.zeros(0, dtype=bool)
+        timestamps = timestamps[last]
+        columns = {name: values[order][last] for name, values in columns.items()}
+        for name in columns:
+            self._add_column(name)
+
+        stored = self.timestamps
+        positions = np.searchsorted(stored, timestamps)
+        existing = positions < len(stored)
+        existing[existing] = stored[positions[existing]] == timestamps[existing]
+        for name, values in columns.items():
+            self._columns[name][self._start + positions[existing]] = values[existing]
+
+        new = ~existing
+        added = int(new.sum())
+        if added:
+            if not len(stored) or timestamps[new][0] > stored[-1]:
+                self._extend(timestamps[new], {name: values[new] for name, values in columns.items()})
+            else:
+                self._merge(timestamps[new], {name: values[new] for name, values in columns.items()})
+        self._trim()
+        return added, int(existing.sum())
+
+    def frame(self, last: Optional[int] = None) -> pd.DataFrame:
+        """Copy of the stored rows, or only the newest ``last`` rows"""
+        start = self._start if last is None else max(self._end - last, self._start)
+        frame = pd.DataFrame({
+            name: values[start:self._end].copy() for name, values in self._columns.items()
+        })
+        frame.insert(0, "timestamp", self._timestamps[start:self._end].copy())
+        return frame
+
+    def _add_column(self, name: str):
+        if name not in self._columns:
+            self._columns[name] = np.full(len(self._timestamps), np.nan)
+
+    def _extend(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        count = len(timestamps)
+        if self._end + count > len(self._timestamps):
+            self._reserve(len(self) + count)
+        self._timestamps[self._end:self._end + count] = timestamps
+        for name, values in self._columns.items():
+            values[self._end:self._end + count] = columns.get(name, np.nan)
+        self._end += count
+
+    def _merge(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Insert rows older than the newest stored one, rebuilding the columns in order"""
+        merged = np.concatenate([self.timestamps, timestamps])
+        order = np.argsort(merged, kind="stable")
+        merged_columns = {
+            name: np.concatenate([values[self._start:self._end], columns.get(name, np.full(len(timestamps), np.nan))])[order]
+            for name, values in self._columns.items()
+        }
+        self._start = self._end = 0
+        self._reserve(len(merged))
+        self._extend(merged[order], merged_columns)
+
+    def _reserve(self, rows: int):
+        """Move the rows to the front of columns with room for ``rows`` rows"""
+        capacity = len(self._timestamps)
+        while capacity < rows * 2:
+            capacity *= 2
+        if capacity == len(self._timestamps) and self._start == 0:
+            return
+        timestamps = np.empty(capacity, dtype="datetime64[ns]")
+        timestamps[:len(self)] = self.timestamps
+        self._timestamps = timestamps
+        for name, values in self._columns.items():
+            column = np.empty(capacity, dtype=float)
+            column[:len(self)] = values[self._start:self._end]
+            self._columns[name] = column
+        self._end -= self._start
+        self._start = 0
+
+    def _trim(self):
+        """Drop rows that fell out of the window"""
+        if not len(self):
+            return
+        cutoff = self._timestamps[self._end - 1] - self.window
+        self._start += int(np.searchsorted(self.timestamps, cutoff))
+
+class HistoryStore:
+    """Windowed history of every forecast series"""
+
+    def __init__(self, window: timedelta):
+        self.window = window
+        self._series: Dict[ForecastType, SeriesHistory] = {}
+
+    def series(self, forecast_type: ForecastType) -> SeriesHistory:
+        forecast_type = ForecastType(forecast_type)
+        if forecast_type not in self._series:
+            self._series[forecast_type] = SeriesHistory(self.window)
+        return self._series[forecast_type]
+
+    def stats(self) -> Dict:
+        return {
+            forecast_type.value: {
+                "rows": len(history),
+                "start": str(history.timestamps[0]) if len(history) else None,
+                "end": str(history.timestamps[-1]) if len(history) else None
+            }
+            for forecast_type, history in self._series.items()
+        }
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+
+from ..models.forecast_models import ForecastType, ModelVersion
+
+class ModelRegistry:
+    """Versioned on-disk store of trained forecasters.
+
+    Layout: ``<root>/<forecast_type>/<model_type>/<version>/`` holds the
+    forecaster files and ``metadata.json``, and ``LATEST`` names the version
+    to serve. Versions are written to a staging directory and renamed into
+    place, and ``LATEST`` is replaced with ``os.replace``, so a reader never
+    sees a partially written model.
+    """
+
+    LATEST = "LATEST"
+    METADATA = "metadata.json"
+
+    def __init__(self, root: str, keep_versions: int = 5):
+        self.root = root
+        self.keep_versions = keep_versions
+
+    def save(
+        self,
+        forecast_type: ForecastType,
+        model_type: str,
+        forecaster,
+        training_rows: int = 0,
+        training_start: Optional[datetime] = None,
+        training_end: Optional[datetime] = None,
+        metrics: Optional[Dict[str, float]] = None,
+        service_version: Optional[str] = None
+    ) -> ModelVersion:
+        """Store a trained forecaster as a new version and make it the latest"""
+        base = self._model_dir(forecast_type, model_type)
+        os.makedirs(base, exist_ok=True)
+
+        metadata = ModelVersion(
+            version=f"{datetime.utcnow():%Y%m%dT%H%M%S%f}",
+            forecast_type=forecast_type,
+            model_type=model_type,
+            service_version=service_version,
+            training_rows=training_rows,
+            training_start=training_start,
+            training_end=training_end,
+            metrics=metrics or {}
+        )
+
+        staging = tempfile.mkdtemp(prefix=f".{metadata.version}.", dir=base)
+        try:
+            forecaster.save(staging)
+            with open(os.path.join(staging, self.METADATA), "w") as f:
+                f.write(metadata.json())
+            os.rename(staging, os.path.join(base, metadata.version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._set_latest(base, metadata.version)
+        self._prune(base, metadata.version)
+        return metadata
+
+    def load(
+        self,
+        forecast_type: ForecastType,
+        model_type: str,
+        forecaster_class: Type,
+        version: Optional[str] = None
+    ) -> Optional[Tuple[object, ModelVersion]]:
+        """Load a version, the latest by default, or None when nothing is stored"""
+        version = version or self.latest_version(forecast_type, model_type)
+        if version is None:
+            return None
+
+        directory = os.path.join(self._model_dir(forecast_type, model_type), version)
+        with open(os.path.join(directory, self.METADATA)) as f:
+            metadata = ModelVersion.parse_raw(f.read())
+        return forecaster_class.load(directory), metadata
+
+    def latest_version(self, forecast_type: ForecastType, model_type: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._model_dir(forecast_type, model_type), self.LATEST)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self, forecast_type: ForecastType, model_type: str) -> List[ModelVersion]:
+        """Stored versions, oldest first"""
+        base = self._model_dir(forecast_type, model_type)
+        versions = []
+        for version in self._version_dirs(base):
+            with open(os.path.join(base, version, self.METADATA)) as f:
+                versions.append(ModelVersion.parse_raw(f.read()))
+        return versions
+
+    def _model_dir(self, forecast_type: ForecastType, model_type: str) -> str:
+        return os.path.join(self.root, ForecastType(forecast_type).value, model_type)
+
+    def _version_dirs(self, base: str) -> List[str]:
+        if not os.path.isdir(base):
+            return []
+        return sorted(
+            name for name in os.listdir(base)
+            if not name.startswith(".") and os.path.isfile(os.path.join(base, name, self.METADATA))
+        )
+
+    def _set_latest(self, base: str, version: str):
+        pointer = os.path.join(base, f".{self.LATEST}.{uuid.uuid4().hex}")
+        with open(pointer, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer, os.path.join(base, self.LATEST))
+
+    def _prune(self, base: str, latest: str):
+        """Remove all but the newest ``keep_versions`` versions, never the latest"""
+        stale = self._version_dirs(base)[:-self.keep_versions] if self.keep_versions > 0 else []
+        for version in stale:
+            if version != latest:
+                shutil.rmtree(os.path.join(base, version), ignore_errors=True)
@@ -0,0 +1,250 @@
+import asyncio
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from ..models.forecast_models import ForecastType, ModelVersion, TrainingJob, TrainingStatus
+from .model_registry import ModelRegistry
+
+def holdout_error(forecaster, holdout: pd.DataFrame) -> Optional[float]:
+    """Mean absolute error on held-out rows, None when the forecaster cannot predict timestamps"""
+    try:
+        predicted = forecaster.predict_timestamps(pd.DatetimeIndex(holdout["timestamp"]))
+    except NotImplementedError:
+        return None
+    values = predicted["value"].to_numpy(dtype=float)
+    if not np.all(np.isfinite(values)):
+        return float("inf")
+    return float(np.mean(np.abs(values - holdout["value"].to_numpy(dtype=float))))
+
+def run_training_job(
+    job_id: str,
+    forecaster_class: Type,
+    forecast_type: ForecastType,
+    model_type: str,
+    data: pd.DataFrame,
+    registry_root: str,
+    keep_versions: int,
+    holdout_fraction: float,
+    max_error_ratio: float,
+    service_version: Optional[str],
+    progress: Dict,
+    new_rows: Optional[int] = None
+) -> Tuple[Optional[ModelVersion], Dict[str, float], Optional[str]]:
+    """Train, validate and store a model in a worker process.
+
+    A candidate is fit without the most recent ``holdout_fraction`` of the
+    data and scored on it against the serving model. Only a candidate whose
+    error is within ``max_error_ratio`` of the serving model's is refit on
+    all data and stored. With ``new_rows`` the serving model is updated
+    incrementally with the newest rows instead, and the holdout is taken
+    from those rows. Returns the stored version (None when rejected), the
+    validation metrics and the rejection reason.
+    """
+    def report(fraction: float, stage: str):
+        progress[job_id] = (fraction, stage)
+
+    report(0.0, "started")
+    registry = ModelRegistry(registry_root, keep_versions=keep_versions)
+    data = data.sort_values("timestamp").reset_index(drop=True)
+    data["timestamp"] = pd.to_datetime(data["timestamp"])
+    metrics: Dict[str, float] = {}
+
+    def fit(rows: pd.DataFrame, rows_new: int):
+        if new_rows is None:
+            forecaster = forecaster_class()
+            asyncio.run(forecaster.train(rows))
+        else:
+            forecaster, _ = registry.load(forecast_type, model_type, forecaster_class)
+            asyncio.run(forecaster.update(rows, rows_new))
+        return forecaster
+
+    n_holdout = int((len(data) if new_rows is None else new_rows) * holdout_fraction)
+    if n_holdout > 0 and len(data) - n_holdout >= 2:
+        report(0.1, "fitting validation candidate")
+        candidate = fit(data.iloc[:-n_holdout], (new_rows or 0) - n_holdout)
+
+        report(0.4, "validating")
+        holdout = data.iloc[-n_holdout:]
+        candidate_error = holdout_error(candidate, holdout)
+        if candidate_error is not None:
+            metrics["holdout_mae"] = candidate_error
+            metrics["holdout_rows"] = float(n_holdout)
+            if not np.isfinite(candidate_error):
+                return None, metrics, "candidate produced non-finite predictions"
+
+            serving = registry.load(forecast_type, model_type, forecaster_class)
+            if serving is not None:
+                serving_error = holdout_error(serving[0], holdout)
+                if serving_error is not None:
+                    metrics["serving_holdout_mae"] = serving_error
+                    if candidate_error > serving_error * max_error_ratio:
+                        return None, metrics, (
+                            f"holdout MAE {candidate_error:.4g} is worse than the serving "
+                            f"model's {serving_error:.4g}"
+                        )
+
+    report(0.6, "fitting on all data" if new_rows is None else "updating with new data")
+    forecaster = fit(data, new_rows)
+
+    report(0.9, "saving")
+    version = registry.save(
+        forecast_type,
+        model_type,
+        forecaster,
+        training_rows=len(data),
+        training_start=data["timestamp"].min().to_pydatetime() if len(data) else None,
+        training_end=data["timestamp"].max().to_pydatetime() if len(data) else None,
+        metrics=metrics,
+        service_version=service_version
+    )
+    return version, metrics, None
+
+class TrainingJobManager:
+    """Runs training jobs in a process pool so the event loop keeps serving forecasts.
+
+    A finished job that passed validation has stored its model in the
+    registry; ``on_trained`` is then awaited with the job and the new
+    version so the caller can load and swap it in.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        workers: int = 1,
+        holdout_fraction: float = 0.1,
+        max_error_ratio: float = 1.1,
+        service_version: Optional[str] = None,
+        on_trained: Optional[Callable[[TrainingJob, ModelVersion], Awaitable[None]]] = None,
+        max_jobs: int = 100
+    ):
+        self.registry = registry
+        self.workers = workers
+        self.holdout_fraction = holdout_fraction
+        self.max_error_ratio = max_error_ratio
+        self.service_version = service_version
+        self.on_trained = on_trained
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, TrainingJob] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress: Optional[Dict] = None
+        self._tasks: set = set()
+
+    def submit(
+        self,
+        forecast_type: ForecastType,
+        model_type: str,
+        forecaster_class: Type,
+        data: pd.DataFrame,
+        new_rows: Optional[int] = None
+    ) -> TrainingJob:
+        """Queue a training job and return immediately, an incremental update when ``new_rows`` is given"""
+        job = TrainingJob(
+            job_id=str(uuid.uuid4()),
+            forecast_type=forecast_type,
+            model_type=model_type,
+            rows=len(data),
+            incremental=new_rows is not None
+        )
+        self.jobs[job.job_id] = job
+        self._trim_jobs()
+
+        task = asyncio.get_running_loop().create_task(self._run(job, forecaster_class, data, new_rows))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        job = self.jobs.get(job_id)
+        if job is None or self._progress is None:
+            return job
+        reported = self._progress.get(job_id)
+        if reported is not None and job.status in (TrainingStatus.QUEUED, TrainingStatus.RUNNING):
+            # A worker process has picked the job up
+            if job.status == TrainingStatus.QUEUED:
+                job.status = TrainingStatus.RUNNING
+                job.started_at = datetime.utcnow()
+            job.progress, job.stage = reported
+        return job
+
+    def list_jobs(self) -> List[TrainingJob]:
+        return [self.get(job_id) for job_id in self.jobs]
+
+    def active(self, forecast_type: ForecastType) -> bool:
+        """Whether a job for the forecast type is queued or running"""
+        return any(
+            job.forecast_type == forecast_type and job.status in (TrainingStatus.QUEUED, TrainingStatus.RUNNING)
+            for job in self.jobs.values()
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    async def _run(self, job: TrainingJob, forecaster_class: Type, data: pd.DataFrame, new_rows: Optional[int]):
+        loop = asyncio.get_running_loop()
+        try:
+            executor, progress = self._pool()
+            version, job.metrics, rejection = await loop.run_in_executor(
+                executor,
+                run_training_job,
+                job.job_id,
+                forecaster_class,
+                job.forecast_type,
+                job.model_type,
+                data,
+                self.registry.root,
+                self.registry.keep_versions,
+                self.holdout_fraction,
+                self.max_error_ratio,
+                self.service_version,
+                progress,
+                new_rows
+            )
+
+            job.started_at = job.started_at or datetime.utcnow()
+            if version is None:
+                job.status = TrainingStatus.REJECTED
+                job.message = rejection
+            else:
+                job.stage = "swapping in"
+                job.model_version = version.version
+                if self.on_trained is not None:
+                    await self.on_trained(job, version)
+                job.status = TrainingStatus.COMPLETED
+                job.message = f"Serving model version {version.version}"
+        except Exception as e:
+            job.status = TrainingStatus.FAILED
+            job.message = str(e)
+        finally:
+            job.progress = 1.0
+            job.stage = None
+            job.finished_at = datetime.utcnow()
+            if self._progress is not None:
+                self._progress.pop(job.job_id, None)
+
+    def _pool(self) -> Tuple[ProcessPoolExecutor, Dict]:
+        """Create the worker processes on first use, spawned so no model state is forked"""
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor, self._progress
+
+    def _trim_jobs(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        finished = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status not in (TrainingStatus.QUEUED, TrainingStatus.RUNNING)
+        ]
+        for job_id in finished[:max(len(self.jobs) - self.max_jobs, 0)]:
+            del self.jobs[job_id]
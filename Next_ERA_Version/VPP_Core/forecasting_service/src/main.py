@@ -29,6 +29,15 @@ app.mount("/metrics", metrics_app)
 # Include routers
 app.include_router(forecast_routes.router)
 
+@app.on_event("startup")
+async def start_forecast_cache():
+    forecast_routes.forecast_cache.start()
+
+@app.on_event("shutdown")
+async def stop_forecast_cache():
+    await forecast_routes.forecast_cache.stop()
+    forecast_routes.forecasting_service.training.shutdown()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():